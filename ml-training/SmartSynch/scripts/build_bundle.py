@@ -0,0 +1,61 @@
+#!/usr/bin/env python
+"""
+Bundle Build Script
+
+Packs the sentence encoder (with tokenizer), the zero-shot model, the NLTK
+data and a trained classification head into one versioned directory (and
+optionally a .tar.gz). Serving loads everything from it without network
+access when bundle.path in configs/predictor_config.yaml (or
+$SMARTSYNCH_BUNDLE) points at the bundle.
+"""
+
+import argparse
+import logging
+from datetime import datetime
+from pathlib import Path
+from smartsynch.api.routes.models import MODEL_CONFIGS
+from smartsynch.models.bundle import NLTK_PACKAGES, build_bundle, open_bundle
+from smartsynch.utils.helpers import load_predictor_config
+
+# Set up logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+def main():
+    config = load_predictor_config()
+    parser = argparse.ArgumentParser(description='Build an offline model bundle')
+    parser.add_argument('--output-dir', default='models/bundles', help='Parent directory of bundles')
+    parser.add_argument('--version', default=datetime.now().strftime('%Y%m%d_%H%M%S'),
+                        help='Bundle version (directory name)')
+    parser.add_argument('--model-path', help='Trained head (model.pt) to include')
+    parser.add_argument('--encoder', default=config['model']['name'], help='Sentence encoder')
+    parser.add_argument('--zero-shot-model',
+                        default=MODEL_CONFIGS['task-categorization']['model'],
+                        help='Zero-shot model ("" to skip)')
+    parser.add_argument('--nltk-packages', nargs='*', default=list(NLTK_PACKAGES),
+                        help='NLTK packages to include')
+    parser.add_argument('--archive', action='store_true', help='Also write a .tar.gz')
+    args = parser.parse_args()
+
+    if args.model_path and not Path(args.model_path).exists():
+        raise FileNotFoundError(f"No model found at {args.model_path}")
+
+    path = build_bundle(
+        args.output_dir, args.version,
+        encoder_name=args.encoder,
+        head_path=args.model_path,
+        zero_shot_model=args.zero_shot_model or None,
+        nltk_packages=args.nltk_packages,
+        archive=args.archive
+    )
+
+    problems = open_bundle(str(path)).verify()
+    if problems:
+        raise RuntimeError(f"Bundle verification failed: {problems}")
+    logger.info(f"Bundle ready: {path}")
+
+if __name__ == '__main__':
+    main()
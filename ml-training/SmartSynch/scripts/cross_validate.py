@@ -0,0 +1,81 @@
+#!/usr/bin/env python
+"""
+Cross-Validation Script
+
+Estimates the head's accuracy and F1 with stratified (repeated) k-fold
+cross-validation over all prepared embeddings (train and validation
+splits together) instead of the single holdout split. Folds train in
+parallel worker processes that share one in-memory copy of the
+embeddings; mean, std and the aggregated confusion matrix are written to
+cv_results.json.
+"""
+
+import argparse
+import json
+import logging
+import yaml
+from pathlib import Path
+import numpy as np
+from smartsynch.models.cross_validation import cross_validate
+
+# Set up logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+def main():
+    parser = argparse.ArgumentParser(description='Cross-validate the classification head')
+    parser.add_argument('--config', default='configs/training_config.yaml',
+                        help='Head hyperparameters and cross_validation settings')
+    parser.add_argument('--data-dir', default='data/processed', help='Output of prepare_data.py')
+    parser.add_argument('--folds', type=int, help='Overrides cross_validation.folds')
+    parser.add_argument('--repeats', type=int, help='Overrides cross_validation.repeats')
+    parser.add_argument('--epochs', type=int, help='Overrides model.num_epochs')
+    parser.add_argument('--workers', type=int, help='Overrides cross_validation.workers')
+    parser.add_argument('--output-dir', default='models/cross_validation',
+                        help='Directory to save cv_results.json')
+    args = parser.parse_args()
+
+    with open(args.config) as f:
+        config = yaml.safe_load(f)
+    model_config = config['model']
+    settings = config['cross_validation']
+    for name in ('folds', 'repeats', 'workers'):
+        if getattr(args, name) is not None:
+            settings[name] = getattr(args, name)
+
+    data_dir = Path(args.data_dir)
+    category_map = np.load(data_dir / "category_map.npy", allow_pickle=True).item()
+    features = np.concatenate([np.load(data_dir / "X_train.npy"), np.load(data_dir / "X_val.npy")])
+    labels = np.concatenate([np.load(data_dir / "y_train.npy"), np.load(data_dir / "y_val.npy")])
+    params = {
+        'learning_rate': model_config['learning_rate'],
+        'dropout_rate': model_config['dropout_rate'],
+        'batch_size': model_config['batch_size'],
+        'early_stopping_patience': model_config['early_stopping_patience'],
+    }
+
+    report = cross_validate(
+        features, labels, params, category_map,
+        folds=settings['folds'],
+        repeats=settings['repeats'],
+        epochs=args.epochs or model_config['num_epochs'],
+        val_fraction=settings['val_fraction'],
+        workers=settings['workers'],
+        seed=settings['seed']
+    )
+
+    output_dir = Path(args.output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    output_file = output_dir / 'cv_results.json'
+    with open(output_file, 'w') as f:
+        json.dump(report, f, indent=2)
+
+    for name, score in report['scores'].items():
+        logger.info(f"{name}: {score['mean']:.4f} ± {score['std']:.4f}")
+    logger.info(f"Cross-validation results written to {output_file}")
+
+if __name__ == '__main__':
+    main()
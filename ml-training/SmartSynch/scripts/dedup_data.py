@@ -0,0 +1,90 @@
+#!/usr/bin/env python
+"""
+Training Data Dedup Script
+
+Collapses near-duplicate samples of a training set (cosine similarity of
+their embeddings at or above a threshold), writes the deduped dataset in
+the input's format and a JSON report of the collapsed groups. Embeddings
+go through the same embedding store as scripts/prepare_data.py, so
+preparing the deduped dataset afterwards encodes nothing new.
+"""
+
+import argparse
+import json
+import logging
+from pathlib import Path
+from smartsynch.data.dedup import dedup_report, find_duplicates
+from smartsynch.data.processor import DataProcessor
+from smartsynch.data.streaming import JSONL_SUFFIXES, iter_samples
+
+# Set up logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+def write_samples(samples, path: Path):
+    """Write samples as JSONL or {"samples": [...]} JSON, by file suffix."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, 'w') as f:
+        if path.suffix in JSONL_SUFFIXES:
+            for sample in samples:
+                f.write(json.dumps(sample) + '\n')
+        else:
+            json.dump({'samples': samples}, f, indent=2)
+
+def main():
+    parser = argparse.ArgumentParser(description='Remove near-duplicate training samples')
+    parser.add_argument('--input', default='data/training_data.json',
+                        help='Training data (JSON or JSONL)')
+    parser.add_argument('--output', default='data/training_data.dedup.json',
+                        help='Deduped dataset (JSONL when the suffix is .jsonl)')
+    parser.add_argument('--report', default='data/dedup_report.json',
+                        help='Report of the collapsed groups')
+    parser.add_argument('--threshold', type=float, default=0.95,
+                        help='Cosine similarity at or above which samples are duplicates')
+    parser.add_argument('--method', choices=['auto', 'blocked', 'ivf'], default='auto',
+                        help='blocked: exact all pairs; ivf: compare within k-means buckets')
+    parser.add_argument('--block-size', type=int, default=4096,
+                        help='Rows per matrix-product block')
+    parser.add_argument('--probes', type=int, default=2,
+                        help='IVF buckets each sample joins')
+    parser.add_argument('--store', default='data/processed/embeddings.sqlite',
+                        help='Embedding store shared with prepare_data.py')
+    parser.add_argument('--no-store', action='store_true',
+                        help='Encode every sample without the embedding store')
+    parser.add_argument('--num-workers', type=int, default=1,
+                        help='Processes used for cleaning and encoding')
+    args = parser.parse_args()
+
+    samples = list(iter_samples(args.input))
+    logger.info(f"Loaded {len(samples)} samples from {args.input}")
+
+    # Same texts as prepare_data, so the store entries are shared
+    processor = DataProcessor(num_workers=args.num_workers)
+    embeddings = processor.embed_samples(samples, None if args.no_store else args.store)
+
+    duplicates = find_duplicates(
+        embeddings, args.threshold,
+        method=args.method,
+        block_size=args.block_size,
+        probes=args.probes
+    )
+    report = dedup_report(
+        embeddings, duplicates, [sample['category'] for sample in samples],
+        args.threshold, samples
+    )
+    report['input'] = args.input
+
+    write_samples([samples[index] for index in duplicates['keep']], Path(args.output))
+    Path(args.report).parent.mkdir(parents=True, exist_ok=True)
+    with open(args.report, 'w') as f:
+        json.dump(report, f, indent=2)
+
+    logger.info(f"Kept {report['kept']} of {report['samples']} samples "
+                f"({report['conflicting_groups']} groups with conflicting labels); "
+                f"wrote {args.output} and {args.report}")
+
+if __name__ == '__main__':
+    main()
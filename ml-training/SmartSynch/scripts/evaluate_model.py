@@ -6,15 +6,26 @@ Evaluates model performance using various metrics:
 - Accuracy, Precision, Recall, F1
 - Confusion Matrix
 - Confidence Analysis
+- Reduced-precision modes (bf16/int8): accuracy and agreement with fp32,
+  latency and memory per mode. Variants that pass the accuracy gate can
+  be registered with --register.
 """
 
 import argparse
 import logging
 import json
+import time
 from pathlib import Path
 import numpy as np
+import torch
+from smartsynch.models.encoder import get_encoder
+from smartsynch.models.manager import ModelManager
+from smartsynch.models.precision import (
+    ENCODER_PRECISIONS, HEAD_PRECISIONS, accuracy_gate, convert_head, run_head, serialized_size
+)
 from smartsynch.models.predictor import Predictor
 from smartsynch.utils.evaluation import ModelEvaluator
+from smartsynch.utils.helpers import load_predictor_config
 
 # Set up logging
 logging.basicConfig(
@@ -37,54 +48,114 @@ def load_test_data(test_file: str, labels_file: str = None):
     else:
         raise ValueError(f"Unsupported file format: {test_file}")
 
-def evaluate_model(model_path: str, test_data: dict, output_dir: Path):
+def load_category_map(model_path: str):
+    """Category mapping stored next to the model, or the default one."""
+    metadata_path = Path(model_path).parent / 'metadata.json'
+    if metadata_path.exists():
+        with open(metadata_path) as f:
+            return json.load(f)['category_map']
+    return dict(ModelManager().category_map)
+
+def encode_samples(samples, category_map, encoder_name: str, precision: str):
+    """Embed JSON samples with the encoder in the given precision."""
+    encoder = get_encoder(encoder_name, precision=precision)
+    texts = [Predictor.combine_text(s['title'], s.get('description')) for s in samples]
+    labels = np.array([category_map[s['category']] for s in samples])
+    start = time.perf_counter()
+    features = encoder.encode(texts, batch_size=32)
+    encode_ms = (time.perf_counter() - start) * 1000.0 / max(len(texts), 1)
+    return np.asarray(features, dtype=np.float32), labels, encode_ms, serialized_size(encoder)
+
+def evaluate_precisions(head, feature_sets, labels, head_precisions,
+                        max_accuracy_drop: float, min_agreement: float):
+    """
+    Compare every (encoder, head) precision mode against fp32.
+
+    Args:
+        head: fp32 TaskClassifier
+        feature_sets: {encoder precision: (features, encode ms/sample, encoder bytes)}
+        labels: True labels
+        head_precisions: Head modes to evaluate
+
+    Returns:
+        One result dict per mode, fp32/fp32 first
+    """
+    reference = None
+    results = []
+    for encoder_precision, (features, encode_ms, encoder_bytes) in feature_sets.items():
+        embeddings = torch.from_numpy(features).float()
+        for head_precision in head_precisions:
+            variant = convert_head(head, head_precision)
+            predictions, confidences, head_ms = run_head(variant, embeddings)
+            if reference is None:
+                reference = predictions
+            result = {
+                'precision': {'encoder': encoder_precision, 'head': head_precision},
+                **accuracy_gate(reference, predictions, labels, max_accuracy_drop, min_agreement),
+                'mean_confidence': float(confidences.mean()),
+                'latency_ms': {
+                    'encode_per_sample': encode_ms,
+                    'head_batch': head_ms,
+                },
+                'memory_bytes': {
+                    'encoder': encoder_bytes,
+                    'head': serialized_size(variant),
+                },
+            }
+            logger.info(f"{encoder_precision}/{head_precision}: accuracy={result['accuracy']:.4f} "
+                        f"agreement={result['agreement']:.4f} head={head_ms:.3f}ms "
+                        f"passed={result['passed']}")
+            results.append(result)
+    return results
+
+def evaluate_model(model_path: str, test_data: dict, output_dir: Path,
+                   head_precisions=HEAD_PRECISIONS, encoder_precisions=('fp32',),
+                   max_accuracy_drop: float = 0.01, min_agreement: float = 0.99,
+                   register: bool = False):
     """Evaluate model performance on test data."""
     logger.info("Loading model...")
-    predictor = Predictor(model_path)
+    manager = ModelManager()
+    head = manager.load_model(model_path).cpu().eval()
+    category_map = load_category_map(model_path)
     
-    # Extract features and labels from test data
-    features = test_data['features']
-    true_categories = test_data['labels']
+    # Precomputed features only exist for the fp32 encoder
+    if 'features' in test_data:
+        labels = np.asarray(test_data['labels'])
+        feature_sets = {'fp32': (np.asarray(test_data['features'], dtype=np.float32), None, None)}
+    else:
+        encoder_name = load_predictor_config()['model']['name']
+        feature_sets = {}
+        for precision in ('fp32',) + tuple(p for p in encoder_precisions if p != 'fp32'):
+            features, labels, encode_ms, encoder_bytes = encode_samples(
+                test_data['samples'], category_map, encoder_name, precision
+            )
+            feature_sets[precision] = (features, encode_ms, encoder_bytes)
     
-    # Get predictions
+    head_precisions = ('fp32',) + tuple(p for p in head_precisions if p != 'fp32')
     logger.info("Making predictions...")
-    predictions = []
-    confidences = []
+    results = evaluate_precisions(head, feature_sets, labels, head_precisions,
+                                  max_accuracy_drop, min_agreement)
     
-    # Debug the feature format
-    logger.info(f"Feature shape/type: {features.shape if hasattr(features, 'shape') else type(features)}")
+    # Full report for the fp32 reference
+    evaluator = ModelEvaluator(category_map)
+    predictions, confidences, _ = run_head(head, torch.from_numpy(feature_sets['fp32'][0]), repeats=1)
+    report = evaluator.evaluate_model(labels.tolist(), predictions.tolist(), confidences.tolist())
+    report['precision_modes'] = results
     
-    # Convert numpy array to tensor and pass directly to model
-    try:
-        import torch
-        features_tensor = torch.from_numpy(features).float()  # Ensure float tensor
-        logits = predictor.model.forward(features_tensor)
-        predictions_tensor = torch.argmax(logits, dim=1)
-        confidences_tensor = torch.max(torch.softmax(logits, dim=1), dim=1)[0]
-        
-        predictions = predictions_tensor.tolist()
-        confidences = confidences_tensor.tolist()
-    except Exception as e:
-        logger.error(f"Error during prediction: {str(e)}")
-        raise
+    if register:
+        for result in results[1:]:
+            if result['passed']:
+                result['registered'] = str(manager.register_variant(
+                    model_path, result['precision'], gate={
+                        k: result[k] for k in ('accuracy', 'accuracy_drop', 'agreement')
+                    }
+                ))
     
-    # Load category mapping from metadata
-    metadata_path = Path(model_path).parent / 'metadata.json'
-    if metadata_path.exists():
-        with open(metadata_path) as f:
-            metadata = json.load(f)
-            category_map = metadata['category_map']
-    else:
-        # Fallback to default category map from test data
-        category_map = {
-            "Design": 0,
-            "Development": 1,
-            "Meeting": 2,
-            "Planning": 3,
-            "Research": 4
-        }
-    
-    evaluator = ModelEvaluator(category_map)
+    output_file = output_dir / 'evaluation_results.json'
+    with open(output_file, 'w') as f:
+        json.dump(report, f, indent=2, default=float)
+    logger.info(f"Evaluation results written to {output_file}")
+    return report
 
 def main():
     # Define parser
@@ -93,6 +164,17 @@ def main():
     parser.add_argument('--test-data', required=True, help='Path to test data file')
     parser.add_argument('--labels', help='Path to labels file (required for .npy format)')
     parser.add_argument('--output-dir', required=True, help='Directory to save evaluation results')
+    parser.add_argument('--precisions', nargs='+', default=list(HEAD_PRECISIONS),
+                        choices=HEAD_PRECISIONS, help='Head precision modes to compare')
+    parser.add_argument('--encoder-precisions', nargs='+', default=['fp32'],
+                        choices=ENCODER_PRECISIONS,
+                        help='Encoder precision modes to compare (JSON test data only)')
+    parser.add_argument('--max-accuracy-drop', type=float, default=0.01,
+                        help='Largest accepted accuracy loss against fp32')
+    parser.add_argument('--min-agreement', type=float, default=0.99,
+                        help='Smallest accepted agreement with fp32 predictions')
+    parser.add_argument('--register', action='store_true',
+                        help='Register variants that pass the accuracy gate')
     
     args = parser.parse_args()
     
@@ -103,6 +185,10 @@ def main():
     labels_path = project_root / args.labels if args.labels else None
     output_dir = project_root / args.output_dir
     
+    # load_model would fall back to training a new model on a bad path
+    if not model_path.exists():
+        raise FileNotFoundError(f"No model found at {model_path}")
+    
     # Ensure directories exist
     if not test_data_path.exists():
         logger.error(f"Test data not found at: {test_data_path}")
@@ -114,7 +200,14 @@ def main():
     
     # Load test data before passing to evaluate_model
     test_data = load_test_data(str(test_data_path), str(labels_path) if labels_path else None)
-    evaluate_model(str(model_path), test_data, output_dir)
+    evaluate_model(
+        str(model_path), test_data, output_dir,
+        head_precisions=args.precisions,
+        encoder_precisions=args.encoder_precisions,
+        max_accuracy_drop=args.max_accuracy_drop,
+        min_agreement=args.min_agreement,
+        register=args.register
+    )
 
 if __name__ == '__main__':
     main()
@@ -0,0 +1,107 @@
+#!/usr/bin/env python
+"""
+Model Export Script
+
+Exports a registered model version (encoder + classification head) to
+optimized inference artifacts:
+- TorchScript graphs (torchscript backend)
+- ONNX graphs (onnxruntime backend)
+
+Every artifact is checked for parity against eager PyTorch and
+benchmarked; results are written to export_report.json. The export is
+built in a temporary directory and only replaces the output directory if
+every artifact passes. Point inference.artifact_dir in
+configs/predictor_config.yaml at the output directory to serve it.
+"""
+
+import argparse
+import json
+import logging
+import shutil
+import sys
+import tempfile
+from pathlib import Path
+from smartsynch.models.encoder import get_encoder
+from smartsynch.models.export import EXPORT_FORMATS, export_model
+from smartsynch.models.manager import ModelManager
+from smartsynch.models.predictor import Predictor
+from smartsynch.utils.helpers import load_predictor_config
+
+# Set up logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+def load_sample_texts(data_file: Path, limit: int):
+    """Build parity/benchmark texts from the training data."""
+    with open(data_file) as f:
+        samples = json.load(f)['samples']
+    return [
+        Predictor.combine_text(sample['title'], sample['description'])
+        for sample in samples[:limit]
+    ]
+
+def publish(export_dir: Path, output_dir: Path):
+    """Replace ``output_dir`` with a finished export (same filesystem renames)."""
+    previous = None
+    if output_dir.exists():
+        previous = Path(tempfile.mkdtemp(dir=output_dir.parent, prefix=f".{output_dir.name}.old."))
+        output_dir.rename(previous / output_dir.name)
+    export_dir.rename(output_dir)
+    if previous is not None:
+        shutil.rmtree(previous)
+
+def main():
+    parser = argparse.ArgumentParser(description='Export a trained model for optimized inference')
+    parser.add_argument('--model-path', required=True, help='Path to a trained model.pt')
+    parser.add_argument('--output-dir', required=True, help='Directory for the exported artifact')
+    parser.add_argument('--formats', nargs='+', default=list(EXPORT_FORMATS),
+                        choices=EXPORT_FORMATS, help='Artifacts to export')
+    parser.add_argument('--texts', default='data/training_data.json',
+                        help='Training data used for the parity check and benchmark')
+    parser.add_argument('--num-texts', type=int, default=64)
+    parser.add_argument('--tolerance', type=float, default=1e-3,
+                        help='Largest accepted probability difference against eager')
+    args = parser.parse_args()
+
+    # load_model would fall back to training a new model on a bad path
+    if not Path(args.model_path).exists():
+        raise FileNotFoundError(f"No model found at {args.model_path}")
+
+    config = load_predictor_config()
+    encoder = get_encoder(config['model']['name'])
+    head = ModelManager().load_model(args.model_path)
+    texts = load_sample_texts(Path(args.texts), args.num_texts)
+
+    # Built next to the output so a passing export is moved into place atomically
+    output_dir = Path(args.output_dir).resolve()
+    output_dir.parent.mkdir(parents=True, exist_ok=True)
+    export_dir = Path(tempfile.mkdtemp(dir=output_dir.parent, prefix=f".{output_dir.name}."))
+    try:
+        report = export_model(
+            encoder, head, str(export_dir), texts,
+            formats=args.formats,
+            metadata={'model_path': str(Path(args.model_path).resolve()),
+                      'encoder': config['model']['name']},
+            tolerance=args.tolerance
+        )
+
+        failed = [
+            name for name, result in report['backends'].items()
+            if not result.get('parity', {}).get('passed', True)
+        ]
+        for name, result in report['backends'].items():
+            logger.info(f"{name}: {result}")
+        if failed:
+            logger.error(f"Parity check failed for: {', '.join(failed)}; "
+                         f"{args.output_dir} was left unchanged")
+            sys.exit(1)
+        publish(export_dir, output_dir)
+    finally:
+        shutil.rmtree(export_dir, ignore_errors=True)
+    logger.info(f"Export written to {args.output_dir}")
+
+if __name__ == '__main__':
+    main()
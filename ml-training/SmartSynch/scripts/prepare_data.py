@@ -5,10 +5,14 @@ This script processes the raw training data and prepares it for model training.
 """
 
 import argparse
+import json
 import logging
 from pathlib import Path
 import numpy as np
+from smartsynch.data.dedup import dedup_report, find_duplicates
 from smartsynch.data.processor import DataProcessor
+from smartsynch.models.bundle import activate_bundle
+from smartsynch.models.encoder import encoder_fingerprint
 
 # Set up logging
 logging.basicConfig(
@@ -38,37 +42,157 @@ def main():
         default=0.2,
         help='Proportion of data to use for validation'
     )
+    parser.add_argument(
+        '--store',
+        type=str,
+        default='data/processed/embeddings.sqlite',
+        help='Embedding store reused across runs (only new or changed samples are encoded)'
+    )
+    parser.add_argument(
+        '--num-workers',
+        type=int,
+        default=1,
+        help='Processes used for cleaning and encoding'
+    )
+    parser.add_argument(
+        '--shard-size',
+        type=int,
+        default=256,
+        help='Samples per worker shard'
+    )
+    parser.add_argument(
+        '--no-store',
+        action='store_true',
+        help='Encode every sample without reading or updating the embedding store'
+    )
+    parser.add_argument(
+        '--bundle',
+        type=str,
+        default=None,
+        help='Offline bundle providing the encoder and NLTK data'
+    )
+    parser.add_argument(
+        '--streaming',
+        action='store_true',
+        help='Out-of-core mode: read JSON/JSONL incrementally, hash-split by label '
+             'and append encoded chunks to the output files'
+    )
+    parser.add_argument(
+        '--chunk-size',
+        type=int,
+        default=10000,
+        help='Samples encoded per chunk in streaming mode'
+    )
+    parser.add_argument(
+        '--seed',
+        type=int,
+        default=0,
+        help='Salt of the streaming train/val split hash'
+    )
+    parser.add_argument(
+        '--dedup-threshold',
+        type=float,
+        default=None,
+        help='Collapse samples whose embeddings have at least this cosine similarity '
+             'before splitting, so duplicates cannot leak into val (writes dedup_report.json)'
+    )
     args = parser.parse_args()
+    if args.streaming and args.dedup_threshold is not None:
+        parser.error('--dedup-threshold needs the whole matrix; run scripts/dedup_data.py '
+                     'on the input before --streaming')
 
     try:
+        if args.bundle:
+            activate_bundle(args.bundle)
+
         # Initialize processor
         logger.info("Initializing data processor...")
-        processor = DataProcessor()
-
-        # Prepare data
-        logger.info(f"Processing data from {args.input}...")
-        embeddings, labels = processor.prepare_data(args.input)
-        logger.info(f"Generated {len(embeddings)} embeddings with shape {embeddings.shape}")
-
-        # Split data
-        logger.info(f"Splitting data with test size {args.test_size}...")
-        splits = processor.split_data(embeddings, labels, test_size=args.test_size)
-        X_train, X_val, y_train, y_val = splits
+        processor = DataProcessor(num_workers=args.num_workers, shard_size=args.shard_size)
 
         # Create output directory
         output_dir = Path(args.output)
         output_dir.mkdir(parents=True, exist_ok=True)
+        store_path = None if args.no_store else args.store
+
+        logger.info(f"Processing data from {args.input}...")
+        if args.streaming:
+            # Split files are written chunk by chunk
+            counts = processor.prepare_streaming(
+                args.input, output_dir,
+                test_size=args.test_size,
+                chunk_size=args.chunk_size,
+                store_path=store_path,
+                seed=args.seed
+            )
+            # No row texts are kept when streaming; drop those of an earlier run
+            for split in ('train', 'val'):
+                (output_dir / f"samples_{split}.jsonl").unlink(missing_ok=True)
+            split_sizes = {split: sum(per_label.values()) for split, per_label in counts.items()}
+            num_samples = sum(split_sizes.values())
+            logger.info(f"Wrote {split_sizes} samples to {output_dir}")
+        else:
+            # Prepare data
+            embeddings, labels = processor.prepare_data(args.input, store_path=store_path)
+            logger.info(f"Generated {len(embeddings)} embeddings with shape {embeddings.shape}")
+            sample_ids = np.arange(len(embeddings))
+
+            if args.dedup_threshold is not None:
+                duplicates = find_duplicates(embeddings, args.dedup_threshold)
+                categories = {index: category for category, index in processor.category_map.items()}
+                report = dedup_report(
+                    embeddings, duplicates, [categories[label] for label in labels],
+                    args.dedup_threshold
+                )
+                with open(output_dir / "dedup_report.json", "w") as f:
+                    json.dump(report, f, indent=2)
+                embeddings, labels = embeddings[duplicates['keep']], labels[duplicates['keep']]
+                sample_ids = sample_ids[duplicates['keep']]
+                logger.info(f"Dedup kept {report['kept']} of {report['samples']} samples")
+            num_samples = len(embeddings)
 
-        # Save processed data
-        logger.info(f"Saving processed data to {output_dir}...")
-        np.save(output_dir / "X_train.npy", X_train)
-        np.save(output_dir / "X_val.npy", X_val)
-        np.save(output_dir / "y_train.npy", y_train)
-        np.save(output_dir / "y_val.npy", y_val)
+            # Split row positions, so the texts of each split row are known too
+            logger.info(f"Splitting data with test size {args.test_size}...")
+            train_rows, val_rows, y_train, y_val = processor.split_data(
+                np.arange(num_samples), labels, test_size=args.test_size
+            )
+            X_train, X_val = embeddings[train_rows], embeddings[val_rows]
+
+            # Save processed data
+            logger.info(f"Saving processed data to {output_dir}...")
+            np.save(output_dir / "X_train.npy", X_train)
+            np.save(output_dir / "X_val.npy", X_val)
+            np.save(output_dir / "y_train.npy", y_train)
+            np.save(output_dir / "y_val.npy", y_val)
+            # Texts of the rows, returned with /similar matches
+            with open(args.input) as f:
+                samples = json.load(f)['samples']
+            for split, rows in (('train', train_rows), ('val', val_rows)):
+                with open(output_dir / f"samples_{split}.jsonl", "w") as f:
+                    for sample_id in sample_ids[rows]:
+                        sample = samples[sample_id]
+                        f.write(json.dumps({'title': sample['title'],
+                                            'description': sample.get('description')}) + "\n")
 
         # Save category mapping
         np.save(output_dir / "category_map.npy", processor.category_map)
 
+        # Record which encoder produced the embeddings so checkpoints can
+        # refer to it by name and hash
+        with open(output_dir / "encoder.json", "w") as f:
+            json.dump({
+                "name": processor.encoder_name,
+                "hash": encoder_fingerprint(processor.encoder_name)
+            }, f, indent=2)
+
+        # Embedding store reuse and per-stage throughput of this run
+        with open(output_dir / "prepare_report.json", "w") as f:
+            json.dump({
+                "samples": num_samples,
+                "num_workers": args.num_workers,
+                "store": processor.store_stats,
+                "throughput": processor.throughput
+            }, f, indent=2)
+
         logger.info("Data preparation completed successfully!")
 
     except Exception as e:
@@ -0,0 +1,119 @@
+#!/usr/bin/env python
+"""
+Hyperparameter Sweep Script
+
+Trains classification heads for a search space of hyperparameters (grid,
+random or successive halving) in parallel worker processes that share one
+read-only memory-mapped copy of the prepared embeddings, prunes poor
+trials between rungs, writes a leaderboard and registers the best head
+with the ModelManager.
+"""
+
+import argparse
+import json
+import logging
+import yaml
+from datetime import datetime
+from pathlib import Path
+import numpy as np
+from smartsynch.models import head_training
+from smartsynch.models.manager import ModelManager
+from smartsynch.models.sweep import STRATEGIES, HyperparameterSweep
+
+# Set up logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+def main():
+    parser = argparse.ArgumentParser(description='Run a hyperparameter sweep over the head')
+    parser.add_argument('--config', default='configs/sweep_config.yaml', help='Sweep settings and space')
+    parser.add_argument('--training-config', default='configs/training_config.yaml',
+                        help='Defaults for parameters outside the space')
+    parser.add_argument('--data-dir', default='data/processed', help='Output of prepare_data.py')
+    parser.add_argument('--strategy', choices=STRATEGIES, help='Overrides sweep.strategy')
+    parser.add_argument('--num-trials', type=int, help='Overrides sweep.num_trials')
+    parser.add_argument('--max-epochs', type=int, help='Overrides sweep.max_epochs')
+    parser.add_argument('--workers', type=int, help='Overrides sweep.workers')
+    parser.add_argument('--output-dir', default='models/sweeps', help='Parent directory of sweep reports')
+    parser.add_argument('--no-register', action='store_true', help='Do not register the best head')
+    args = parser.parse_args()
+
+    with open(args.config) as f:
+        config = yaml.safe_load(f)
+    with open(args.training_config) as f:
+        model_config = yaml.safe_load(f)['model']
+    settings = config['sweep']
+    for name in ('strategy', 'num_trials', 'max_epochs', 'workers'):
+        if getattr(args, name) is not None:
+            settings[name] = getattr(args, name)
+
+    data_dir = Path(args.data_dir)
+    category_map = np.load(data_dir / "category_map.npy", allow_pickle=True).item()
+    # Workers memory-map these; the page cache holds the only copy
+    specs = {name: head_training.file_spec(data_dir / f"{name}.npy")
+             for name in ('X_train', 'y_train', 'X_val', 'y_val')}
+    defaults = {
+        'learning_rate': model_config['learning_rate'],
+        'dropout_rate': model_config['dropout_rate'],
+        'batch_size': model_config['batch_size'],
+        'early_stopping_patience': model_config['early_stopping_patience'],
+    }
+
+    sweep = HyperparameterSweep(
+        specs, config['space'], len(category_map),
+        strategy=settings['strategy'],
+        num_trials=settings['num_trials'],
+        max_epochs=settings['max_epochs'],
+        min_epochs=settings['min_epochs'],
+        eta=settings['eta'],
+        prune=settings['prune'],
+        workers=settings['workers'],
+        seed=settings['seed'],
+        defaults=defaults
+    )
+    leaderboard = sweep.run()
+
+    # Timestamp first, like training runs: the latest-model loader picks the
+    # greatest version name
+    version = f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_sweep"
+    output_dir = Path(args.output_dir) / version
+    output_dir.mkdir(parents=True, exist_ok=True)
+    report = {
+        'settings': settings,
+        'space': config['space'],
+        'rungs': sweep.rungs,
+        'seconds': round(sweep.seconds, 3),
+        'leaderboard': leaderboard,
+    }
+    best = sweep.best()
+    if not args.no_register:
+        model = head_training.best_head(
+            best['state'], best['params'], len(category_map),
+            int(np.load(data_dir / "X_train.npy", mmap_mode='r').shape[1])
+        )
+        encoder_file = data_dir / "encoder.json"
+        if encoder_file.exists():
+            with open(encoder_file) as f:
+                encoder = json.load(f)
+            model.encoder_name = encoder['name']
+            model.config['encoder_hash'] = encoder['hash']
+        metrics = {**best['metrics'], 'best_val_loss': best['state']['best_val_loss'],
+                   'params': best['params']}
+        ModelManager(model_config['model_dir']).save_model(model, version, category_map, metrics)
+        report['registered'] = str(Path(model_config['model_dir']) / version)
+
+    with open(output_dir / "leaderboard.json", "w") as f:
+        json.dump(report, f, indent=2)
+
+    for entry in leaderboard[:5]:
+        logger.info(f"#{entry['rank']} trial {entry['trial']} ({entry['status']}, "
+                    f"{entry['epochs']} epochs): val loss {entry['best_val_loss']:.4f}, "
+                    f"accuracy {entry['accuracy']:.3f}, f1 {entry['f1']:.3f} {entry['params']}")
+    logger.info(f"Wrote {output_dir / 'leaderboard.json'}"
+                + (f"; registered {report['registered']}" if 'registered' in report else ''))
+
+if __name__ == '__main__':
+    main()
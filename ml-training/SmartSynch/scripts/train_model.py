@@ -11,6 +11,7 @@ This script handles model training with:
 """
 
 import argparse
+import json
 import logging
 import yaml
 from pathlib import Path
@@ -18,6 +19,7 @@ import torch
 from torch.utils.data import DataLoader, TensorDataset
 import numpy as np
 from datetime import datetime
+from smartsynch.data.batches import InMemoryBatches
 from smartsynch.models.classifier import TaskClassifier
 from smartsynch.models.manager import ModelManager
 from smartsynch.utils.metrics import compute_metrics
@@ -39,6 +41,15 @@ def load_training_data(data_dir: Path):
     
     return X_train, X_val, y_train, y_val, category_map
 
+def load_encoder_info(data_dir: Path, encoder_name: str):
+    """Name and hash of the encoder that produced the embeddings."""
+    info_file = data_dir / "encoder.json"
+    if info_file.exists():
+        with open(info_file) as f:
+            return json.load(f)
+    logger.warning(f"No encoder.json in {data_dir}; checkpoints will not record an encoder hash")
+    return {"name": encoder_name, "hash": None}
+
 def create_data_loaders(X_train, X_val, y_train, y_val, batch_size):
     """Create PyTorch data loaders."""
     train_dataset = TensorDataset(
@@ -55,6 +66,14 @@ def create_data_loaders(X_train, X_val, y_train, y_val, batch_size):
     
     return train_loader, val_loader
 
+def create_in_memory_batches(X_train, X_val, y_train, y_val, batch_size, device,
+                             val_batch_size=4096):
+    """Batches sliced from tensors loaded onto the device once."""
+    train_batches = InMemoryBatches(X_train, y_train, batch_size, shuffle=True, device=device)
+    # Validation needs no gradients, so it runs in a few large batches
+    val_batches = InMemoryBatches(X_val, y_val, max(batch_size, val_batch_size), device=device)
+    return train_batches, val_batches
+
 def train_epoch(model, train_loader, criterion, optimizer, device):
     """Train for one epoch."""
     model.train()
@@ -104,11 +123,23 @@ def main():
     parser = argparse.ArgumentParser(description='Train task categorization model')
     parser.add_argument('--config', type=str, default='configs/training_config.yaml')
     parser.add_argument('--data-dir', type=str, default='data/processed')
+    parser.add_argument('--resume', type=str, default=None,
+                        help='Checkpoint file or run directory to resume from')
+    parser.add_argument('--fast', action='store_true',
+                        help='Slice batches from tensors preloaded on the device instead of DataLoaders')
+    parser.add_argument('--compile', action='store_true',
+                        help='torch.compile the head for training')
+    parser.add_argument('--bf16', action='store_true',
+                        help='bfloat16 autocast for the forward passes')
     args = parser.parse_args()
     
     # Load config
     with open(args.config) as f:
         config = yaml.safe_load(f)
+    training = config['training']
+    fast = args.fast or training.get('fast', False)
+    compile_head = args.compile or training.get('compile', False)
+    bf16 = args.bf16 or training.get('bf16', False)
     
     # Set device
     device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
@@ -119,15 +150,26 @@ def main():
     X_train, X_val, y_train, y_val, category_map = load_training_data(data_dir)
     
     # Create data loaders
-    train_loader, val_loader = create_data_loaders(
-        X_train, X_val, y_train, y_val, 
-        config['training']['batch_size']
-    )
+    if fast:
+        train_loader, val_loader = create_in_memory_batches(
+            X_train, X_val, y_train, y_val,
+            training['batch_size'], device
+        )
+    else:
+        train_loader, val_loader = create_data_loaders(
+            X_train, X_val, y_train, y_val, 
+            training['batch_size']
+        )
     
     # Get unique categories from your data
     unique_categories = np.unique(y_train)
     config['model']['num_classes'] = len(unique_categories)
     
+    # Checkpoints refer to the encoder instead of storing its weights
+    encoder_info = load_encoder_info(data_dir, config['model']['name'])
+    config['model']['encoder_name'] = encoder_info['name']
+    config['model']['encoder_hash'] = encoder_info['hash']
+    
     # Create the model
     model = TaskClassifier(config['model']).to(device)
     
@@ -135,11 +177,27 @@ def main():
     criterion = torch.nn.CrossEntropyLoss()
     optimizer = torch.optim.Adam(
         model.parameters(),
-        lr=config['model']['learning_rate']
+        lr=config['model']['learning_rate'],
+        # One multi-tensor kernel per step instead of one per parameter
+        foreach=True if fast else None
     )
     
+    # Resume from the last checkpoint if requested
+    start_epoch = 0
+    if args.resume:
+        start_epoch = model.resume(args.resume, optimizer)
+    
     # Train the model
-    model.train_model(train_loader, val_loader, criterion, optimizer, device)
+    model.train_model(train_loader, val_loader, criterion, optimizer, device,
+                      start_epoch=start_epoch, compile_head=compile_head,
+                      autocast_dtype=torch.bfloat16 if bf16 else None)
+    
+    epochs_run = len(model.history['train_loss']) - start_epoch
+    if epochs_run > 0:
+        epoch_times = model.history['epoch_time'][-epochs_run:]
+        throughput = model.history['samples_per_sec'][-epochs_run:]
+        logger.info(f"Mean epoch time {np.mean(epoch_times):.3f}s, "
+                    f"{np.mean(throughput):.0f} samples/sec")
 
 if __name__ == "__main__":
     main()
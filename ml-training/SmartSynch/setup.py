@@ -1,12 +1,7 @@
 from setuptools import setup as setuptools_setup, find_packages
-import nltk
 
-def download_nltk_data():
-    nltk.download('punkt')
-    nltk.download('punkt_tab')
-
-if __name__ == "__main__":
-    download_nltk_data()
+# NLTK data is not downloaded at install time; it ships in the model
+# bundle (scripts/build_bundle.py)
 
 setuptools_setup(
     name="smartsynch",
@@ -24,6 +19,7 @@ setuptools_setup(
         "numpy",
         "pandas",
         "scikit-learn",
+        "pyyaml",
         "nltk",
         "spacy",
     ],
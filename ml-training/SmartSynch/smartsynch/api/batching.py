@@ -0,0 +1,172 @@
+"""
+Micro-Batching
+
+Asyncio micro-batcher that gathers concurrent single-item requests into
+batches, so the model runs one batched forward pass instead of many
+batch-size-1 passes under load.
+"""
+
+import asyncio
+import logging
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class MicroBatcher:
+    """Collects concurrent requests and processes them in batches."""
+
+    def __init__(self, process_batch: Callable[[List[Any]], List[Any]],
+                 max_batch_size: int = 32, max_wait_ms: float = 5.0,
+                 name: str = "batcher", executor=None):
+        """
+        Initialize the batcher.
+
+        Args:
+            process_batch: Blocking function mapping a list of items to a list
+                of results in the same order
+            max_batch_size: Largest batch handed to ``process_batch``
+            max_wait_ms: Longest time the first queued item waits for more
+                items before its batch is dispatched
+            name: Name used in logs and metrics
+            executor: InferenceExecutor to run batches on (None: the loop's
+                default executor)
+        """
+        self.process_batch = process_batch
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self.name = name
+        self.executor = executor
+
+        self._queue: Optional[asyncio.Queue] = None
+        self._item_added: Optional[asyncio.Event] = None
+        self._worker: Optional[asyncio.Task] = None
+
+        # Metrics
+        self.batch_size_histogram: Dict[int, int] = {}
+        self.max_queue_depth = 0
+        self.total_items = 0
+        self.total_batches = 0
+        self.failed_batches = 0
+
+    def _ensure_started(self):
+        """Start the worker task on the running loop if needed."""
+        loop = asyncio.get_running_loop()
+        if (self._worker is None or self._worker.done()
+                or self._worker.get_loop() is not loop):
+            self._queue = asyncio.Queue()
+            self._item_added = asyncio.Event()
+            self._worker = loop.create_task(self._run())
+
+    async def submit(self, item: Any) -> Any:
+        """
+        Queue one item and wait for its result.
+
+        Args:
+            item: Input passed (as part of a batch) to ``process_batch``
+
+        Returns:
+            The result produced for this item
+        """
+        self._ensure_started()
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((item, future))
+        self._item_added.set()
+        self.max_queue_depth = max(self.max_queue_depth, self._queue.qsize())
+        return await future
+
+    async def _collect(self) -> List[Tuple[Any, asyncio.Future]]:
+        """Wait for one item, then gather more until full or timed out."""
+        batch = [await self._queue.get()]
+        deadline = time.monotonic() + self.max_wait
+
+        while len(batch) < self.max_batch_size:
+            if not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+                continue
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            # Wait on an event rather than queue.get() so a timeout can
+            # never swallow an item
+            self._item_added.clear()
+            try:
+                await asyncio.wait_for(self._item_added.wait(), remaining)
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _dispatch(self, items: List[Any]) -> List[Any]:
+        """Run the blocking batch function off the event loop."""
+        if self.executor is not None:
+            return await self.executor.run(self.process_batch, items)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self.process_batch, items)
+
+    async def _run(self):
+        while True:
+            batch = await self._collect()
+            # Callers that went away no longer need a result
+            batch = [(item, future) for item, future in batch if not future.done()]
+            if not batch:
+                continue
+
+            items = [item for item, _ in batch]
+            self._record(len(items))
+            try:
+                results = await self._dispatch(items)
+                if len(results) != len(items):
+                    raise RuntimeError(
+                        f"{self.name}: got {len(results)} results for {len(items)} items"
+                    )
+            except Exception as e:
+                self.failed_batches += 1
+                logger.error(f"{self.name} batch of {len(items)} failed: {str(e)}")
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+
+            for (_, future), result in zip(batch, results):
+                if not future.done():
+                    future.set_result(result)
+
+    def _record(self, batch_size: int):
+        """Update batch-size metrics."""
+        # Power-of-two buckets: 1, 2, 4, 8, ...
+        bucket = 1
+        while bucket < batch_size:
+            bucket *= 2
+        self.batch_size_histogram[bucket] = self.batch_size_histogram.get(bucket, 0) + 1
+        self.total_items += batch_size
+        self.total_batches += 1
+
+    def stats(self) -> Dict:
+        """Queue depth and batch-size metrics."""
+        return {
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait * 1000.0,
+            "queue_depth": self._queue.qsize() if self._queue is not None else 0,
+            "max_queue_depth": self.max_queue_depth,
+            "total_items": self.total_items,
+            "total_batches": self.total_batches,
+            "failed_batches": self.failed_batches,
+            "mean_batch_size": (
+                self.total_items / self.total_batches if self.total_batches else 0.0
+            ),
+            "batch_size_histogram": {
+                f"<={bucket}": count
+                for bucket, count in sorted(self.batch_size_histogram.items())
+            },
+        }
+
+    async def stop(self):
+        """Cancel the worker task."""
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
@@ -0,0 +1,119 @@
+"""
+Confidence Cascade
+
+Two-tier classification: every task is answered by the fast fine-tuned
+Predictor first, and only predictions below a confidence threshold are
+escalated to the (much more expensive) zero-shot NLI model, scored over
+the Predictor's own categories. Responses record which tier answered,
+and escalation counters are exposed as metrics.
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from typing import Awaitable, Callable, Dict, List, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+TIER_PREDICTOR = "predictor"
+TIER_ZERO_SHOT = "zero_shot"
+
+
+class Cascade:
+    """Escalates low-confidence predictions to a zero-shot model."""
+
+    def __init__(self, categories: Sequence[str], threshold: float, model_name: str,
+                 classify: Callable[[str, List[str]], Awaitable[Dict]]):
+        """
+        Initialize the cascade.
+
+        Args:
+            categories: The Predictor's categories (zero-shot candidate labels)
+            threshold: Predictions with lower confidence are escalated
+            model_name: Zero-shot model answering escalations
+            classify: Coroutine function (text, labels) -> zero-shot result
+        """
+        self.categories = list(categories)
+        self.threshold = threshold
+        self.model_name = model_name
+        self.classify = classify
+
+        self._lock = threading.Lock()
+        self._counters = dict.fromkeys(
+            ('requests', 'escalations', 'escalation_failures', 'answered_by_zero_shot'), 0
+        )
+        self._escalation_seconds = 0.0
+
+    def _count(self, name: str, value: int = 1):
+        with self._lock:
+            self._counters[name] += value
+
+    @staticmethod
+    def zero_shot_text(title: str, description: Optional[str] = None) -> str:
+        """Text sent to the zero-shot model (same form as its own route)."""
+        return f"{title}. {description}" if description else title
+
+    async def resolve(self, result: Dict, title: str, description: Optional[str] = None) -> Dict:
+        """
+        Keep a confident Predictor result or replace it with the zero-shot answer.
+
+        Args:
+            result: Predictor result dict
+            title: Task title
+            description: Task description
+
+        Returns:
+            Result dict with a "tier" field; escalated answers also carry the
+            Predictor's own "predictor_confidence"
+        """
+        self._count('requests')
+        if result['confidence'] >= self.threshold:
+            return {**result, 'tier': TIER_PREDICTOR}
+
+        self._count('escalations')
+        start = time.perf_counter()
+        try:
+            answer = await self.classify(self.zero_shot_text(title, description), self.categories)
+        except Exception as e:
+            # The Predictor's answer is still a valid (if unsure) response
+            logger.warning(f"Escalation to {self.model_name} failed: {str(e)}")
+            self._count('escalation_failures')
+            return {**result, 'tier': TIER_PREDICTOR}
+        with self._lock:
+            self._escalation_seconds += time.perf_counter() - start
+            self._counters['answered_by_zero_shot'] += 1
+
+        scores = dict(zip(answer['labels'], answer['scores']))
+        category = answer['labels'][0]
+        return {
+            'category': category,
+            'category_id': self.categories.index(category),
+            'confidence': scores[category],
+            'probabilities': {label: scores[label] for label in self.categories},
+            'tier': TIER_ZERO_SHOT,
+            'predictor_confidence': result['confidence'],
+        }
+
+    async def resolve_many(self, results: List[Dict], tasks: List[Dict[str, str]]) -> List[Dict]:
+        """Resolve a batch; escalations run concurrently and share zero-shot batches."""
+        return list(await asyncio.gather(*(
+            self.resolve(result, task['title'], task.get('description'))
+            for result, task in zip(results, tasks)
+        )))
+
+    def stats(self) -> Dict:
+        """Escalation counters for the metrics endpoint."""
+        with self._lock:
+            counters = dict(self._counters)
+            escalation_seconds = self._escalation_seconds
+        answered = counters['answered_by_zero_shot']
+        return {
+            'threshold': self.threshold,
+            'model': self.model_name,
+            **counters,
+            'escalation_rate': (
+                counters['escalations'] / counters['requests'] if counters['requests'] else 0.0
+            ),
+            'mean_escalation_ms': 1000.0 * escalation_seconds / answered if answered else 0.0,
+        }
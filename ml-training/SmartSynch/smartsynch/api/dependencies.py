@@ -4,20 +4,150 @@ API Dependencies
 Dependency injection for FastAPI routes.
 """
 
+import logging
 from functools import lru_cache
-from redis import Redis
+from typing import Optional
+from redis.asyncio import Redis
+from ..data.processor import ensure_nltk_data
 from ..models.predictor import Predictor
+from ..models.executor import InferenceExecutor, shared_executor
+from ..models.vector_index import build_index, load_labeled_embeddings, load_texts
+from ..utils.helpers import load_predictor_config
+from .batching import MicroBatcher
+from .cascade import Cascade
+from .metrics import register_metrics
+from .prediction_cache import PredictionCache
+from .redis_pool import get_client
+from .similar import SOURCE_TRAIN, SimilarTasks
+from . import zero_shot
+
+logger = logging.getLogger(__name__)
+
+@lru_cache()
+def get_inference_executor() -> InferenceExecutor:
+    """Get the bounded executor all blocking inference runs on."""
+    executor = shared_executor(load_predictor_config()['executor'])
+    register_metrics("inference_executor", executor.stats)
+    return executor
 
 @lru_cache()
 def get_predictor():
     """Get or create TaskPredictor instance."""
-    return Predictor()
-
-def get_redis_client():
-    """Get Redis client instance."""
-    return Redis(
-        host="localhost",
-        port=6379,
-        db=0,
-        decode_responses=True
-    ) 
\ No newline at end of file
+    predictor = Predictor()
+    register_metrics("embedding_cache", predictor.embedding_cache.stats)
+    # Its async methods run on the shared inference executor
+    get_inference_executor()
+    return predictor
+
+@lru_cache()
+def get_prediction_batcher():
+    """Get or create the micro-batcher in front of the predictor."""
+    predictor = get_predictor()
+    batching = predictor.config['batching']
+    batcher = MicroBatcher(
+        predictor.batch_predict,
+        max_batch_size=batching['max_batch_size'],
+        max_wait_ms=batching['max_wait_ms'],
+        name="predict",
+        executor=get_inference_executor()
+    )
+    register_metrics("predict_batcher", batcher.stats)
+    return batcher
+
+@lru_cache()
+def get_prediction_cache():
+    """Get or create the Redis prediction cache for the serving model."""
+    predictor = get_predictor()
+    settings = dict(predictor.config['prediction_cache'])
+    settings.pop('enabled', None)
+    model_version = predictor.model_version
+    cascade = get_cascade()
+    if cascade is not None:
+        # Cascaded answers depend on the zero-shot tier too
+        model_version = f"{model_version}+{cascade.model_name}@{cascade.threshold}"
+    cache = PredictionCache(model_version, **settings)
+    register_metrics("prediction_cache", cache.stats)
+    return cache
+
+@lru_cache()
+def get_cascade() -> Optional[Cascade]:
+    """Get the predictor -> zero-shot cascade, or None when it is disabled."""
+    predictor = get_predictor()
+    settings = predictor.config['cascade']
+    if not settings['enabled']:
+        return None
+    model_name = settings['model']
+    if model_name not in zero_shot.MODEL_CONFIGS:
+        raise ValueError(f"Unknown cascade model: {model_name}")
+    executor = get_inference_executor()
+
+    async def classify(text, labels):
+        return await zero_shot.classify(model_name, text, labels, executor)
+
+    cascade = Cascade(predictor.categories, settings['threshold'], model_name, classify)
+    register_metrics("cascade", cascade.stats)
+    return cascade
+
+# Set once get_similar_tasks has built the index
+_similar_tasks: Optional[SimilarTasks] = None
+
+@lru_cache()
+def get_similar_tasks() -> Optional[SimilarTasks]:
+    """
+    Get the similar-task index over the training embeddings.
+
+    Returns None when the index is disabled or the prepared embeddings are
+    missing, so a serving image without data still starts.
+    """
+    global _similar_tasks
+    predictor = get_predictor()
+    settings = predictor.config['vector_index']
+    if not settings['enabled']:
+        return None
+    try:
+        vectors, labels = load_labeled_embeddings(settings['data_dir'])
+    except FileNotFoundError as e:
+        logger.warning(f"Vector index disabled, no prepared embeddings: {str(e)}")
+        return None
+    try:
+        # Queries are cleaned like the prepared embeddings (see Predictor.embed)
+        ensure_nltk_data()
+    except LookupError as e:
+        logger.warning(f"Vector index disabled: {str(e)}")
+        return None
+    texts = load_texts(settings['data_dir'])
+    if texts is None or len(texts) != len(labels):
+        # Prepared without texts (streaming): matches carry id and category only
+        payloads = [{'source': SOURCE_TRAIN}] * len(labels)
+    else:
+        payloads = [{'source': SOURCE_TRAIN, **text} for text in texts]
+    index = build_index(
+        vectors, labels, payloads,
+        kind=settings['kind'],
+        exact_limit=settings['exact_limit'],
+        nlist=settings['nlist'],
+        nprobe=settings['nprobe']
+    )
+    similar = SimilarTasks(
+        index, predictor.embed, predictor.executor,
+        insert_predictions=settings['insert_predictions'],
+        min_confidence=settings['min_confidence'],
+        max_predictions=settings['max_predictions']
+    )
+    register_metrics("vector_index", similar.stats)
+    _similar_tasks = similar
+    return similar
+
+def loaded_similar_tasks() -> Optional[SimilarTasks]:
+    """
+    The similar-task index if it has already been built, else None.
+
+    Prediction routes index their tasks through this instead of depending
+    on get_similar_tasks, so predictions never wait for (or fail on)
+    building the index.
+    """
+    return _similar_tasks
+
+def get_redis_client() -> Redis:
+    """Get an asyncio Redis client backed by the application connection pool."""
+    return get_client()
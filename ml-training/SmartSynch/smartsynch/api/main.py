@@ -4,11 +4,25 @@ FastAPI Application
 Main FastAPI application for model serving.
 """
 
+from ..utils.startup import FirstRequestMiddleware, profiler
+import asyncio
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from .routes import models  # import the new router
+from . import zero_shot
+from .routes import predictions, metrics, similar
+from .dependencies import (
+    get_predictor, get_prediction_batcher, get_inference_executor, get_similar_tasks
+)
+from .metrics import register_metrics
+from .redis_pool import close_pool
+from ..models.executor import shutdown_shared_executor
+from ..models.bundle import activate_configured_bundle
+from ..utils.helpers import load_predictor_config
 import logging
 
+profiler.mark("app_imported")
+
 # Set up logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -29,9 +43,55 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Outermost middleware: records when the first request completes
+app.add_middleware(FirstRequestMiddleware)
+register_metrics("startup", profiler.report)
+
+# Include the fine-tuned predictor routes before the models router so
+# /predict/batch is not captured by /predict/{model_name}
+app.include_router(predictions.router, prefix="/api/v1")
+app.include_router(metrics.router, prefix="/api/v1")
+app.include_router(similar.router, prefix="/api/v1")
+
 # Include the models router
 app.include_router(models.router, prefix="/api/v1")
 
+@app.on_event("startup")
+async def warm_up():
+    """Load the predictor (and run one prediction) before serving."""
+    profiler.mark("startup_event")
+    config = load_predictor_config()
+    with profiler.phase("bundle_activation"):
+        activate_configured_bundle(config)
+    startup = config['startup']
+    loop = asyncio.get_running_loop()
+    if startup['preload']:
+        with profiler.phase("predictor_load"):
+            predictor = await loop.run_in_executor(None, get_predictor)
+        if startup['warmup']:
+            with profiler.phase("warmup"):
+                await predictor.apredict("Warm-up task", "Startup warm-up prediction")
+        with profiler.phase("vector_index"):
+            await loop.run_in_executor(None, get_similar_tasks)
+    if config['zero_shot']['preload']:
+        with profiler.phase("zero_shot_preload"):
+            await loop.run_in_executor(None, zero_shot.preload_models)
+    profiler.mark("ready")
+
+@app.on_event("shutdown")
+async def stop_batchers():
+    await zero_shot.stop_batchers()
+    if get_prediction_batcher.cache_info().currsize:
+        await get_prediction_batcher().stop()
+        get_prediction_batcher.cache_clear()
+    # Both are rebuilt on the next startup
+    get_inference_executor.cache_clear()
+    shutdown_shared_executor()
+
+@app.on_event("shutdown")
+async def close_redis():
+    await close_pool()
+
 @app.get("/health")
 async def health_check():
     return {"status": "healthy"} 
\ No newline at end of file
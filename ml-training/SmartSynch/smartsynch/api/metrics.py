@@ -0,0 +1,24 @@
+"""
+Runtime Metrics
+
+Registry of metrics providers (batchers, caches, ...) exposed by the
+/metrics route.
+"""
+
+from typing import Callable, Dict
+
+_providers: Dict[str, Callable[[], Dict]] = {}
+
+def register_metrics(name: str, provider: Callable[[], Dict]):
+    """
+    Register a metrics provider.
+
+    Args:
+        name: Section name in the metrics response
+        provider: Function returning a JSON-serializable dict
+    """
+    _providers[name] = provider
+
+def collect_metrics() -> Dict[str, Dict]:
+    """Collect the current metrics from every registered provider."""
+    return {name: provider() for name, provider in _providers.items()}
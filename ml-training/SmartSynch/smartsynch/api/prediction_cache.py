@@ -0,0 +1,171 @@
+"""
+Prediction Cache
+
+Redis cache of /predict results keyed by a hash of the normalized title
+and description plus the model version, so identical tasks are only
+classified once per model and a new model never serves old results.
+
+A miss takes a short-lived lock (SET NX PX) on the key. Only the lock
+holder runs inference; other workers asking for the same key poll for
+its result instead of stampeding the model. Redis failures degrade to
+uncached inference. All Redis calls go through the asyncio client, and
+storing a result and releasing its lock share one round trip.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import re
+import threading
+import time
+import unicodedata
+import uuid
+from typing import Awaitable, Callable, Dict, Optional
+
+from redis import RedisError, WatchError
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = "pred:v1"
+
+
+def normalize_text(text: Optional[str]) -> str:
+    """Unicode-normalize, lowercase and collapse whitespace."""
+    text = unicodedata.normalize('NFKC', text or '')
+    return re.sub(r'\s+', ' ', text).strip().lower()
+
+
+def prediction_key(title: str, description: Optional[str], model_version: str) -> str:
+    """Cache key for a task under a model version."""
+    content = f"{normalize_text(title)}\x1f{normalize_text(description)}"
+    digest = hashlib.sha256(content.encode('utf-8')).hexdigest()
+    return f"{KEY_PREFIX}:{model_version}:{digest}"
+
+
+class PredictionCache:
+    """Content-hash prediction cache with stampede protection."""
+
+    def __init__(self, model_version: str, ttl_s: int = 3600,
+                 lock_ttl_ms: int = 5000, wait_timeout_ms: int = 2000,
+                 poll_interval_ms: int = 20):
+        """
+        Initialize the cache.
+
+        Args:
+            model_version: Identifier of the serving model; part of every key
+            ttl_s: Lifetime of cached predictions
+            lock_ttl_ms: Lifetime of a compute lock (bounds a crashed holder)
+            wait_timeout_ms: How long a waiter polls before computing itself
+            poll_interval_ms: Delay between polls while waiting
+        """
+        self.model_version = model_version
+        self.ttl_s = ttl_s
+        self.lock_ttl_ms = lock_ttl_ms
+        self.wait_timeout_ms = wait_timeout_ms
+        self.poll_interval_ms = poll_interval_ms
+
+        self._lock = threading.Lock()
+        self._counters = dict.fromkeys(
+            ('hits', 'misses', 'waits', 'wait_hits', 'wait_timeouts', 'errors'), 0
+        )
+
+    def _count(self, name: str):
+        with self._lock:
+            self._counters[name] += 1
+
+    def key(self, title: str, description: Optional[str]) -> str:
+        return prediction_key(title, description, self.model_version)
+
+    async def _get(self, redis_client, key: str) -> Optional[Dict]:
+        cached = await redis_client.get(key)
+        return json.loads(cached) if cached else None
+
+    async def _release(self, redis_client, lock_key: str, token: str,
+                       key: Optional[str] = None, result: Optional[Dict] = None):
+        """
+        Delete the lock if we still hold it, storing the result in the same
+        transaction when one is given.
+        """
+        async with redis_client.pipeline() as pipe:
+            try:
+                await pipe.watch(lock_key)
+                held = await pipe.get(lock_key) == token
+                pipe.multi()
+                if result is not None:
+                    pipe.set(key, json.dumps(result), ex=self.ttl_s)
+                if held:
+                    pipe.delete(lock_key)
+                await pipe.execute()
+            except WatchError:
+                # Lock expired and was taken over; it is not ours to delete
+                if result is not None:
+                    await redis_client.set(key, json.dumps(result), ex=self.ttl_s)
+
+    async def get_or_compute(self, redis_client, title: str, description: Optional[str],
+                             compute: Callable[[], Awaitable[Dict]]) -> Dict:
+        """
+        Return the cached prediction for a task or compute and cache it.
+
+        Args:
+            redis_client: Async Redis client (decode_responses=True)
+            title: Task title
+            description: Task description
+            compute: Coroutine function producing the prediction
+
+        Returns:
+            Prediction dict
+        """
+        key = self.key(title, description)
+        lock_key = f"{key}:lock"
+        token = uuid.uuid4().hex
+        try:
+            cached = await self._get(redis_client, key)
+            if cached is not None:
+                self._count('hits')
+                return cached
+            self._count('misses')
+            locked = await redis_client.set(lock_key, token, nx=True, px=self.lock_ttl_ms)
+        except RedisError as e:
+            logger.warning(f"Prediction cache unavailable: {e}")
+            self._count('errors')
+            return await compute()
+
+        if not locked:
+            # Another worker is computing this key; wait for its result
+            self._count('waits')
+            deadline = time.monotonic() + self.wait_timeout_ms / 1000.0
+            while time.monotonic() < deadline:
+                await asyncio.sleep(self.poll_interval_ms / 1000.0)
+                try:
+                    cached = await self._get(redis_client, key)
+                except RedisError:
+                    break
+                if cached is not None:
+                    self._count('wait_hits')
+                    return cached
+            self._count('wait_timeouts')
+            return await compute()
+
+        result = None
+        try:
+            result = await compute()
+            return result
+        finally:
+            try:
+                await self._release(redis_client, lock_key, token, key, result)
+            except RedisError as e:
+                # The lock expires on its own
+                logger.warning(f"Could not cache prediction: {e}")
+                self._count('errors')
+
+    def stats(self) -> Dict:
+        """Counters for the metrics endpoint."""
+        with self._lock:
+            counters = dict(self._counters)
+        lookups = counters['hits'] + counters['misses']
+        return {
+            'model_version': self.model_version,
+            **counters,
+            'hit_rate': counters['hits'] / lookups if lookups else 0.0,
+        }
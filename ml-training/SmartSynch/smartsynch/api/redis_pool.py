@@ -0,0 +1,87 @@
+"""
+Redis Connection Pool
+
+One asyncio Redis connection pool per process, configured from the
+environment (REDIS_HOST, REDIS_PORT, REDIS_DB, REDIS_PASSWORD,
+REDIS_MAX_CONNECTIONS). Route handlers get lightweight clients that borrow
+connections from the pool, so requests neither open their own connections
+nor block the event loop on Redis I/O.
+"""
+
+import logging
+import os
+from typing import Any, Dict, List, Optional, Sequence
+
+from redis.asyncio import ConnectionPool, Redis
+
+logger = logging.getLogger(__name__)
+
+_pool: Optional[ConnectionPool] = None
+
+
+def redis_settings(environ: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+    """
+    Connection settings from the environment.
+
+    Args:
+        environ: Mapping to read (defaults to os.environ)
+
+    Returns:
+        Keyword arguments for ConnectionPool
+    """
+    environ = os.environ if environ is None else environ
+    return {
+        'host': environ.get('REDIS_HOST', 'localhost'),
+        'port': int(environ.get('REDIS_PORT', 6379)),
+        'db': int(environ.get('REDIS_DB', 0)),
+        'password': environ.get('REDIS_PASSWORD') or None,
+        'max_connections': int(environ.get('REDIS_MAX_CONNECTIONS', 64)),
+        'socket_timeout': float(environ.get('REDIS_SOCKET_TIMEOUT', 2.0)),
+        'socket_connect_timeout': float(environ.get('REDIS_CONNECT_TIMEOUT', 2.0)),
+        'health_check_interval': 30,
+        'decode_responses': True,
+    }
+
+
+def get_pool() -> ConnectionPool:
+    """The process-wide connection pool, created on first use."""
+    global _pool
+    if _pool is None:
+        settings = redis_settings()
+        _pool = ConnectionPool(**settings)
+        logger.info(f"Redis pool for {settings['host']}:{settings['port']}/{settings['db']} "
+                    f"(max {settings['max_connections']} connections)")
+    return _pool
+
+
+def get_client() -> Redis:
+    """A client backed by the shared pool (cheap; no connection is opened)."""
+    return Redis(connection_pool=get_pool())
+
+
+async def close_pool():
+    """Disconnect every pooled connection; the next get_pool() starts fresh."""
+    global _pool
+    if _pool is not None:
+        pool, _pool = _pool, None
+        await pool.disconnect()
+
+
+async def pipelined(redis_client, commands: Sequence[Sequence], transaction: bool = True) -> List:
+    """
+    Send several commands in one round trip.
+
+    Args:
+        redis_client: Async Redis client
+        commands: (command, *args) tuples, with an optional trailing dict of
+            keyword arguments, e.g. ("set", key, value, {"ex": 60})
+        transaction: Wrap the commands in MULTI/EXEC
+
+    Returns:
+        One reply per command
+    """
+    async with redis_client.pipeline(transaction=transaction) as pipe:
+        for name, *args in commands:
+            kwargs = args.pop() if args and isinstance(args[-1], dict) else {}
+            getattr(pipe, name)(*args, **kwargs)
+        return await pipe.execute()
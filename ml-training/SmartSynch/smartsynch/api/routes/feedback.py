@@ -10,6 +10,7 @@ from typing import Optional
 import json
 from datetime import datetime
 from ..dependencies import get_redis_client
+from ..redis_pool import pipelined
 
 router = APIRouter()
 
@@ -35,17 +36,12 @@ async def submit_feedback(
             "timestamp": datetime.utcnow().isoformat()
         }
         
-        # Store feedback in Redis
-        redis_client.lpush(
-            "prediction_feedback",
-            json.dumps(feedback_data)
-        )
-        
-        # Update feedback stats
-        if feedback.accepted:
-            redis_client.hincrby("feedback_stats", "accepted", 1)
-        else:
-            redis_client.hincrby("feedback_stats", "rejected", 1)
+        # Store feedback and update stats in one round trip
+        outcome = "accepted" if feedback.accepted else "rejected"
+        await pipelined(redis_client, [
+            ("lpush", "prediction_feedback", json.dumps(feedback_data)),
+            ("hincrby", "feedback_stats", outcome, 1),
+        ])
         
         return {"status": "success", "message": "Feedback recorded"}
     except Exception as e:
@@ -62,7 +58,7 @@ async def get_feedback_stats(
     Get feedback statistics.
     """
     try:
-        stats = redis_client.hgetall("feedback_stats")
+        stats = await redis_client.hgetall("feedback_stats")
         return {
             "accepted": int(stats.get("accepted", 0)),
             "rejected": int(stats.get("rejected", 0))
@@ -28,14 +28,14 @@ async def health_check(
     
     # Check Redis connection
     try:
-        redis_client.ping()
+        await redis_client.ping()
     except Exception:
         health_status["services"]["cache"] = "unhealthy"
         health_status["status"] = "degraded"
     
     # Check model
     try:
-        predictor.predict(
+        await predictor.apredict(
             "Test task",
             "Test description"
         )
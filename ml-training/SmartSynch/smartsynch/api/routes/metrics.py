@@ -0,0 +1,17 @@
+"""
+Metrics Routes
+
+API endpoint exposing runtime metrics as JSON.
+"""
+
+from fastapi import APIRouter
+from ..metrics import collect_metrics
+
+router = APIRouter()
+
+@router.get("/metrics")
+async def get_metrics():
+    """
+    Get runtime metrics (batching, caches, ...).
+    """
+    return collect_metrics()
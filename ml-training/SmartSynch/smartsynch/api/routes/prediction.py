@@ -1,9 +1,9 @@
-from sentence_transformers import SentenceTransformer
+from smartsynch.models.encoder import get_encoder
 from smartsynch.models.predictor import Predictor
 
 class PredictionService:
     def __init__(self):
-        self.embedding_model = SentenceTransformer('all-MiniLM-L6-v2')
+        self.embedding_model = get_encoder()
         model_path = 'models/fine_tuned/20241128_134706/model.pt'
         self.classifier = Predictor(model_path)
 
@@ -4,13 +4,20 @@ Prediction Routes
 API endpoints for task categorization predictions.
 """
 
-from fastapi import APIRouter, HTTPException, Depends
-from pydantic import BaseModel
+import asyncio
+from fastapi import APIRouter, BackgroundTasks, HTTPException, Depends, Request
+from pydantic import BaseModel, ValidationError
 from typing import List, Dict, Optional
-import json
-import time
 from ...models.predictor import Predictor
-from ..dependencies import get_predictor, get_redis_client
+from ...models.executor import InferenceQueueFull
+from ..batching import MicroBatcher
+from ..cascade import Cascade
+from ..prediction_cache import PredictionCache
+from ..streaming import DuplexStreamingResponse, NDJSON_MEDIA_TYPE, iter_ndjson_chunks, to_ndjson
+from ..dependencies import (
+    get_cascade, get_predictor, get_prediction_batcher, get_prediction_cache, get_redis_client,
+    loaded_similar_tasks
+)
 import logging
 
 router = APIRouter()
@@ -24,6 +31,8 @@ class PredictionResponse(BaseModel):
     category_id: int
     confidence: float
     probabilities: Dict[str, float] = {}  # Changed from Optional to default empty dict
+    tier: str = "predictor"  # which cascade tier answered
+    predictor_confidence: Optional[float] = None  # set when the zero-shot tier answered
 
 class BatchTaskInput(BaseModel):
     tasks: List[TaskInput]
@@ -31,26 +40,41 @@ class BatchTaskInput(BaseModel):
 @router.post("/predict", response_model=PredictionResponse)
 async def predict_category(
     task: TaskInput,
+    background_tasks: BackgroundTasks,
     predictor: Predictor = Depends(get_predictor),
+    batcher: MicroBatcher = Depends(get_prediction_batcher),
+    cache: PredictionCache = Depends(get_prediction_cache),
+    cascade: Optional[Cascade] = Depends(get_cascade),
     redis_client = Depends(get_redis_client)
 ):
     """
     Predict category for a single task.
     """
-    # Check cache
-    #TODO remove the time  after testing
-    cache_key = f"pred:{task.title}:{task.description}:{time.time()}"
-    cached_result = redis_client.get(cache_key)
-    if cached_result:
-        return json.loads(cached_result)
+    logger = logging.getLogger(__name__)
 
-    try:
-        # Get prediction
-        logger = logging.getLogger(__name__)
+    async def compute():
         logger.info(f"Making prediction for task: {task.title}")
         
-        # Use original inputs directly
-        result = predictor.predict(task.title, task.description)
+        # Use original inputs directly; concurrent requests share one
+        # batched forward pass when micro-batching is enabled
+        if predictor.config['batching']['enabled']:
+            result = await batcher.submit(
+                {"title": task.title, "description": task.description}
+            )
+        else:
+            result = await predictor.apredict(task.title, task.description)
+        
+        if cascade is not None:
+            # Only predictions below the threshold reach the zero-shot model
+            result = await cascade.resolve(result, task.title, task.description)
+        
+        similar = loaded_similar_tasks()
+        if similar is not None:
+            # Indexed for /similar once the response has been sent
+            background_tasks.add_task(
+                similar.record,
+                [{"title": task.title, "description": task.description}], [dict(result)]
+            )
         
         # Convert category to lowercase to match frontend
         result['category'] = result['category'].lower()
@@ -61,18 +85,20 @@ async def predict_category(
 
         logger.info(f"Prediction result: {result}")
         
-        # Cache result
-        redis_client.setex(
-            cache_key,
-            3600,  # 1 hour expiry
-            json.dumps(result)
-        )
-        
-        if result['confidence'] < 0.4:  # Adjust threshold as needed
+        if cascade is None and result['confidence'] < 0.4:
             logger.warning(f"Low confidence prediction: {result['confidence']}")
-            # Maybe use a fallback strategy or return uncertainty flag
         
         return result
+
+    try:
+        if not predictor.config['prediction_cache']['enabled']:
+            return await compute()
+        # Repeated tasks are served from Redis; concurrent misses on the
+        # same task wait for a single computation
+        return await cache.get_or_compute(redis_client, task.title, task.description, compute)
+    except InferenceQueueFull as e:
+        logger.warning(f"Prediction rejected: {str(e)}")
+        raise HTTPException(status_code=503, detail="Inference queue is full, retry later")
     except Exception as e:
         logger.error(f"Prediction error: {str(e)}")
         raise HTTPException(
@@ -83,7 +109,9 @@ async def predict_category(
 @router.post("/predict/batch", response_model=List[Dict])
 async def predict_categories_batch(
     batch: BatchTaskInput,
-    predictor: Predictor = Depends(get_predictor)
+    background_tasks: BackgroundTasks,
+    predictor: Predictor = Depends(get_predictor),
+    cascade: Optional[Cascade] = Depends(get_cascade)
 ):
     """
     Predict categories for multiple tasks.
@@ -93,9 +121,77 @@ async def predict_categories_batch(
             {"title": task.title, "description": task.description}
             for task in batch.tasks
         ]
-        return predictor.batch_predict(tasks)
+        results = await predictor.abatch_predict(tasks)
+        if cascade is not None:
+            results = await cascade.resolve_many(results, tasks)
+        similar = loaded_similar_tasks()
+        if similar is not None:
+            background_tasks.add_task(similar.record, tasks, results)
+        return results
+    except InferenceQueueFull:
+        raise HTTPException(status_code=503, detail="Inference queue is full, retry later")
     except Exception as e:
         raise HTTPException(
             status_code=500,
             detail=f"Batch prediction error: {str(e)}"
-        ) 
\ No newline at end of file
+        ) 
+
+@router.post("/predict/stream")
+async def predict_categories_stream(
+    request: Request,
+    predictor: Predictor = Depends(get_predictor)
+):
+    """
+    Predict categories for an NDJSON stream of tasks.
+
+    Each request line is a task object ({"title", "description"} and an
+    optional "id"). Results are streamed back as NDJSON in input order,
+    one line per task, classified in encoder-sized chunks. Invalid or
+    oversized lines, and the tasks of a chunk whose inference failed, get
+    a {"line", "error"} record instead. Only one chunk is held in memory,
+    and the next chunk is not read until the previous results have been
+    handed to the client, so a slow reader throttles the upload.
+    """
+    chunk_size = predictor.config['batching']['chunk_size']
+    body_read = asyncio.Event()
+    logger = logging.getLogger(__name__)
+
+    async def results():
+        async for chunk in iter_ndjson_chunks(request, chunk_size, body_read=body_read):
+            records, tasks = [], []
+            for record in chunk:
+                if "error" not in record:
+                    try:
+                        task = TaskInput(**record["data"])
+                        tasks.append({"title": task.title, "description": task.description})
+                    except ValidationError as e:
+                        record = {"line": record["line"], "error": str(e)}
+                records.append(record)
+
+            try:
+                predictions = iter(
+                    await predictor.abatch_predict(tasks)
+                    if tasks else []
+                )
+                error = None
+            except InferenceQueueFull as e:
+                logger.warning(f"Stream chunk rejected: {str(e)}")
+                error = "Inference queue is full, retry later"
+            except Exception as e:
+                logger.error(f"Stream prediction error: {str(e)}")
+                error = f"Prediction error: {str(e)}"
+
+            output = []
+            for record in records:
+                if "error" in record:
+                    output.append(record)
+                    continue
+                # A failed chunk reports every task in it; later chunks still run
+                result = {"line": record["line"]}
+                result.update({"error": error} if error else next(predictions))
+                if "id" in record["data"]:
+                    result["id"] = record["data"]["id"]
+                output.append(result)
+            yield to_ndjson(output)
+
+    return DuplexStreamingResponse(results(), body_read=body_read, media_type=NDJSON_MEDIA_TYPE)
@@ -0,0 +1,48 @@
+"""
+Similar Task Routes
+
+API endpoint returning the nearest labeled tasks of a task.
+"""
+
+from fastapi import APIRouter, HTTPException, Depends
+from pydantic import BaseModel, Field
+from typing import List, Optional
+from ...models.executor import InferenceQueueFull
+from ..dependencies import get_similar_tasks
+from ..similar import SimilarTasks
+
+router = APIRouter()
+
+class SimilarInput(BaseModel):
+    title: str
+    description: Optional[str] = None
+    k: int = Field(5, ge=1, le=100)
+
+class SimilarTask(BaseModel):
+    id: int
+    score: float  # cosine similarity
+    category: str
+    source: str  # "train" or "prediction"
+    # Missing for training rows prepared without texts (prepare_data.py --streaming)
+    title: Optional[str] = None
+    description: Optional[str] = None
+    confidence: Optional[float] = None  # predictor confidence of indexed predictions
+
+class SimilarResponse(BaseModel):
+    matches: List[SimilarTask]
+
+@router.post("/similar", response_model=SimilarResponse)
+async def similar_tasks(
+    task: SimilarInput,
+    similar: Optional[SimilarTasks] = Depends(get_similar_tasks)
+):
+    """
+    Find the labeled tasks most similar to a task.
+    """
+    if similar is None:
+        raise HTTPException(status_code=404, detail="The vector index is disabled")
+    try:
+        matches = await similar.search(task.title, task.description, task.k)
+    except InferenceQueueFull:
+        raise HTTPException(status_code=503, detail="Inference queue is full, retry later")
+    return {"matches": matches}
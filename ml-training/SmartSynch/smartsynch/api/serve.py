@@ -0,0 +1,237 @@
+"""
+Preforking Server
+
+Serves the API from several worker processes that share one copy of the
+model weights. The master process imports the app, loads the predictor
+(encoder and head), freezes the weights and only then forks the workers,
+so every worker maps the same weight pages copy-on-write instead of
+loading its own copy. With ``--weights shm`` the tensors are moved to
+shared memory first, so they stay shared even if a page is written.
+
+Each worker gets an equal share of the CPUs for its inference executor
+and torch threads, so the workers together fill the cores without
+oversubscribing them.
+
+Usage:
+    python -m smartsynch.api.serve --host 0.0.0.0 --port 8000 --workers 4
+"""
+
+import argparse
+import gc
+import logging
+import os
+import signal
+import socket
+import threading
+import time
+from typing import Dict, List
+
+import torch
+import uvicorn
+
+from ..models.executor import available_cpus, shared_executor, shutdown_shared_executor
+from ..utils.helpers import load_predictor_config
+from .metrics import register_metrics
+
+logger = logging.getLogger(__name__)
+
+WEIGHT_SHARING = ('cow', 'shm')
+
+
+def worker_cpus(workers: int) -> int:
+    """CPUs each of ``workers`` processes may use."""
+    return max(1, available_cpus() // workers)
+
+
+def process_memory() -> Dict[str, float]:
+    """Resident, proportional and shared memory of this process in MB (Linux)."""
+    fields = {
+        'Rss': 'rss_mb', 'Pss': 'pss_mb',
+        'Shared_Clean': 'shared_clean_mb', 'Shared_Dirty': 'shared_dirty_mb',
+        'Private_Clean': 'private_clean_mb', 'Private_Dirty': 'private_dirty_mb',
+    }
+    memory = {}
+    try:
+        with open('/proc/self/smaps_rollup') as f:
+            for line in f:
+                name, _, value = line.partition(':')
+                if name in fields:
+                    memory[fields[name]] = int(value.split()[0]) / 1024.0
+    except OSError:
+        pass
+    return memory
+
+
+def freeze_weights(modules: List[torch.nn.Module], weights: str = 'cow'):
+    """
+    Put modules in inference mode so forked workers never write to them.
+
+    Args:
+        modules: Encoder and head modules
+        weights: 'cow' (share pages copy-on-write) or 'shm' (move tensors
+            to shared memory)
+    """
+    if weights not in WEIGHT_SHARING:
+        raise ValueError(f"Unsupported weight sharing mode: {weights}")
+    for module in modules:
+        module.eval()
+        module.requires_grad_(False)
+        if weights == 'shm':
+            module.share_memory()
+
+
+def preload(weights: str = 'cow'):
+    """
+    Import the app and load the predictor (and the zero-shot models listed
+    in ``zero_shot.preload``) in the master process.
+
+    Returns:
+        The FastAPI app
+    """
+    from . import dependencies
+    from .main import app
+    from . import zero_shot
+
+    # Loading runs single-threaded so no torch thread pool exists at fork time
+    torch.set_num_threads(1)
+    start = time.perf_counter()
+    predictor = dependencies.get_predictor()
+    # The training catalog of the vector index is shared the same way
+    dependencies.get_similar_tasks()
+    zero_shot_models = [classifier.model for classifier in zero_shot.preload_models()]
+    freeze_weights(
+        [module for module in (predictor.model, predictor.sentence_transformer, *zero_shot_models)
+         if isinstance(module, torch.nn.Module)],
+        weights
+    )
+    # Workers reconnect to the embedding store and start their own executor
+    if predictor.embedding_cache.store is not None:
+        predictor.embedding_cache.store.close()
+    dependencies.get_inference_executor.cache_clear()
+    shutdown_shared_executor()
+    torch.set_num_threads(1)
+
+    # Keep the garbage collector from touching (and so copying) the
+    # master's objects in every worker
+    gc.collect()
+    gc.freeze()
+    logger.info(f"Preloaded predictor {predictor.model_version} in "
+                f"{time.perf_counter() - start:.1f}s ({process_memory().get('rss_mb', 0):.0f} MB)")
+    return app
+
+
+def run_worker(app, sock: socket.socket, index: int, workers: int,
+               host: str, port: int, log_level: str):
+    """Serve the preloaded app from a forked worker."""
+    from . import dependencies
+
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+
+    config = load_predictor_config()
+    cpus = worker_cpus(workers)
+    shared_executor(config['executor'], cpus=cpus)
+    dependencies.get_inference_executor()
+    register_metrics("serving", lambda: {
+        'worker': index,
+        'workers': workers,
+        'pid': os.getpid(),
+        'cpus': cpus,
+        'torch_threads': torch.get_num_threads(),
+        'memory': process_memory(),
+    })
+
+    server = uvicorn.Server(uvicorn.Config(
+        app, host=host, port=port, log_level=log_level, lifespan="on"
+    ))
+    server.run(sockets=[sock])
+
+
+def serve(host: str = '0.0.0.0', port: int = 8000, workers: int = None,
+          weights: str = None, log_level: str = 'info'):
+    """
+    Preload the model, fork the workers and supervise them until stopped.
+
+    Args:
+        host: Bind address
+        port: Bind port
+        workers: Worker processes (None: ``serving.workers`` or one per CPU)
+        weights: 'cow' or 'shm' (None: ``serving.weights``)
+        log_level: uvicorn log level
+    """
+    serving = load_predictor_config()['serving']
+    workers = workers or serving['workers'] or available_cpus()
+    weights = weights or serving['weights']
+
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(2048)
+
+    app = preload(weights)
+    if threading.active_count() > 1:
+        logger.warning(f"{threading.active_count()} threads alive before fork")
+
+    children: Dict[int, int] = {}
+    stopping = False
+
+    def spawn(index: int):
+        pid = os.fork()
+        if pid == 0:
+            code = 0
+            try:
+                run_worker(app, sock, index, workers, host, port, log_level)
+            except BaseException:
+                logger.exception(f"Worker {index} failed")
+                code = 1
+            finally:
+                os._exit(code)
+        children[pid] = index
+
+    def stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+        for pid in list(children):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+
+    for index in range(workers):
+        spawn(index)
+    logger.info(f"Serving on {host}:{port} with {workers} workers "
+                f"({worker_cpus(workers)} CPUs each, {weights} weights)")
+
+    while children:
+        try:
+            pid, status = os.wait()
+        except ChildProcessError:
+            break
+        index = children.pop(pid, None)
+        if index is not None and not stopping:
+            logger.warning(f"Worker {index} (pid {pid}) exited with status {status}; restarting")
+            time.sleep(1)
+            spawn(index)
+    sock.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Serve the API from preforked workers')
+    parser.add_argument('--host', default='0.0.0.0')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--workers', type=int, default=None,
+                        help='Worker processes (default: serving.workers, else one per CPU)')
+    parser.add_argument('--weights', choices=WEIGHT_SHARING, default=None,
+                        help='Share weights copy-on-write or via shared memory')
+    parser.add_argument('--log-level', default='info')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    serve(args.host, args.port, args.workers, args.weights, args.log_level)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,140 @@
+"""
+Similar Tasks
+
+Serves nearest-neighbour lookups over the labeled training embeddings
+(data/processed) and grows the index in place with the tasks the API
+classifies, so /similar also finds recently predicted tasks.
+
+Inserts are per process: every serving worker indexes the predictions it
+made itself on top of the shared training catalog, up to a configured
+number of predicted tasks; later predictions are no longer indexed.
+"""
+
+import logging
+import threading
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from ..models.embedding_cache import content_key
+from ..models.executor import InferenceExecutor
+from ..models.vector_index import VectorIndex
+
+logger = logging.getLogger(__name__)
+
+SOURCE_TRAIN = "train"
+SOURCE_PREDICTION = "prediction"
+
+
+class SimilarTasks:
+    """Similar-task search and prediction inserts over a VectorIndex."""
+
+    def __init__(self, index: VectorIndex,
+                 embed: Callable[[List[Dict[str, str]]], np.ndarray],
+                 executor: InferenceExecutor,
+                 insert_predictions: bool = True, min_confidence: float = 0.0,
+                 max_predictions: int = 50000):
+        """
+        Initialize the service.
+
+        Args:
+            index: Index over the labeled embeddings
+            embed: Blocking function tasks -> (n, dim) embeddings
+            executor: Executor embedding and index scans run on
+            insert_predictions: Index classified tasks under their predicted category
+            min_confidence: Predictions below this confidence are not indexed
+            max_predictions: Predicted tasks indexed at most; bounds the
+                index growth and the set of indexed content keys
+        """
+        self.index = index
+        self.embed = embed
+        self.executor = executor
+        self.insert_predictions = insert_predictions
+        self.min_confidence = min_confidence
+        self.max_predictions = max_predictions
+
+        self._lock = threading.Lock()
+        # Content keys of indexed (or being indexed) predictions, never more
+        # than max_predictions
+        self._indexed = set()
+        self._counters = dict.fromkeys(('recorded', 'already_indexed', 'below_confidence',
+                                        'index_full', 'record_failures'), 0)
+
+    def _count(self, name: str, value: int = 1):
+        with self._lock:
+            self._counters[name] += value
+
+    async def search(self, title: str, description: Optional[str] = None,
+                     k: int = 5) -> List[Dict]:
+        """
+        Nearest indexed tasks of a task.
+
+        Args:
+            title: Task title
+            description: Task description
+            k: Number of matches
+
+        Returns:
+            Matches by descending similarity: {"id", "score", "category", "source", ...}
+        """
+        # Embedding and the (IVF) scan are blocking; keep them off the event loop
+        return await self.executor.run(self._search, title, description, k)
+
+    def _search(self, title: str, description: Optional[str], k: int) -> List[Dict]:
+        embeddings = self.embed([{'title': title, 'description': description}])
+        return self.index.neighbours(embeddings[0], k)
+
+    async def record(self, tasks: List[Dict[str, str]], results: List[Dict]):
+        """
+        Index classified tasks under their predicted categories.
+
+        Runs after the response is sent; failures are logged and counted,
+        never raised.
+
+        Args:
+            tasks: Dicts with "title" and optional "description"
+            results: Prediction result of each task
+        """
+        if not self.insert_predictions:
+            return
+        pending, keys = [], []
+        with self._lock:
+            for task, result in zip(tasks, results):
+                key = content_key(f"{task['title']}\n{task.get('description') or ''}")
+                if key in self._indexed:
+                    self._counters['already_indexed'] += 1
+                elif result['confidence'] < self.min_confidence:
+                    self._counters['below_confidence'] += 1
+                elif len(self._indexed) >= self.max_predictions:
+                    self._counters['index_full'] += 1
+                else:
+                    # Claimed now so a concurrent repeat is not indexed twice
+                    self._indexed.add(key)
+                    pending.append((task, result))
+                    keys.append(key)
+        if not pending:
+            return
+        try:
+            await self.executor.run(self._insert, pending)
+            self._count('recorded', len(pending))
+        except Exception as e:
+            # e.g. InferenceQueueFull under load; the task is retried on its next prediction
+            logger.warning(f"Could not index {len(pending)} predicted tasks: {str(e)}")
+            with self._lock:
+                self._indexed.difference_update(keys)
+                self._counters['record_failures'] += len(pending)
+
+    def _insert(self, pending: List[Tuple[Dict[str, str], Dict]]):
+        self.index.add(
+            self.embed([task for task, _ in pending]),
+            [result['category'] for _, result in pending],
+            [{'source': SOURCE_PREDICTION, 'title': task['title'],
+              'description': task.get('description'), 'confidence': result['confidence']}
+             for task, result in pending]
+        )
+
+    def stats(self) -> Dict:
+        """Index and insert counters for the metrics endpoint."""
+        with self._lock:
+            counters = dict(self._counters)
+        return {**self.index.stats(), **counters}
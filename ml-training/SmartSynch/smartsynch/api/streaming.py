@@ -0,0 +1,132 @@
+"""
+NDJSON Streaming
+
+Helpers for endpoints that read newline-delimited JSON from the request
+body while streaming newline-delimited JSON back, holding at most one chunk
+of records in memory.
+"""
+
+import asyncio
+import json
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+import anyio
+from fastapi import Request
+from fastapi.responses import StreamingResponse
+from starlette.requests import ClientDisconnect
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+
+class DuplexStreamingResponse(StreamingResponse):
+    """
+    StreamingResponse for generators that keep reading the request body.
+
+    On older ASGI servers the stock response listens for disconnects by
+    calling ``receive`` concurrently, which would steal body messages from
+    the generator. Here disconnects surface through the request stream
+    while the body is read; once ``body_read`` is set, the response listens
+    for them itself, so a client that goes away stops the remaining work.
+    """
+
+    def __init__(self, content, body_read: Optional[asyncio.Event] = None, **kwargs):
+        super().__init__(content, **kwargs)
+        self.body_read = body_read
+
+    async def __call__(self, scope, receive, send):
+        try:
+            if self.body_read is None:
+                await self.stream_response(send)
+            else:
+                async with anyio.create_task_group() as task_group:
+                    async def stream():
+                        await self.stream_response(send)
+                        task_group.cancel_scope.cancel()
+
+                    task_group.start_soon(stream)
+                    await self.body_read.wait()
+                    await self.listen_for_disconnect(receive)
+                    task_group.cancel_scope.cancel()
+        except (ClientDisconnect, OSError):
+            # Nobody is left to send the remaining results to
+            return
+        if self.background is not None:
+            await self.background()
+
+
+async def iter_ndjson_chunks(request: Request, chunk_size: int,
+                             max_line_bytes: int = 1 << 20,
+                             body_read: Optional[asyncio.Event] = None
+                             ) -> AsyncIterator[List[Dict[str, Any]]]:
+    """
+    Parse NDJSON records from a request body as it arrives.
+
+    Each yielded record is ``{"line": n, "data": obj}`` or, for lines that
+    are not valid JSON objects or longer than ``max_line_bytes``,
+    ``{"line": n, "error": msg}``.
+
+    Args:
+        request: Incoming request with an NDJSON body
+        chunk_size: Number of records per yielded chunk
+        max_line_bytes: Longest accepted line; longer lines are skipped
+            with an error record
+        body_read: Optional event set once the whole body has been read
+
+    Yields:
+        Lists of at most ``chunk_size`` records in input order
+    """
+    buffer = b""
+    line_no = 0
+    skipping = False
+    chunk: List[Dict[str, Any]] = []
+
+    def parse(raw: bytes) -> Dict[str, Any]:
+        if len(raw) > max_line_bytes:
+            return {"line": line_no, "error": f"Line exceeds {max_line_bytes} bytes"}
+        try:
+            data = json.loads(raw)
+        except ValueError as e:
+            return {"line": line_no, "error": f"Invalid JSON: {str(e)}"}
+        if not isinstance(data, dict):
+            return {"line": line_no, "error": "Expected a JSON object"}
+        return {"line": line_no, "data": data}
+
+    async for piece in request.stream():
+        if skipping:
+            # Drop the rest of an oversized line
+            end = piece.find(b"\n")
+            if end < 0:
+                continue
+            piece, skipping = piece[end + 1:], False
+        buffer += piece
+        *lines, buffer = buffer.split(b"\n")
+
+        for raw in lines:
+            line_no += 1
+            if not raw.strip():
+                continue
+            chunk.append(parse(raw))
+            if len(chunk) >= chunk_size:
+                yield chunk
+                chunk = []
+
+        if len(buffer) > max_line_bytes:
+            line_no += 1
+            chunk.append({"line": line_no, "error": f"Line exceeds {max_line_bytes} bytes"})
+            buffer, skipping = b"", True
+            if len(chunk) >= chunk_size:
+                yield chunk
+                chunk = []
+
+    if body_read is not None:
+        body_read.set()
+    if buffer.strip():
+        line_no += 1
+        chunk.append(parse(buffer))
+    if chunk:
+        yield chunk
+
+
+def to_ndjson(records: List[Dict[str, Any]]) -> bytes:
+    """Serialize records as NDJSON lines."""
+    return "".join(json.dumps(record) + "\n" for record in records).encode("utf-8")
@@ -0,0 +1,109 @@
+"""
+Zero-Shot Serving
+
+Zero-shot NLI models served by the API: the model configs, the pool that
+keeps them resident and the per-model batchers that score concurrent
+requests together. Used by the /predict/{model_name} route and by the
+confidence cascade behind /predict.
+"""
+
+from functools import lru_cache
+from typing import Dict, List, Sequence
+from ..models.bundle import resolve_model
+from ..models.executor import InferenceExecutor
+from ..models.model_pool import ModelPool
+from ..models.zero_shot import ZeroShotClassifier
+from ..utils.helpers import load_predictor_config
+from .batching import MicroBatcher
+from .metrics import register_metrics
+
+MODEL_CONFIGS = {
+    "task-categorization": {
+        "model": "facebook/bart-large-mnli",  # Good for multi-class classification
+        "task": "zero-shot-classification",
+        "labels": ["Development", "Design", "Research", "Meeting", "Planning"]
+    }
+}
+
+batchers: Dict[str, MicroBatcher] = {}
+
+def load_zero_shot_model(model_name: str) -> ZeroShotClassifier:
+    """Load the classifier behind a MODEL_CONFIGS entry."""
+    settings = load_predictor_config()['zero_shot']
+    return ZeroShotClassifier(
+        resolve_model(MODEL_CONFIGS[model_name]["model"]),
+        hypothesis_template=settings['hypothesis_template'],
+        max_length=settings['max_length'],
+        max_pairs_per_forward=settings['max_pairs_per_forward']
+    )
+
+@lru_cache()
+def get_model_pool() -> ModelPool:
+    """Get the pool of zero-shot models resident in this process."""
+    settings = load_predictor_config()['zero_shot']
+    pool = ModelPool(
+        load_zero_shot_model,
+        memory_budget_mb=settings['memory_budget_mb'],
+        name="zero-shot"
+    )
+    register_metrics("zero_shot_pool", pool.stats)
+    return pool
+
+def preload_models() -> List[ZeroShotClassifier]:
+    """Load the configured zero-shot models ahead of the first request."""
+    names = load_predictor_config()['zero_shot']['preload'] or []
+    pool = get_model_pool()
+    pool.preload(names)
+    return [model for model in (pool.peek(name) for name in names) if model is not None]
+
+def zero_shot_batcher(model_name: str, pool: ModelPool, executor: InferenceExecutor) -> MicroBatcher:
+    """Batcher pooling the NLI pairs of concurrent requests for a model."""
+    if model_name not in batchers:
+        settings = load_predictor_config()['zero_shot']
+
+        def classify(requests):
+            # Reloads (once) if the model was evicted since the request looked it up
+            model = pool.peek(model_name) or pool.get(model_name)
+            return model.classify_batch(requests)
+
+        batcher = MicroBatcher(
+            classify,
+            max_batch_size=settings['max_batch_size'],
+            max_wait_ms=settings['max_wait_ms'],
+            name=f"zero-shot {model_name}",
+            executor=executor
+        )
+
+        def stats():
+            model = pool.peek(model_name)
+            return {**(model.stats() if model is not None else {}), 'batcher': batcher.stats()}
+
+        register_metrics(f"zero_shot.{model_name}", stats)
+        batchers[model_name] = batcher
+    return batchers[model_name]
+
+async def classify(model_name: str, text: str, labels: Sequence[str],
+                   executor: InferenceExecutor) -> Dict:
+    """
+    Classify one text with a pooled zero-shot model.
+
+    Args:
+        model_name: MODEL_CONFIGS entry
+        text: Text to classify
+        labels: Candidate labels
+        executor: InferenceExecutor loads and batches run on
+
+    Returns:
+        {"sequence", "labels", "scores"} with labels by descending score
+    """
+    pool = get_model_pool()
+    # Loaded once (off the event loop) however many requests arrive first
+    await pool.aget(model_name, executor)
+    # Concurrent requests are scored together in padded batches
+    return await zero_shot_batcher(model_name, pool, executor).submit((text, list(labels)))
+
+async def stop_batchers():
+    """Stop the zero-shot batchers (app shutdown)."""
+    for batcher in batchers.values():
+        await batcher.stop()
+    batchers.clear()
@@ -0,0 +1,73 @@
+"""
+In-Memory Batches
+
+Mini-batches sliced straight out of preloaded feature/label tensors: one
+shuffled permutation per epoch and one gather per batch, instead of a
+DataLoader collating samples one by one. A drop-in replacement for the
+DataLoaders TaskClassifier.train_model iterates over when the embeddings
+already fit in (device) memory.
+"""
+
+from typing import Iterator, Optional, Tuple, Union
+
+import numpy as np
+import torch
+
+
+class InMemoryBatches:
+    """Iterable of (features, labels) batches over tensors held on a device."""
+
+    def __init__(self, features: Union[np.ndarray, torch.Tensor],
+                 labels: Union[np.ndarray, torch.Tensor], batch_size: int,
+                 shuffle: bool = False, device: Union[str, torch.device] = 'cpu',
+                 drop_last: bool = False, generator: Optional[torch.Generator] = None,
+                 indices: Optional[Union[np.ndarray, torch.Tensor]] = None):
+        """
+        Initialize the batches.
+
+        Args:
+            features: (n, dim) embeddings, copied to ``device`` once
+            labels: (n,) class indices
+            batch_size: Samples per batch
+            shuffle: Draw a new permutation every epoch
+            device: Device the tensors (and so every batch) live on
+            drop_last: Skip the final partial batch
+            generator: Optional CPU generator for reproducible shuffles
+            indices: Rows to batch (default: all); subsets such as CV folds
+                are gathered batch by batch, never copied as a whole
+        """
+        self.device = torch.device(device)
+        self.features = torch.as_tensor(features, dtype=torch.float32).to(self.device)
+        self.labels = torch.as_tensor(labels, dtype=torch.long).to(self.device)
+        if len(self.features) != len(self.labels):
+            raise ValueError("Need one label per feature row")
+        self.batch_size = batch_size
+        self.shuffle = shuffle
+        self.drop_last = drop_last
+        self.generator = generator
+        self.indices = None if indices is None else torch.as_tensor(
+            indices, dtype=torch.long).to(self.device)
+
+    @property
+    def num_samples(self) -> int:
+        return len(self.labels) if self.indices is None else len(self.indices)
+
+    def __len__(self) -> int:
+        if self.drop_last:
+            return self.num_samples // self.batch_size
+        return -(-self.num_samples // self.batch_size)
+
+    def __iter__(self) -> Iterator[Tuple[torch.Tensor, torch.Tensor]]:
+        if not self.shuffle and self.indices is None:
+            # Contiguous views, no copies
+            for start in range(0, len(self) * self.batch_size, self.batch_size):
+                yield (self.features[start:start + self.batch_size],
+                       self.labels[start:start + self.batch_size])
+            return
+        order = self.indices
+        if self.shuffle:
+            permutation = torch.randperm(self.num_samples, generator=self.generator).to(self.device)
+            order = permutation if order is None else order[permutation]
+        for start in range(0, len(self) * self.batch_size, self.batch_size):
+            index = order[start:start + self.batch_size]
+            yield self.features.index_select(0, index), self.labels.index_select(0, index)
@@ -0,0 +1,233 @@
+"""
+Near-Duplicate Detection
+
+Finds training samples whose embeddings have a cosine similarity above a
+threshold and collapses them into groups that keep one sample each:
+1. Blocked all-pairs search: exact, one matrix product per block pair
+2. IVF search: vectors are bucketed by their nearest k-means centroids
+   (see models.vector_index) and only pairs within a bucket are compared,
+   for millions of samples
+
+Groups are the connected components of the duplicate pairs, so chains of
+near-identical samples collapse together; the earliest sample of a group
+is kept.
+"""
+
+import logging
+import time
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from ..models.vector_index import normalize, top_k, train_centroids
+
+logger = logging.getLogger(__name__)
+
+
+def _unique_pairs(left: List[np.ndarray], right: List[np.ndarray], n: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Concatenate (i, j) pair chunks into sorted unique pairs with i < j."""
+    if not left:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+    i, j = np.concatenate(left), np.concatenate(right)
+    codes = np.unique(np.minimum(i, j) * n + np.maximum(i, j))
+    return codes // n, codes % n
+
+
+def blocked_pairs(vectors: np.ndarray, threshold: float,
+                  block_size: int = 4096) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    All pairs with cosine similarity >= ``threshold``, exactly.
+
+    Compares every block of rows with itself and the blocks after it, so
+    memory stays at one (block_size, block_size) score matrix.
+
+    Args:
+        vectors: (n, dim) embeddings (may be memory-mapped)
+        threshold: Cosine similarity threshold
+        block_size: Rows per block
+
+    Returns:
+        (i, j) index arrays with i < j
+    """
+    n = len(vectors)
+    left, right = [], []
+    for start in range(0, n, block_size):
+        rows = normalize(vectors[start:start + block_size])
+        for other in range(start, n, block_size):
+            columns = rows if other == start else normalize(vectors[other:other + block_size])
+            scores = rows @ columns.T
+            if other == start:
+                # Each pair once, without the diagonal
+                scores = np.triu(scores, k=1)
+            i, j = np.nonzero(scores >= threshold)
+            left.append(i + start)
+            right.append(j + other)
+    return _unique_pairs(left, right, n)
+
+
+def ivf_pairs(vectors: np.ndarray, threshold: float, nlist: Optional[int] = None,
+              probes: int = 2, block_size: int = 4096,
+              seed: int = 0) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Pairs with cosine similarity >= ``threshold`` among vectors sharing a bucket.
+
+    Every vector joins the buckets of its ``probes`` nearest centroids, so
+    near-duplicates close to a bucket boundary still meet in one of them.
+    Approximate: a pair that shares no bucket is missed.
+
+    Args:
+        vectors: (n, dim) embeddings (may be memory-mapped)
+        threshold: Cosine similarity threshold
+        nlist: Number of buckets (default: sqrt(n))
+        probes: Buckets each vector joins
+        block_size: Rows per block within a bucket (and per assignment chunk)
+        seed: k-means seed
+
+    Returns:
+        (i, j) index arrays with i < j
+    """
+    n = len(vectors)
+    nlist = nlist or max(1, int(np.sqrt(n)))
+    centroids = train_centroids(vectors, nlist, seed=seed)
+    probes = min(probes, len(centroids))
+
+    assignment = np.empty((n, probes), dtype=np.int64)
+    for start in range(0, n, block_size):
+        rows = normalize(vectors[start:start + block_size])
+        assignment[start:start + block_size] = top_k(rows @ centroids.T, probes)
+
+    # Members of each bucket, via one sort of the (bucket, row) memberships
+    buckets = assignment.ravel()
+    members = np.repeat(np.arange(n), probes)
+    order = np.argsort(buckets, kind='stable')
+    buckets, members = buckets[order], members[order]
+    bounds = np.flatnonzero(np.diff(buckets)) + 1
+
+    left, right = [], []
+    for bucket in np.split(members, bounds):
+        if len(bucket) < 2:
+            continue
+        i, j = blocked_pairs(vectors[bucket], threshold, block_size)
+        left.append(bucket[i])
+        right.append(bucket[j])
+    return _unique_pairs(left, right, n)
+
+
+def connected_groups(n: int, i: np.ndarray, j: np.ndarray) -> np.ndarray:
+    """
+    Component id (its smallest member) of every node of an undirected graph.
+
+    Vectorized min-label propagation with pointer jumping.
+
+    Args:
+        n: Number of nodes
+        i, j: Edge endpoints
+
+    Returns:
+        (n,) array of component ids
+    """
+    labels = np.arange(n)
+    while True:
+        previous = labels.copy()
+        edge_min = np.minimum(labels[i], labels[j])
+        np.minimum.at(labels, i, edge_min)
+        np.minimum.at(labels, j, edge_min)
+        # Pointer jumping: follow labels to their roots
+        labels = labels[labels]
+        while not np.array_equal(labels, labels[labels]):
+            labels = labels[labels]
+        if np.array_equal(labels, previous):
+            return labels
+
+
+def find_duplicates(vectors: np.ndarray, threshold: float = 0.95, method: str = 'auto',
+                    exact_limit: int = 50000, block_size: int = 4096,
+                    nlist: Optional[int] = None, probes: int = 2, seed: int = 0) -> Dict:
+    """
+    Find groups of near-duplicate samples.
+
+    Args:
+        vectors: (n, dim) embeddings
+        threshold: Cosine similarity at or above which samples are duplicates
+        method: "blocked", "ivf" or "auto" (IVF above ``exact_limit`` samples)
+        exact_limit: Largest input "auto" compares exhaustively
+        block_size: Rows per matrix-product block
+        nlist: IVF buckets (default: sqrt(n))
+        probes: IVF buckets each sample joins
+        seed: k-means seed
+
+    Returns:
+        {"method", "pairs", "seconds", "keep": sorted indices of the kept
+        samples, "groups": list of index arrays (kept sample first) with
+        more than one member}
+    """
+    n = len(vectors)
+    if method == 'auto':
+        method = 'blocked' if n <= exact_limit else 'ivf'
+    start = time.perf_counter()
+    if method == 'blocked':
+        i, j = blocked_pairs(vectors, threshold, block_size)
+    elif method == 'ivf':
+        i, j = ivf_pairs(vectors, threshold, nlist, probes, block_size, seed)
+    else:
+        raise ValueError(f"Unknown dedup method: {method}")
+
+    component = connected_groups(n, i, j)
+    keep = np.flatnonzero(component == np.arange(n))
+    # Members sorted by component, then index: each group starts with its kept sample
+    duplicated = np.flatnonzero(np.bincount(component, minlength=n)[component] > 1)
+    order = duplicated[np.argsort(component[duplicated], kind='stable')]
+    bounds = np.flatnonzero(np.diff(component[order])) + 1
+    groups = np.split(order, bounds) if len(order) else []
+
+    seconds = time.perf_counter() - start
+    logger.info(f"Found {len(i)} duplicate pairs in {len(groups)} groups among {n} samples "
+                f"({method}, {seconds:.1f}s); keeping {len(keep)}")
+    return {'method': method, 'pairs': int(len(i)), 'seconds': seconds,
+            'keep': keep, 'groups': groups}
+
+
+def dedup_report(vectors: np.ndarray, duplicates: Dict, labels: List[str],
+                 threshold: float, samples: Optional[List[Dict]] = None) -> Dict:
+    """
+    Describe the collapsed groups.
+
+    Args:
+        vectors: Embeddings passed to ``find_duplicates``
+        duplicates: Its result
+        labels: Category of every sample
+        threshold: Threshold used
+        samples: Optional samples, whose titles are included
+
+    Returns:
+        JSON-serializable report; groups whose members disagree on the
+        category are flagged, as they point at labeling mistakes
+    """
+    def describe(index: int) -> Dict:
+        entry = {'index': int(index), 'category': labels[index]}
+        if samples is not None:
+            entry['title'] = samples[index].get('title')
+        return entry
+
+    groups = []
+    for group in duplicates['groups']:
+        kept, removed = group[0], group[1:]
+        similarity = normalize(vectors[removed]) @ normalize(vectors[kept])[0]
+        categories = {labels[index] for index in group}
+        groups.append({
+            'kept': describe(kept),
+            'removed': [{**describe(index), 'similarity': round(float(score), 4)}
+                        for index, score in zip(removed, similarity)],
+            'conflicting_labels': len(categories) > 1,
+        })
+    return {
+        'threshold': threshold,
+        'method': duplicates['method'],
+        'samples': len(vectors),
+        'kept': int(len(duplicates['keep'])),
+        'removed': int(len(vectors) - len(duplicates['keep'])),
+        'duplicate_pairs': duplicates['pairs'],
+        'conflicting_groups': sum(group['conflicting_labels'] for group in groups),
+        'seconds': round(duplicates['seconds'], 3),
+        'groups': groups,
+    }
@@ -6,36 +6,149 @@ This module handles all data preprocessing steps for the task categorization mod
 2. Tokenization
 3. Embedding generation
 4. Training/validation split
+
+Cleaning and encoding can be sharded across a process pool
+(``num_workers``); shard results are merged back in input order.
+``prepare_streaming`` prepares corpora that do not fit in memory.
 """
 
 import json
-import nltk
-import spacy
-from typing import List, Dict, Tuple, Union
+import logging
+import multiprocessing
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import List, Dict, Optional, Tuple
 import numpy as np
 from sklearn.model_selection import train_test_split
-from sentence_transformers import SentenceTransformer
-from nltk.tokenize import word_tokenize
-from nltk.corpus import stopwords
-from nltk.stem import WordNetLemmatizer
 import torch
+from ..models.encoder import get_encoder, encoder_fingerprint, DEFAULT_ENCODER
+from ..models.embedding_cache import EmbeddingCache
+from ..models.executor import available_cpus
+from .streaming import NpyAppender, assign_split, iter_samples, sample_key
+
+logger = logging.getLogger(__name__)
+
+# NLTK data needed for cleaning: package -> resource path
+NLTK_RESOURCES = {
+    'punkt': 'tokenizers/punkt',
+    'punkt_tab': 'tokenizers/punkt_tab',
+    'stopwords': 'corpora/stopwords',
+    'wordnet': 'corpora/wordnet',
+}
+
+# Per-process state of preprocessing pool workers (set by _init_worker)
+_worker: Dict = {}
+
+# NLTK tools, loaded on first use so importing this module stays cheap
+_nltk_tools: Dict = {}
+_nltk_lock = threading.Lock()
+
+def ensure_nltk_data():
+    """Check the NLTK data cleaning needs is installed (nothing is downloaded)."""
+    import nltk
+
+    missing = []
+    for package, resource in NLTK_RESOURCES.items():
+        try:
+            nltk.data.find(resource)
+        except LookupError:
+            missing.append(package)
+    if missing:
+        raise LookupError(
+            f"Missing NLTK data: {', '.join(missing)}. Activate a bundle built with "
+            f"scripts/build_bundle.py or run: python -m nltk.downloader {' '.join(missing)}"
+        )
+
+def cleaning_tools() -> Dict:
+    """NLTK tokenizer, lemmatizer and stopwords (loaded on first call)."""
+    with _nltk_lock:
+        if not _nltk_tools:
+            ensure_nltk_data()
+            from nltk.corpus import stopwords
+            from nltk.stem import WordNetLemmatizer
+            from nltk.tokenize import word_tokenize
+
+            _nltk_tools['tokenize'] = word_tokenize
+            _nltk_tools['lemmatizer'] = WordNetLemmatizer()
+            _nltk_tools['stop_words'] = set(stopwords.words('english'))
+        return _nltk_tools
+
+def _normalize(text: str) -> str:
+    """Tokenize, drop stopwords/punctuation and lemmatize."""
+    tools = cleaning_tools()
+    lemmatizer, stop_words = tools['lemmatizer'], tools['stop_words']
+    tokens = tools['tokenize'](text.lower())
+    tokens = [
+        lemmatizer.lemmatize(token)
+        for token in tokens
+        if token not in stop_words and token.isalnum()
+    ]
+    return ' '.join(tokens)
+
+def combine_title_description(title: str, description: Optional[str]) -> str:
+    """Title repeated for weight, then the description (uncleaned)."""
+    return f"{title} {title} {description or ''}"
+
+def prepared_text(title: str, description: Optional[str] = None) -> str:
+    """The cleaned text prepare_data embeds for a task."""
+    return _normalize(combine_title_description(title, description))
+
+def _init_worker(encoder_name: str, torch_threads: int):
+    """Set up a pool worker; threads are capped so workers don't oversubscribe cores."""
+    torch.set_num_threads(torch_threads)
+    _worker['encoder_name'] = encoder_name
+
+def _clean_shard(texts: List[str]) -> List[str]:
+    return [_normalize(text) for text in texts]
+
+def _encode_shard(texts: List[str]) -> np.ndarray:
+    # The encoder is loaded on a worker's first shard
+    encoder = get_encoder(_worker['encoder_name'])
+    return np.asarray(encoder.encode(texts), dtype=np.float32)
 
 class DataProcessor:
-    def __init__(self, max_length: int = 512):
-        """Initialize the data processor with required models and tools."""
-        # Download required NLTK data
-        nltk.download('punkt')
-        nltk.download('stopwords')
-        nltk.download('wordnet')
-        
-        # Initialize NLP tools
-        self.nlp = spacy.load('en_core_web_sm')
-        self.lemmatizer = WordNetLemmatizer()
-        self.stop_words = set(stopwords.words('english'))
+    def __init__(self, max_length: int = 512, encoder_name: str = DEFAULT_ENCODER,
+                 num_workers: int = 1, shard_size: int = 256):
+        """
+        Initialize the data processor with required models and tools.
+
+        Args:
+            max_length: Maximum text length
+            encoder_name: Sentence encoder used for embeddings
+            num_workers: Processes used for cleaning and encoding (1 runs in-process)
+            shard_size: Samples per shard handed to a worker
+        """
+        # NLTK data (from the active bundle or nltk.data.path) and spaCy
+        # are loaded on first use (see cleaning_tools, nlp)
+        self._nlp = None
         
-        # Initialize sentence transformer
-        self.encoder = SentenceTransformer('all-MiniLM-L6-v2')
+        # Shared sentence transformer from the process-wide registry
+        self.encoder_name = encoder_name
+        self.encoder = get_encoder(encoder_name)
         self.max_length = max_length
+        self.num_workers = num_workers
+        self.shard_size = shard_size
+        self.store_stats: Optional[Dict] = None
+        self.throughput: Dict[str, Dict] = {}
+
+    @property
+    def nlp(self):
+        """spaCy pipeline, loaded on first access."""
+        if self._nlp is None:
+            import spacy
+
+            self._nlp = spacy.load('en_core_web_sm')
+        return self._nlp
+
+    @property
+    def lemmatizer(self):
+        return cleaning_tools()['lemmatizer']
+
+    @property
+    def stop_words(self):
+        return cleaning_tools()['stop_words']
 
     def clean_text(self, text: str) -> str:
         """
@@ -47,17 +160,7 @@ class DataProcessor:
         Returns:
             Cleaned and normalized text
         """
-        # Tokenize text
-        tokens = word_tokenize(text.lower())
-        
-        # Remove stopwords and lemmatize
-        tokens = [
-            self.lemmatizer.lemmatize(token) 
-            for token in tokens 
-            if token not in self.stop_words and token.isalnum()
-        ]
-        
-        return ' '.join(tokens)
+        return _normalize(text)
 
     def combine_title_description(self, title: str, description: str) -> str:
         """
@@ -71,14 +174,131 @@ class DataProcessor:
         Returns:
             Combined text string
         """
-        return f"{title} {title} {description}"
+        return combine_title_description(title, description)
 
-    def prepare_data(self, data_path: str) -> Tuple[np.ndarray, np.ndarray]:
+    def _start_pool(self) -> Optional[ProcessPoolExecutor]:
+        """Process pool for sharded cleaning/encoding, or None when running in-process."""
+        if self.num_workers <= 1:
+            return None
+        # Affinity / cpuset aware: os.cpu_count() oversubscribes in containers
+        torch_threads = max(1, available_cpus() // self.num_workers)
+        logger.info(f"Starting {self.num_workers} preprocessing workers "
+                    f"({torch_threads} torch threads each)")
+        # spawn: forking a process that already holds torch threads can deadlock
+        return ProcessPoolExecutor(
+            max_workers=self.num_workers,
+            mp_context=multiprocessing.get_context('spawn'),
+            initializer=_init_worker,
+            initargs=(self.encoder_name, torch_threads)
+        )
+
+    def _map_shards(self, pool: ProcessPoolExecutor, fn, items: List) -> List:
+        """Run ``fn`` over fixed-size shards of ``items``; results keep input order."""
+        shards = [items[i:i + self.shard_size] for i in range(0, len(items), self.shard_size)]
+        return list(pool.map(fn, shards))
+
+    def _record_stage(self, stage: str, samples: int, seconds: float):
+        """Accumulate samples/sec for a preprocessing stage."""
+        totals = self.throughput.setdefault(stage, {'samples': 0, 'seconds': 0.0})
+        totals['samples'] += samples
+        totals['seconds'] += seconds
+        totals['samples_per_sec'] = totals['samples'] / max(totals['seconds'], 1e-9)
+
+    def clean_texts(self, texts: List[str], pool: Optional[ProcessPoolExecutor] = None) -> List[str]:
+        """Clean many texts, sharded across ``pool`` when given."""
+        start = time.perf_counter()
+        if pool is None or len(texts) <= self.shard_size:
+            cleaned = [self.clean_text(text) for text in texts]
+        else:
+            cleaned = [text for shard in self._map_shards(pool, _clean_shard, texts) for text in shard]
+        self._record_stage('clean', len(texts), time.perf_counter() - start)
+        return cleaned
+
+    def _encode(self, texts: List[str], pool: Optional[ProcessPoolExecutor] = None) -> np.ndarray:
+        """Encode texts, sharded across ``pool`` when given."""
+        start = time.perf_counter()
+        if pool is None or len(texts) <= self.shard_size:
+            embeddings = self.encoder.encode(texts)
+        else:
+            embeddings = np.concatenate(self._map_shards(pool, _encode_shard, texts))
+        self._record_stage('encode', len(texts), time.perf_counter() - start)
+        return embeddings
+
+    def store_namespace(self) -> str:
+        """
+        Embedding store namespace for the current encoder.
+
+        Includes a hash of the encoder weights, so a new encoder version
+        never reads vectors produced by the previous one.
+        """
+        return f"{self.encoder_name}@{encoder_fingerprint(self.encoder_name)[:16]}"
+
+    def encode_texts(self, texts: List[str], store_path: Optional[str] = None,
+                     pool: Optional[ProcessPoolExecutor] = None) -> np.ndarray:
+        """
+        Encode cleaned texts, reusing vectors from the embedding store.
+
+        Args:
+            texts: Cleaned texts
+            store_path: SQLite embedding store (None encodes everything)
+            pool: Optional process pool to shard encoding across
+
+        Returns:
+            Array of shape (len(texts), dim) in input order
+        """
+        if store_path is None:
+            return self._encode(texts, pool)
+
+        # Content-addressed by cleaned text within the encoder's namespace;
+        # everything is read back from the store, so no memory tier
+        cache = EmbeddingCache(self.store_namespace(), memory_size=0, disk_path=store_path)
+        try:
+            embeddings = cache.get_or_compute(texts, lambda missing: self._encode(missing, pool))
+        finally:
+            cache.store.close()
+        stats = cache.stats()
+        totals = self.store_stats or {'namespace': stats['namespace'], 'reused': 0, 'encoded': 0}
+        totals['reused'] += stats['disk_hits']
+        totals['encoded'] += stats['misses']
+        self.store_stats = totals
+        logger.info(f"Embedding store {store_path}: reused {stats['disk_hits']}, "
+                    f"encoded {stats['misses']} of {len(texts)} samples")
+        return embeddings
+
+    def embed_samples(self, samples: List[Dict], store_path: Optional[str] = None) -> np.ndarray:
+        """
+        Combine, clean and encode samples (title, description).
+
+        Args:
+            samples: Sample dicts
+            store_path: Optional embedding store (see ``encode_texts``)
+
+        Returns:
+            Array of shape (len(samples), dim) in input order
+        """
+        # Combine title and description
+        combined = [
+            self.combine_title_description(sample['title'], sample['description'])
+            for sample in samples
+        ]
+        pool = self._start_pool()
+        try:
+            # Clean text and generate embeddings
+            texts = self.clean_texts(combined, pool)
+            return self.encode_texts(texts, store_path, pool)
+        finally:
+            if pool is not None:
+                pool.shutdown()
+
+    def prepare_data(self, data_path: str,
+                     store_path: Optional[str] = None) -> Tuple[np.ndarray, np.ndarray]:
         """
         Load and prepare data for training.
         
         Args:
             data_path: Path to training data JSON file
+            store_path: Optional embedding store; only samples whose cleaned
+                text is not stored yet for this encoder get encoded
             
         Returns:
             Tuple of (features, labels)
@@ -87,34 +307,116 @@ class DataProcessor:
         with open(data_path, 'r') as f:
             data = json.load(f)
         
-        # Process text and create features
-        texts = []
-        labels = []
-        categories = set()
-        
-        for sample in data['samples']:
-            # Combine and clean text
-            combined_text = self.combine_title_description(
-                sample['title'], 
-                sample['description']
-            )
-            cleaned_text = self.clean_text(combined_text)
-            
-            texts.append(cleaned_text)
-            labels.append(sample['category'])
-            categories.add(sample['category'])
+        labels = [sample['category'] for sample in data['samples']]
         
         # Convert categories to indices
-        self.category_map = {cat: idx for idx, cat in enumerate(sorted(categories))}
+        self.category_map = {cat: idx for idx, cat in enumerate(sorted(set(labels)))}
         
-        # Generate embeddings
-        embeddings = self.encoder.encode(texts)
+        self.throughput = {}
+        self.store_stats = None
+        embeddings = self.embed_samples(data['samples'], store_path)
+        self._log_throughput()
         
         # Convert labels to numeric
         numeric_labels = np.array([self.category_map[label] for label in labels])
         
         return embeddings, numeric_labels
 
+    def _log_throughput(self):
+        for stage, totals in self.throughput.items():
+            logger.info(f"{stage}: {totals['samples']} samples in {totals['seconds']:.2f}s "
+                        f"({totals['samples_per_sec']:.1f} samples/sec)")
+
+    def prepare_streaming(self, data_path: str, output_dir: str, test_size: float = 0.2,
+                          chunk_size: int = 10000, store_path: Optional[str] = None,
+                          seed: int = 0) -> Dict:
+        """
+        Prepare a corpus chunk by chunk with bounded memory.
+
+        Samples are read incrementally, assigned to train/val by hashing a
+        stable key within their label, and encoded in chunks that are
+        appended to X_train/X_val/y_train/y_val .npy files in ``output_dir``
+        (memory-mappable with ``np.load(mmap_mode='r')``).
+
+        Args:
+            data_path: JSON ({"samples": [...]}) or JSONL file
+            output_dir: Directory receiving the .npy files
+            test_size: Expected fraction of each label assigned to val
+            chunk_size: Samples cleaned and encoded at a time
+            store_path: Optional embedding store (see ``encode_texts``)
+            seed: Salt of the split hash
+
+        Returns:
+            Sample counts per split and label
+        """
+        # Only the label set is kept from the first pass, so ids match prepare_data
+        categories = sorted({sample['category'] for sample in iter_samples(data_path)})
+        if not categories:
+            raise ValueError(f"No samples found in {data_path}")
+        self.category_map = {cat: idx for idx, cat in enumerate(categories)}
+        
+        output_dir = Path(output_dir)
+        writers: Dict[str, NpyAppender] = {}
+        counts = {split: dict.fromkeys(categories, 0) for split in ('train', 'val')}
+        self.throughput = {}
+        self.store_stats = None
+        pool = self._start_pool()
+        try:
+            chunk = []
+            for sample in iter_samples(data_path):
+                chunk.append(sample)
+                if len(chunk) == chunk_size:
+                    self._write_chunk(chunk, writers, output_dir, test_size, seed,
+                                      store_path, pool, counts)
+                    chunk = []
+            if chunk:
+                self._write_chunk(chunk, writers, output_dir, test_size, seed,
+                                  store_path, pool, counts)
+        except BaseException:
+            for writer in writers.values():
+                writer.discard()
+            raise
+        finally:
+            if pool is not None:
+                pool.shutdown()
+        
+        for writer in writers.values():
+            writer.close()
+        self._log_throughput()
+        return counts
+
+    def _write_chunk(self, samples: List[Dict], writers: Dict[str, NpyAppender],
+                     output_dir: Path, test_size: float, seed: int,
+                     store_path: Optional[str], pool: Optional[ProcessPoolExecutor],
+                     counts: Dict[str, Dict[str, int]]):
+        """Clean, encode and append one chunk of samples to the split files."""
+        combined = [
+            self.combine_title_description(sample['title'], sample['description'])
+            for sample in samples
+        ]
+        embeddings = self.encode_texts(self.clean_texts(combined, pool), store_path, pool)
+        labels = np.array([self.category_map[sample['category']] for sample in samples])
+        splits = np.array([
+            assign_split(sample_key(sample), sample['category'], test_size, seed)
+            for sample in samples
+        ])
+        
+        if not writers:
+            # Embedding size is known once the first chunk is encoded
+            for split in ('train', 'val'):
+                writers[f"X_{split}"] = NpyAppender(
+                    output_dir / f"X_{split}.npy", (embeddings.shape[1],), np.float32
+                )
+                writers[f"y_{split}"] = NpyAppender(output_dir / f"y_{split}.npy", (), np.int64)
+        
+        for split in ('train', 'val'):
+            mask = splits == split
+            writers[f"X_{split}"].append(embeddings[mask])
+            writers[f"y_{split}"].append(labels[mask])
+            for sample, selected in zip(samples, mask):
+                if selected:
+                    counts[split][sample['category']] += 1
+
     def split_data(self, X: np.ndarray, y: np.ndarray, 
                   test_size: float = 0.2, random_state: int = 42) -> Tuple:
         """
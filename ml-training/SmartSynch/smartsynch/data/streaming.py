@@ -0,0 +1,176 @@
+"""
+Streaming Dataset Preparation
+
+Building blocks for preparing corpora that do not fit in memory:
+1. Incremental parsing of samples from JSON ({"samples": [...]}) or JSONL
+2. Deterministic train/val assignment by hashing a stable key per label
+3. .npy files that grow chunk by chunk and can be memory-mapped
+"""
+
+import hashlib
+import json
+import os
+import struct
+from pathlib import Path
+from typing import Dict, Iterator, Tuple
+
+import numpy as np
+
+from ..models.embedding_cache import content_key
+
+JSONL_SUFFIXES = ('.jsonl', '.ndjson')
+
+_decoder = json.JSONDecoder()
+
+
+def iter_samples(path: str, buffer_size: int = 1 << 20) -> Iterator[Dict]:
+    """
+    Yield samples one at a time without loading the whole file.
+
+    Args:
+        path: JSONL file (one sample per line) or JSON file of the form
+            {"samples": [...]}
+        buffer_size: Characters read per refill for JSON files
+
+    Yields:
+        Sample dicts in file order
+    """
+    with open(path, 'r') as f:
+        if Path(path).suffix in JSONL_SUFFIXES:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+            return
+        yield from _iter_json_array(f, buffer_size)
+
+
+def _iter_json_array(f, buffer_size: int) -> Iterator[Dict]:
+    """Decode the elements of the "samples" array one by one."""
+    buffer = ''
+
+    def refill() -> bool:
+        nonlocal buffer
+        data = f.read(buffer_size)
+        buffer += data
+        return bool(data)
+
+    # Seek to the opening bracket of the samples array
+    while True:
+        key = buffer.find('"samples"')
+        start = buffer.find('[', key) if key >= 0 else -1
+        if start >= 0:
+            buffer = buffer[start + 1:]
+            break
+        if not refill():
+            raise ValueError('No "samples" array found')
+
+    pos = 0
+    while True:
+        # Skip separators between elements
+        while pos < len(buffer) and buffer[pos] in ' \t\r\n,':
+            pos += 1
+        if pos == len(buffer):
+            buffer, pos = '', 0
+            if not refill():
+                raise ValueError('Unterminated "samples" array')
+            continue
+        if buffer[pos] == ']':
+            return
+        try:
+            sample, end = _decoder.raw_decode(buffer, pos)
+        except json.JSONDecodeError:
+            # Element continues past the buffer
+            buffer, pos = buffer[pos:], 0
+            if not refill():
+                raise
+            continue
+        yield sample
+        pos = end
+
+
+def sample_key(sample: Dict) -> str:
+    """Stable key of a sample: its id, or a hash of its text."""
+    if sample.get('id') is not None:
+        return str(sample['id'])
+    return content_key(f"{sample['title']}\n{sample.get('description', '')}")
+
+
+def assign_split(key: str, label: str, test_size: float, seed: int = 0) -> str:
+    """
+    Deterministically assign a sample to "train" or "val".
+
+    Hashing within each label keeps the validation fraction of every class
+    close to ``test_size``, and a sample keeps its split as the corpus grows.
+    """
+    digest = hashlib.sha256(f"{seed}:{label}:{key}".encode('utf-8')).digest()
+    return 'val' if int.from_bytes(digest[:8], 'big') / 2 ** 64 < test_size else 'train'
+
+
+class NpyAppender:
+    """
+    Write a .npy file row chunk by row chunk.
+
+    Space for the header is reserved up front and rewritten with the final
+    row count on close, so the result loads with ``np.load(mmap_mode='r')``.
+    """
+
+    # Header room for any row count below this
+    _MAX_ROWS = 2 ** 62
+
+    def __init__(self, path: str, row_shape: Tuple[int, ...] = (), dtype=np.float32):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.row_shape = tuple(row_shape)
+        self.dtype = np.dtype(dtype)
+        self.rows = 0
+        self._tmp_path = self.path.with_suffix(self.path.suffix + '.tmp')
+        self._file = open(self._tmp_path, 'wb')
+        self._header_length = len(self._header(self._MAX_ROWS))
+        self._file.write(self._header(self._MAX_ROWS))
+
+    def _header(self, rows: int, length: int = None) -> bytes:
+        """Version 1.0 .npy header padded to ``length`` (or to a 64-byte multiple)."""
+        header = repr({
+            'descr': np.lib.format.dtype_to_descr(self.dtype),
+            'fortran_order': False,
+            'shape': (rows,) + self.row_shape,
+        })
+        if length is None:
+            length = -(-(10 + len(header) + 1) // 64) * 64
+        padding = length - 10 - len(header) - 1
+        return (b'\x93NUMPY\x01\x00' + struct.pack('<H', length - 10)
+                + header.encode('latin1') + b' ' * padding + b'\n')
+
+    def append(self, rows: np.ndarray):
+        """Append rows of shape (n, *row_shape)."""
+        rows = np.ascontiguousarray(rows, dtype=self.dtype)
+        if rows.shape[1:] != self.row_shape:
+            raise ValueError(f"Expected rows of shape {self.row_shape}, got {rows.shape[1:]}")
+        self._file.write(rows.tobytes())
+        self.rows += len(rows)
+
+    def close(self):
+        """Write the final header and move the file into place."""
+        if self._file.closed:
+            return
+        self._file.seek(0)
+        self._file.write(self._header(self.rows, self._header_length))
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._file.close()
+        os.replace(self._tmp_path, self.path)
+
+    def discard(self):
+        """Drop a partially written file."""
+        if not self._file.closed:
+            self._file.close()
+        self._tmp_path.unlink(missing_ok=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        if exc_type is None:
+            self.close()
+        else:
+            self.discard()
@@ -0,0 +1,253 @@
+"""
+Inference Backends
+
+Pluggable backends that turn texts into embeddings and embeddings into
+logits:
+- eager: SentenceTransformer.encode + TaskClassifier.forward
+- torchscript: traced encoder and head graphs from scripts/export_model.py
+- onnxruntime: ONNX encoder and head graphs from scripts/export_model.py
+
+Graph backends read an export directory holding encoder/head graphs, the
+tokenizer and an export_report.json, so serving them does not need the
+sentence-transformers encoder at all. The report records the digest of the
+head that was exported and the parity check results; an artifact whose
+head differs from the loaded one, or that failed parity, is refused.
+"""
+
+import hashlib
+import json
+import logging
+from pathlib import Path
+from typing import Dict, List
+
+import numpy as np
+import torch
+import torch.nn as nn
+import torch.nn.functional as F
+
+from .precision import input_dtype
+
+logger = logging.getLogger(__name__)
+
+BACKENDS = ('eager', 'torchscript', 'onnxruntime')
+
+TORCHSCRIPT_ENCODER = 'encoder.ts.pt'
+TORCHSCRIPT_HEAD = 'head.ts.pt'
+ONNX_ENCODER = 'encoder.onnx'
+ONNX_HEAD = 'head.onnx'
+TOKENIZER_DIR = 'tokenizer'
+EXPORT_REPORT = 'export_report.json'
+
+
+def head_hash(head: nn.Module):
+    """SHA-256 of a head's weights, as a hashlib object (see ``hexdigest``)."""
+    digest = hashlib.sha256()
+    for name, tensor in sorted(head.state_dict().items()):
+        digest.update(name.encode('utf-8'))
+        digest.update(tensor.detach().cpu().numpy().tobytes())
+    return digest
+
+
+def read_export_report(artifact_dir: str) -> Dict:
+    """The export_report.json of an export directory."""
+    with open(Path(artifact_dir) / EXPORT_REPORT) as f:
+        return json.load(f)
+
+
+def check_artifact(report: Dict, backend: str, head: nn.Module = None):
+    """
+    Refuse artifacts that would serve the wrong head or failed export checks.
+
+    Args:
+        report: Export report of the artifact
+        backend: Graph backend about to serve it
+        head: Head whose categories and version will label its logits
+
+    Raises:
+        ValueError: If the backend was not exported, failed its parity
+            check, or was exported from a different head
+    """
+    result = report.get('backends', {}).get(backend)
+    if result is None:
+        raise ValueError(f"The artifact has no {backend} export")
+    if not result.get('parity', {}).get('passed', False):
+        raise ValueError(f"The {backend} export failed its parity check against eager")
+    if head is not None and report.get('head_digest') != head_hash(head).hexdigest():
+        raise ValueError(
+            f"The artifact was exported from another head ({report.get('model_path')}); "
+            f"re-export the served model with scripts/export_model.py"
+        )
+
+
+class EncoderGraph(nn.Module):
+    """
+    Graph-friendly version of a SentenceTransformer.
+
+    Runs the underlying transformer on token ids followed by mean pooling
+    and (if the encoder has it) L2 normalization, matching ``encode``.
+    """
+
+    def __init__(self, sentence_transformer):
+        super().__init__()
+        modules = list(sentence_transformer.children())
+        pooling = modules[1] if len(modules) > 1 else None
+        # Older sentence-transformers expose a flag, newer ones a mode name
+        mean_pooled = pooling is not None and (
+            getattr(pooling, 'pooling_mode_mean_tokens', False)
+            or getattr(pooling, 'pooling_mode', None) == 'mean'
+        )
+        if not mean_pooled:
+            raise ValueError("Only mean-pooled sentence encoders can be exported")
+
+        self.transformer = modules[0].auto_model
+        self.normalize = any(type(m).__name__ == 'Normalize' for m in modules)
+
+    def forward(self, input_ids, attention_mask):
+        # Plain tuple outputs trace and export more reliably than ModelOutput
+        token_embeddings = self.transformer(
+            input_ids=input_ids, attention_mask=attention_mask, return_dict=False
+        )[0]
+        mask = attention_mask.unsqueeze(-1).to(token_embeddings.dtype)
+        summed = (token_embeddings * mask).sum(dim=1)
+        pooled = summed / mask.sum(dim=1).clamp(min=1e-9)
+        if self.normalize:
+            pooled = F.normalize(pooled, p=2, dim=1)
+        return pooled
+
+
+class EagerBackend:
+    """Eager PyTorch: SentenceTransformer.encode followed by the head."""
+
+    name = 'eager'
+
+    def __init__(self, encoder, head: nn.Module, compile_head: bool = False):
+        self.encoder = encoder
+        # Reduced-precision heads (see models/precision.py) take bf16 inputs
+        self.input_dtype = input_dtype(head)
+        self.head = torch.compile(head) if compile_head else head
+
+    def encode(self, texts: List[str], batch_size: int = 32) -> np.ndarray:
+        return self.encoder.encode(texts, batch_size=batch_size)
+
+    def forward(self, embeddings: torch.Tensor) -> torch.Tensor:
+        with torch.no_grad():
+            return self.head(embeddings.to(self.input_dtype)).float()
+
+
+class _GraphBackend:
+    """Shared tokenization for backends running exported graphs."""
+
+    def __init__(self, artifact_dir: str):
+        from transformers import AutoTokenizer
+
+        self.artifact_dir = Path(artifact_dir)
+        self.report = read_export_report(artifact_dir)
+        self.tokenizer = AutoTokenizer.from_pretrained(str(self.artifact_dir / TOKENIZER_DIR))
+        self.max_length = self.report['max_seq_length']
+
+    def _tokenize(self, texts: List[str], return_tensors: str) -> Dict:
+        return self.tokenizer(
+            texts, padding=True, truncation=True,
+            max_length=self.max_length, return_tensors=return_tensors
+        )
+
+    def encode(self, texts: List[str], batch_size: int = 32) -> np.ndarray:
+        # Sort by length so each batch pads to a similar size
+        order = np.argsort([-len(text) for text in texts], kind='stable')
+        embeddings = np.empty((len(texts), self.report['embedding_dim']), dtype=np.float32)
+        for start in range(0, len(texts), batch_size):
+            index = order[start:start + batch_size]
+            embeddings[index] = self._encode_batch([texts[i] for i in index])
+        return embeddings
+
+
+class TorchScriptBackend(_GraphBackend):
+    """Traced TorchScript encoder and head."""
+
+    name = 'torchscript'
+
+    def __init__(self, artifact_dir: str):
+        super().__init__(artifact_dir)
+        self.encoder_graph = torch.jit.load(str(self.artifact_dir / TORCHSCRIPT_ENCODER))
+        self.head_graph = torch.jit.load(str(self.artifact_dir / TORCHSCRIPT_HEAD))
+        self.encoder_graph.eval()
+        self.head_graph.eval()
+
+    def _encode_batch(self, texts: List[str]) -> np.ndarray:
+        tokens = self._tokenize(texts, 'pt')
+        with torch.no_grad():
+            return self.encoder_graph(tokens['input_ids'], tokens['attention_mask']).numpy()
+
+    def forward(self, embeddings: torch.Tensor) -> torch.Tensor:
+        with torch.no_grad():
+            return self.head_graph(embeddings.float().cpu()).to(embeddings.device)
+
+
+class OnnxBackend(_GraphBackend):
+    """ONNX Runtime encoder and head."""
+
+    name = 'onnxruntime'
+
+    def __init__(self, artifact_dir: str, intra_op_threads: int = 0):
+        try:
+            import onnxruntime as ort
+        except ImportError:
+            raise ImportError(
+                "The onnxruntime backend requires the onnxruntime package "
+                "(pip install onnxruntime)"
+            )
+
+        super().__init__(artifact_dir)
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        options.intra_op_num_threads = intra_op_threads
+        providers = ['CPUExecutionProvider']
+        self.encoder_session = ort.InferenceSession(
+            str(self.artifact_dir / ONNX_ENCODER), options, providers=providers
+        )
+        self.head_session = ort.InferenceSession(
+            str(self.artifact_dir / ONNX_HEAD), options, providers=providers
+        )
+
+    def _encode_batch(self, texts: List[str]) -> np.ndarray:
+        tokens = self._tokenize(texts, 'np')
+        return self.encoder_session.run(None, {
+            'input_ids': tokens['input_ids'].astype(np.int64),
+            'attention_mask': tokens['attention_mask'].astype(np.int64),
+        })[0]
+
+    def forward(self, embeddings: torch.Tensor) -> torch.Tensor:
+        logits = self.head_session.run(None, {
+            'embeddings': embeddings.float().cpu().numpy()
+        })[0]
+        return torch.from_numpy(logits).to(embeddings.device)
+
+
+def load_backend(inference_config: Dict, encoder=None, head: nn.Module = None):
+    """
+    Build the backend selected in the ``inference`` config section.
+
+    Args:
+        inference_config: Dict with "backend", "artifact_dir" and "compile"
+        encoder: Shared SentenceTransformer (eager backend only)
+        head: Loaded TaskClassifier; graph artifacts must have been exported
+            from it
+
+    Returns:
+        Backend instance exposing ``encode`` and ``forward``
+    """
+    backend = inference_config['backend']
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown inference backend: {backend} (expected one of {BACKENDS})")
+
+    if backend == 'eager':
+        return EagerBackend(encoder, head, compile_head=inference_config.get('compile', False))
+
+    artifact_dir = inference_config.get('artifact_dir')
+    if not artifact_dir:
+        raise ValueError(f"The {backend} backend needs inference.artifact_dir (see scripts/export_model.py)")
+    check_artifact(read_export_report(artifact_dir), backend, head)
+    logger.info(f"Loading {backend} backend from {artifact_dir}")
+    if backend == 'torchscript':
+        return TorchScriptBackend(artifact_dir)
+    return OnnxBackend(artifact_dir, intra_op_threads=inference_config.get('intra_op_threads', 0))
@@ -0,0 +1,257 @@
+"""
+Model Bundles
+
+A bundle is a versioned, self-contained directory (optionally packed as a
+.tar.gz) holding everything serving and data preparation resolve at
+runtime:
+- encoder/: the sentence encoder with its tokenizer
+- zero_shot/: the zero-shot classification model and tokenizer
+- nltk_data/: the NLTK corpora used for text cleaning
+- head/: the trained classification head and its metadata
+
+Activating a bundle points every lookup at these local files and turns
+off Hugging Face hub access, so a container starts without network calls.
+Weights are stored as safetensors / zip checkpoints and memory-mapped on
+load.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import shutil
+import tarfile
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, Optional
+
+from .encoder import encoder_fingerprint, get_encoder, register_encoder_path
+
+logger = logging.getLogger(__name__)
+
+BUNDLE_FORMAT = 1
+BUNDLE_MANIFEST = 'bundle.json'
+BUNDLE_ENV = 'SMARTSYNCH_BUNDLE'
+NLTK_PACKAGES = ('punkt', 'punkt_tab', 'stopwords', 'wordnet')
+
+_active: Optional['Bundle'] = None
+
+
+def _sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class Bundle:
+    """An unpacked bundle directory."""
+
+    def __init__(self, root: str):
+        self.root = Path(root)
+        manifest_file = self.root / BUNDLE_MANIFEST
+        if not manifest_file.exists():
+            raise FileNotFoundError(f"No {BUNDLE_MANIFEST} in {self.root}")
+        with open(manifest_file) as f:
+            self.manifest = json.load(f)
+        if self.manifest.get('format') != BUNDLE_FORMAT:
+            raise ValueError(f"Unsupported bundle format: {self.manifest.get('format')}")
+
+    @property
+    def version(self) -> str:
+        return self.manifest['version']
+
+    @property
+    def components(self) -> Dict[str, Dict]:
+        return self.manifest['components']
+
+    def path(self, component: str) -> Optional[Path]:
+        """Local path of a bundled component, or None if not bundled."""
+        entry = self.components.get(component)
+        return self.root / entry['path'] if entry else None
+
+    def resolve(self, model_name: str) -> str:
+        """Local path of a bundled model by hub name; other names pass through."""
+        for entry in self.components.values():
+            if entry.get('name') == model_name:
+                return str(self.root / entry['path'])
+        return model_name
+
+    def verify(self) -> Dict[str, str]:
+        """Check file hashes against the manifest; returns mismatched files."""
+        problems = {}
+        for relpath, expected in self.manifest['files'].items():
+            file_path = self.root / relpath
+            if not file_path.exists():
+                problems[relpath] = 'missing'
+            elif _sha256(file_path) != expected:
+                problems[relpath] = 'hash mismatch'
+        return problems
+
+
+def build_bundle(output_dir: str, version: str,
+                 encoder_name: str,
+                 head_path: Optional[str] = None,
+                 zero_shot_model: Optional[str] = None,
+                 nltk_packages: Iterable[str] = NLTK_PACKAGES,
+                 archive: bool = False) -> Path:
+    """
+    Pack models and resources into a bundle directory.
+
+    Args:
+        output_dir: Parent directory; the bundle is written to <output_dir>/<version>
+        version: Bundle version
+        encoder_name: Sentence encoder name or path
+        head_path: Trained head checkpoint (model.pt); its metadata.json is copied too
+        zero_shot_model: Zero-shot classification model name (None skips it)
+        nltk_packages: NLTK packages to include (empty skips NLTK data)
+        archive: Also write <output_dir>/<version>.tar.gz
+
+    Returns:
+        Path of the bundle directory (or archive when ``archive`` is set)
+    """
+    root = Path(output_dir) / version
+    if root.exists():
+        raise FileExistsError(f"Bundle {root} already exists")
+    tmp_root = root.with_name(root.name + '.tmp')
+    shutil.rmtree(tmp_root, ignore_errors=True)
+    tmp_root.mkdir(parents=True)
+    components = {}
+
+    logger.info(f"Bundling encoder {encoder_name}")
+    get_encoder(encoder_name).save(str(tmp_root / 'encoder'), safe_serialization=True)
+    components['encoder'] = {
+        'name': encoder_name,
+        'path': 'encoder',
+        'hash': encoder_fingerprint(encoder_name),
+    }
+
+    if zero_shot_model:
+        from transformers import AutoModelForSequenceClassification, AutoTokenizer
+
+        logger.info(f"Bundling zero-shot model {zero_shot_model}")
+        AutoModelForSequenceClassification.from_pretrained(zero_shot_model).save_pretrained(
+            str(tmp_root / 'zero_shot'), safe_serialization=True
+        )
+        AutoTokenizer.from_pretrained(zero_shot_model).save_pretrained(str(tmp_root / 'zero_shot'))
+        components['zero_shot'] = {'name': zero_shot_model, 'path': 'zero_shot'}
+
+    nltk_packages = list(nltk_packages)
+    if nltk_packages:
+        import nltk
+
+        logger.info(f"Bundling NLTK data: {', '.join(nltk_packages)}")
+        for package in nltk_packages:
+            if not nltk.download(package, download_dir=str(tmp_root / 'nltk_data'), quiet=True):
+                raise RuntimeError(f"Could not download NLTK package {package}")
+        components['nltk'] = {'path': 'nltk_data', 'packages': nltk_packages}
+
+    if head_path:
+        head_dir = tmp_root / 'head'
+        head_dir.mkdir()
+        shutil.copyfile(head_path, head_dir / 'model.pt')
+        metadata_file = Path(head_path).parent / 'metadata.json'
+        if metadata_file.exists():
+            shutil.copyfile(metadata_file, head_dir / 'metadata.json')
+        components['head'] = {'path': 'head/model.pt'}
+
+    manifest = {
+        'format': BUNDLE_FORMAT,
+        'version': version,
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'components': components,
+        'files': {
+            str(path.relative_to(tmp_root)): _sha256(path)
+            for path in sorted(tmp_root.rglob('*')) if path.is_file()
+        },
+    }
+    with open(tmp_root / BUNDLE_MANIFEST, 'w') as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp_root, root)
+    logger.info(f"Bundle {version} written to {root}")
+
+    if archive:
+        archive_path = shutil.make_archive(str(root), 'gztar', root_dir=str(root))
+        logger.info(f"Bundle archive written to {archive_path}")
+        return Path(archive_path)
+    return root
+
+
+def open_bundle(path: str) -> Bundle:
+    """
+    Open a bundle directory, unpacking a .tar.gz next to itself first.
+
+    Archives are unpacked once; later starts reuse the directory so weights
+    can be memory-mapped.
+    """
+    path = Path(path)
+    if path.is_file():
+        target = path.with_name(path.name.split('.tar')[0])
+        if not (target / BUNDLE_MANIFEST).exists():
+            logger.info(f"Unpacking bundle {path} to {target}")
+            tmp_target = target.with_name(target.name + '.tmp')
+            shutil.rmtree(tmp_target, ignore_errors=True)
+            with tarfile.open(path) as tar:
+                tar.extractall(tmp_target, filter='data')
+            os.replace(tmp_target, target)
+        path = target
+    return Bundle(str(path))
+
+
+def activate_bundle(path: str, verify: bool = False) -> Bundle:
+    """
+    Make the process load every model and resource from a bundle.
+
+    Args:
+        path: Bundle directory or .tar.gz archive
+        verify: Check every file hash before activating (slow for large bundles)
+
+    Returns:
+        The active bundle
+    """
+    global _active
+    bundle = open_bundle(path)
+    if verify:
+        problems = bundle.verify()
+        if problems:
+            raise ValueError(f"Bundle {bundle.root} failed verification: {problems}")
+
+    # No hub lookups from here on
+    os.environ['HF_HUB_OFFLINE'] = '1'
+    os.environ['TRANSFORMERS_OFFLINE'] = '1'
+
+    encoder = bundle.components.get('encoder')
+    if encoder:
+        register_encoder_path(encoder['name'], str(bundle.path('encoder')))
+    nltk_dir = bundle.path('nltk')
+    if nltk_dir is not None:
+        import nltk
+
+        if str(nltk_dir) not in nltk.data.path:
+            nltk.data.path.insert(0, str(nltk_dir))
+
+    _active = bundle
+    logger.info(f"Activated bundle {bundle.version} from {bundle.root}")
+    return bundle
+
+
+def activate_configured_bundle(config: Dict) -> Optional[Bundle]:
+    """Activate the bundle named by $SMARTSYNCH_BUNDLE or ``bundle.path`` in the config."""
+    path = os.environ.get(BUNDLE_ENV) or config.get('bundle', {}).get('path')
+    if not path:
+        return None
+    if _active is not None:
+        # One bundle per process; later callers share it
+        return _active
+    return activate_bundle(path, verify=config.get('bundle', {}).get('verify', False))
+
+
+def active_bundle() -> Optional[Bundle]:
+    """The bundle activated in this process, if any."""
+    return _active
+
+
+def resolve_model(model_name: str) -> str:
+    """Local bundle path for a model name when a bundle is active."""
+    return _active.resolve(model_name) if _active is not None else model_name
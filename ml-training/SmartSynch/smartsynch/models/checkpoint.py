@@ -0,0 +1,175 @@
+"""
+Checkpoints
+
+Head-only checkpoint format and a background writer.
+
+A checkpoint stores the classification head, optimizer/scheduler state and
+training progress, and refers to the sentence encoder by name and hash
+instead of embedding its weights. Writes are atomic (temp file + rename) so
+a crash mid-write never leaves a truncated checkpoint behind.
+"""
+
+import logging
+import os
+import tempfile
+import threading
+import zipfile
+from pathlib import Path
+from typing import Dict, Optional, Union
+
+import torch
+
+logger = logging.getLogger(__name__)
+
+CHECKPOINT_FORMAT = 2
+
+
+def head_only(state_dict: Dict) -> Dict:
+    """Drop encoder weights (present in checkpoints from older versions)."""
+    return {k: v for k, v in state_dict.items() if not k.startswith('encoder.')}
+
+
+def _snapshot(state: Dict) -> Dict:
+    """Detached CPU copy of a (nested) state dict, safe to write later."""
+    if isinstance(state, torch.Tensor):
+        return state.detach().to('cpu', copy=True)
+    if isinstance(state, dict):
+        return {k: _snapshot(v) for k, v in state.items()}
+    if isinstance(state, list):
+        return [_snapshot(v) for v in state]
+    return state
+
+
+def build_checkpoint(model, optimizer=None, scheduler=None,
+                     epoch: Optional[int] = None) -> Dict:
+    """
+    Build a head-only checkpoint from a TaskClassifier.
+
+    Tensors are copied to CPU immediately, so training can keep updating
+    the model while the checkpoint is written in the background.
+
+    Args:
+        model: TaskClassifier instance
+        optimizer: Optional optimizer whose state should be resumable
+        scheduler: Optional LR scheduler whose state should be resumable
+        epoch: Index of the last completed epoch
+
+    Returns:
+        Checkpoint dictionary
+    """
+    return {
+        'format': CHECKPOINT_FORMAT,
+        'head_state': _snapshot(head_only(model.state_dict())),
+        'optimizer_state': _snapshot(optimizer.state_dict()) if optimizer else None,
+        'scheduler_state': _snapshot(scheduler.state_dict()) if scheduler else None,
+        'epoch': epoch,
+        'best_val_loss': model.best_val_loss,
+        'patience_counter': model.patience_counter,
+        'history': {k: list(v) for k, v in model.history.items()},
+        'config': dict(model.config),
+        'encoder': {
+            'name': model.encoder_name,
+            'hash': model.config.get('encoder_hash'),
+        },
+    }
+
+
+def save_checkpoint(checkpoint: Dict, path: Union[str, Path]):
+    """Atomically write a checkpoint (or any torch-serializable object)."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            torch.save(checkpoint, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def load_checkpoint(path: Union[str, Path], map_location='cpu') -> Dict:
+    """
+    Load a checkpoint.
+
+    Plain state dicts written by older versions (which may include encoder
+    weights) are wrapped in the current format.
+
+    Args:
+        path: Checkpoint file
+        map_location: Passed to ``torch.load``
+
+    Returns:
+        Checkpoint dictionary with at least a ``head_state`` entry
+    """
+    # Zip-format checkpoints (torch.save's default) are memory-mapped
+    data = torch.load(path, map_location=map_location, mmap=zipfile.is_zipfile(path))
+    if isinstance(data, dict) and data.get('format') == CHECKPOINT_FORMAT:
+        return data
+    return {'format': 1, 'head_state': head_only(data), 'encoder': None}
+
+
+class CheckpointWriter:
+    """Writes checkpoints on a background thread."""
+
+    def __init__(self):
+        # Only the newest pending checkpoint per path is kept; an older
+        # one that has not been written yet is superseded
+        self._pending: Dict[Path, Dict] = {}
+        self._cond = threading.Condition()
+        self._busy = False
+        self._closed = False
+        self._error: Optional[BaseException] = None
+        self._thread = threading.Thread(target=self._run, name="checkpoint-writer", daemon=True)
+        self._thread.start()
+
+    def submit(self, checkpoint: Dict, path: Union[str, Path]):
+        """Queue a checkpoint for writing and return immediately."""
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("CheckpointWriter is closed")
+            self._pending[Path(path)] = checkpoint
+            self._cond.notify_all()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._pending and not self._closed:
+                    self._cond.wait()
+                if not self._pending and self._closed:
+                    return
+                path = next(iter(self._pending))
+                checkpoint = self._pending.pop(path)
+                self._busy = True
+            try:
+                save_checkpoint(checkpoint, path)
+                logger.debug(f"Wrote checkpoint {path}")
+            except BaseException as e:
+                logger.error(f"Failed to write checkpoint {path}: {str(e)}")
+                self._error = e
+            finally:
+                with self._cond:
+                    self._busy = False
+                    self._cond.notify_all()
+
+    def flush(self):
+        """Block until every queued checkpoint has been written."""
+        with self._cond:
+            while self._pending or self._busy:
+                self._cond.wait()
+        if self._error is not None:
+            error, self._error = self._error, None
+            raise error
+
+    def close(self):
+        """Flush pending writes and stop the writer thread."""
+        try:
+            self.flush()
+        finally:
+            with self._cond:
+                self._closed = True
+                self._cond.notify_all()
+            self._thread.join()
@@ -8,16 +8,19 @@ This module implements the core model architecture combining:
 
 import torch
 import torch.nn as nn
-from sentence_transformers import SentenceTransformer
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional, Tuple
 import torch.nn.functional as F
 import numpy as np
-import matplotlib.pyplot as plt
 import logging
 from torch.utils.data import DataLoader
 import os
 import json
+import time
 from datetime import datetime
+from .encoder import get_encoder, DEFAULT_ENCODER
+from .checkpoint import (
+    CheckpointWriter, build_checkpoint, head_only, load_checkpoint, save_checkpoint
+)
 
 class TaskClassifier(nn.Module):
     def __init__(self, config):
@@ -27,9 +30,10 @@ class TaskClassifier(nn.Module):
         self.best_val_loss = float('inf')
         self.patience_counter = 0
         
-        # Load pre-trained sentence transformer
-        self.encoder = SentenceTransformer('all-MiniLM-L6-v2')
-        self.embedding_dim = self.encoder.get_sentence_embedding_dimension()
+        # The classifier is a pure head over precomputed embeddings; the
+        # sentence encoder lives in the shared registry, not in this module
+        self.encoder_name = config.get('encoder_name', DEFAULT_ENCODER)
+        self.embedding_dim = config['embedding_dim']
         
         # Add attention mechanism
         self.attention = nn.Sequential(
@@ -59,6 +63,10 @@ class TaskClassifier(nn.Module):
             nn.Linear(128, config['num_classes'])
         )
 
+    def get_encoder(self):
+        """Shared sentence encoder matching this head (loaded on first call)."""
+        return get_encoder(self.encoder_name)
+
     def forward(self, x):
         # Convert input to tensor if it's not already
         if not isinstance(x, torch.Tensor):
@@ -96,73 +104,188 @@ class TaskClassifier(nn.Module):
         return predicted_classes.tolist(), confidences.tolist(), probabilities.tolist()
 
     def save(self, path: str):
-        """Save model state."""
-        torch.save(self.state_dict(), path)
+        """Save a head-only checkpoint."""
+        save_checkpoint(build_checkpoint(self), path)
 
     def load(self, path: str):
-        """Load model state."""
-        self.load_state_dict(torch.load(path)) 
+        """Load model state from a checkpoint (current or legacy format)."""
+        checkpoint = load_checkpoint(path)
+        self.load_state_dict(checkpoint['head_state'])
+        return checkpoint
+
+    @staticmethod
+    def head_state(state_dict: Dict) -> Dict:
+        """Drop encoder weights from state dicts saved by older versions."""
+        return head_only(state_dict)
+
+    def resume(self, path: str, optimizer=None, scheduler=None) -> int:
+        """
+        Restore head, optimizer/scheduler state and progress from a checkpoint.
+
+        Args:
+            path: Checkpoint file, or a run directory containing checkpoint.pt
+            optimizer: Optimizer to restore
+            scheduler: LR scheduler to restore
+
+        Returns:
+            Index of the epoch to continue from
+        """
+        if os.path.isdir(path):
+            path = os.path.join(path, 'checkpoint.pt')
+        checkpoint = self.load(path)
+
+        if optimizer is not None and checkpoint.get('optimizer_state'):
+            optimizer.load_state_dict(checkpoint['optimizer_state'])
+        if scheduler is not None and checkpoint.get('scheduler_state'):
+            scheduler.load_state_dict(checkpoint['scheduler_state'])
+        self.history = checkpoint.get('history', self.history)
+        self.best_val_loss = checkpoint.get('best_val_loss', self.best_val_loss)
+        self.patience_counter = checkpoint.get('patience_counter', 0)
+
+        # Keep writing into the run directory being resumed
+        self.model_save_dir = os.path.dirname(os.path.abspath(path))
+        epoch = checkpoint.get('epoch')
+        start_epoch = 0 if epoch is None else epoch + 1
+        logging.info(f"Resuming from {path} at epoch {start_epoch + 1}")
+        return start_epoch
+
+    def _run_dir(self) -> str:
+        """Directory shared by all checkpoints of this training run."""
+        if not hasattr(self, 'model_save_dir'):
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            self.model_save_dir = os.path.join(self.config['model_dir'], timestamp)
+        os.makedirs(self.model_save_dir, exist_ok=True)
+        return self.model_save_dir
+
+    def train_model(self, train_loader, val_loader, criterion, optimizer, device,
+                    scheduler=None, start_epoch: int = 0, compile_head: bool = False,
+                    autocast_dtype: Optional[torch.dtype] = None):
+        """
+        Train the model
 
-    def train_model(self, train_loader, val_loader, criterion, optimizer, device):
-        """Train the model"""
-        for epoch in range(self.config['num_epochs']):
+        Args:
+            train_loader: Iterable of (features, labels) batches (a DataLoader
+                or InMemoryBatches)
+            val_loader: Validation batches
+            criterion: Loss function
+            optimizer: Optimizer
+            device: Device the batches are moved to
+            scheduler: Optional LR scheduler stepped once per epoch
+            start_epoch: Epoch to continue from (see ``resume``)
+            compile_head: Run the training/validation forward passes through
+                torch.compile (checkpoints keep the plain module's weights)
+            autocast_dtype: Mixed-precision dtype (e.g. torch.bfloat16 on CPU)
+        """
+        forward = torch.compile(self) if compile_head else self
+        self.checkpoint_writer = CheckpointWriter()
+        try:
+            self._run_epochs(train_loader, val_loader, criterion, optimizer,
+                             device, scheduler, start_epoch, forward, autocast_dtype)
+            
+            # Save the training history
+            self._save_training_history()
+        finally:
+            self.checkpoint_writer.close()
+
+    def _run_epochs(self, train_loader, val_loader, criterion, optimizer, device,
+                    scheduler, start_epoch, forward=None, autocast_dtype=None):
+        if self.patience_counter >= self.config['early_stopping_patience']:
+            logging.info("Early stopping already triggered in the resumed run")
+            return
+
+        for epoch in range(start_epoch, self.config['num_epochs']):
             logging.info(f"Epoch {epoch+1}/{self.config['num_epochs']}")
             
             # Training phase
-            train_loss = self._train_epoch(train_loader, criterion, optimizer, device)
+            start = time.perf_counter()
+            train_loss, num_samples = self._train_epoch(
+                train_loader, criterion, optimizer, device, forward, autocast_dtype
+            )
+            epoch_time = time.perf_counter() - start
             self.history['train_loss'].append(train_loss)
-            logging.info(f"Train Loss: {train_loss:.4f}")
+            self.history.setdefault('epoch_time', []).append(epoch_time)
+            self.history.setdefault('samples_per_sec', []).append(num_samples / max(epoch_time, 1e-9))
+            logging.info(f"Train Loss: {train_loss:.4f} ({epoch_time:.3f}s, "
+                         f"{num_samples / max(epoch_time, 1e-9):.0f} samples/sec)")
             
             # Validation phase
-            val_loss = self._validate(val_loader, criterion, device)
+            val_loss = self._validate(val_loader, criterion, device, forward, autocast_dtype)
             self.history['val_loss'].append(val_loss)
             logging.info(f"Val Loss: {val_loss:.4f}")
             
+            if scheduler is not None:
+                scheduler.step()
+            
             # Early stopping check
-            if val_loss < self.best_val_loss:
+            improved = val_loss < self.best_val_loss
+            if improved:
                 self.best_val_loss = val_loss
                 self.patience_counter = 0
-                self._save_best_model()
             else:
                 self.patience_counter += 1
-                if self.patience_counter >= self.config['early_stopping_patience']:
-                    logging.info("Early stopping triggered!")
-                    break
-        
-        # Save the training history
-        self._save_training_history()
 
-    def _train_epoch(self, train_loader, criterion, optimizer, device):
+            # Resumable checkpoint of the latest epoch, written in the background
+            self.checkpoint_writer.submit(
+                build_checkpoint(self, optimizer, scheduler, epoch),
+                os.path.join(self._run_dir(), 'checkpoint.pt')
+            )
+            if improved:
+                self._save_best_model()
+            elif self.patience_counter >= self.config['early_stopping_patience']:
+                logging.info("Early stopping triggered!")
+                break
+
+    @staticmethod
+    def _autocast(device, dtype):
+        """Mixed-precision context (a no-op when ``dtype`` is None)."""
+        return torch.autocast(device_type=torch.device(device).type, dtype=dtype,
+                              enabled=dtype is not None)
+
+    def _train_epoch(self, train_loader, criterion, optimizer, device,
+                     forward=None, autocast_dtype=None):
+        """
+        Train for one epoch.
+
+        Returns:
+            (mean batch loss, number of samples)
+        """
         self.train()  # Set model to training mode
-        total_loss = 0.0
-        num_batches = len(train_loader)
+        forward = forward if forward is not None else self
+        # Summed on the device; synced once per epoch instead of once per batch
+        total_loss = torch.zeros((), device=device)
+        num_batches = 0
+        num_samples = 0
 
-        for batch_idx, (data, target) in enumerate(train_loader):
-            # Move data to device
+        for data, target in train_loader:
+            # Move data to device (a no-op for in-memory batches)
             data, target = data.to(device), target.to(device)
             
             # Zero the parameter gradients
-            optimizer.zero_grad()
+            optimizer.zero_grad(set_to_none=True)
             
             # Forward pass
-            output = self(data)
-            loss = criterion(output, target)
+            with self._autocast(device, autocast_dtype):
+                output = forward(data)
+                loss = criterion(output, target)
             
             # Backward pass and optimize
             loss.backward()
             optimizer.step()
             
             # Accumulate loss
-            total_loss += loss.item()
+            total_loss += loss.detach()
+            num_batches += 1
+            num_samples += target.size(0)
         
         # Return average loss for the epoch
-        return total_loss / num_batches
+        return total_loss.item() / max(num_batches, 1), num_samples
 
-    def _validate(self, val_loader, criterion, device):
+    def _validate(self, val_loader, criterion, device, forward=None, autocast_dtype=None):
         """Validate the model"""
         self.eval()  # Set model to evaluation mode
-        total_loss = 0.0
-        num_batches = len(val_loader)
+        forward = forward if forward is not None else self
+        total_loss = torch.zeros((), device=device)
+        num_batches = 0
 
         with torch.no_grad():  # No gradient computation needed for validation
             for data, target in val_loader:
@@ -170,32 +293,33 @@ class TaskClassifier(nn.Module):
                 data, target = data.to(device), target.to(device)
                 
                 # Forward pass
-                output = self(data)
-                loss = criterion(output, target)
+                with self._autocast(device, autocast_dtype):
+                    output = forward(data)
+                    loss = criterion(output, target)
                 
                 # Accumulate loss
-                total_loss += loss.item()
+                total_loss += loss.detach()
+                num_batches += 1
         
         # Return average validation loss
-        return total_loss / num_batches
+        return total_loss.item() / max(num_batches, 1)
 
     def _save_best_model(self):
         """Save the best model based on validation loss"""
-        import os
-        from datetime import datetime
-
-        # Create timestamp for the model directory if it doesn't exist
-        if not hasattr(self, 'model_save_dir'):
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            self.model_save_dir = os.path.join(self.config['model_dir'], timestamp)
-            os.makedirs(self.model_save_dir, exist_ok=True)
-
-        # Save the model
-        model_file = os.path.join(self.model_save_dir, 'best_model.pt')
-        torch.save(self.state_dict(), model_file)
+        # Snapshot now, write on the background thread
+        model_file = os.path.join(self._run_dir(), 'best_model.pt')
+        checkpoint = build_checkpoint(self)
+        writer = getattr(self, 'checkpoint_writer', None)
+        if writer is not None:
+            writer.submit(checkpoint, model_file)
+        else:
+            save_checkpoint(checkpoint, model_file)
 
     def _plot_training_history(self) -> None:
         """Plot training and validation loss curves"""
+        # Imported here so inference never pays for matplotlib
+        import matplotlib.pyplot as plt
+
         plt.figure(figsize=(10, 6))
         plt.plot(self.history['train_loss'], label='Training Loss')
         plt.plot(self.history['val_loss'], label='Validation Loss')
@@ -212,18 +336,22 @@ class TaskClassifier(nn.Module):
 
     def _save_training_history(self):
         """Save training history to JSON"""
-        # Create timestamp for the model directory
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        model_dir = os.path.join(self.config['model_dir'], timestamp)
-        os.makedirs(model_dir, exist_ok=True)
+        # Same run directory as the best-model checkpoints
+        model_dir = self._run_dir()
 
         # Save the training history
         history_file = os.path.join(model_dir, 'training_history.json')
-        with open(history_file, 'w') as f:
+        tmp_file = history_file + '.tmp'
+        with open(tmp_file, 'w') as f:
             json.dump(self.history, f)
+        os.replace(tmp_file, history_file)
 
         # Also save the model
         model_file = os.path.join(model_dir, 'model.pt')
-        torch.save(self.state_dict(), model_file)
+        writer = getattr(self, 'checkpoint_writer', None)
+        if writer is not None:
+            writer.submit(build_checkpoint(self), model_file)
+        else:
+            save_checkpoint(build_checkpoint(self), model_file)
         
         logging.info(f"Saved model and history to {model_dir}")
\ No newline at end of file
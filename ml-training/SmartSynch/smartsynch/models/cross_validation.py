@@ -0,0 +1,151 @@
+"""
+Cross-Validation
+
+Stratified k-fold (and repeated k-fold) cross-validation of the
+classification head. Every fold trains in a pool of worker processes that
+all map one shared-memory copy of the embeddings (see head_training), so
+the folds run at once across the cores instead of one after another:
+1. Fold indices come from StratifiedKFold / RepeatedStratifiedKFold
+2. Each fold holds out a stratified slice of its training rows for early
+   stopping, so the test fold never influences training
+3. Fold metrics are aggregated by ModelEvaluator.compute_cv_scores: mean and
+   std of accuracy, precision, recall and F1 plus the summed confusion matrix
+"""
+
+import contextlib
+import logging
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from sklearn.model_selection import (
+    RepeatedStratifiedKFold, StratifiedKFold, train_test_split
+)
+
+from ..utils.evaluation import ModelEvaluator
+from . import head_training
+from .executor import available_cpus
+
+logger = logging.getLogger(__name__)
+
+
+def fold_indices(labels: np.ndarray, folds: int = 5, repeats: int = 1,
+                 val_fraction: float = 0.1, seed: int = 0) -> List[Dict]:
+    """
+    Row indices of every fold.
+
+    Args:
+        labels: (n,) class indices
+        folds: Folds per repeat (k)
+        repeats: Repetitions with different shuffles
+        val_fraction: Share of each fold's training rows held out for early
+            stopping (0: stop on the training loss)
+        seed: Shuffling seed
+
+    Returns:
+        One dict per fold: repeat, fold, train, val (or None) and test indices
+    """
+    labels = np.asarray(labels)
+    if repeats > 1:
+        splitter = RepeatedStratifiedKFold(n_splits=folds, n_repeats=repeats, random_state=seed)
+    else:
+        splitter = StratifiedKFold(n_splits=folds, shuffle=True, random_state=seed)
+
+    splits = []
+    for i, (train, test) in enumerate(splitter.split(np.zeros(len(labels)), labels)):
+        val = None
+        if val_fraction > 0:
+            try:
+                train, val = train_test_split(train, test_size=val_fraction,
+                                              random_state=seed + i, stratify=labels[train])
+            except ValueError:
+                # Classes too small to stratify the slice
+                train, val = train_test_split(train, test_size=val_fraction, random_state=seed + i)
+        splits.append({'repeat': i // folds, 'fold': i % folds,
+                       'train': train, 'val': val, 'test': test})
+    return splits
+
+
+def _run_fold(split: Dict, params: Dict, num_classes: int, epochs: int,
+              seed: int) -> Tuple[Dict, Dict, float]:
+    """Train and test one fold on the worker's arrays (pool task)."""
+    start = time.perf_counter()
+    arrays = head_training.worker_arrays()
+    features, labels = arrays['X'], arrays['y']
+    val_index = split['train'] if split['val'] is None else split['val']
+    state = head_training.fit_head(
+        features, labels, params, num_classes, epochs,
+        train_index=split['train'], val_index=val_index, seed=seed
+    )
+    model = head_training.best_head(state, params, num_classes, features.shape[1])
+    metrics = head_training.evaluate_head(model, features, labels, num_classes, split['test'])
+    return split, {**metrics, 'epochs': state['epoch'], 'best_epoch': state['best_epoch'],
+                   'best_val_loss': state['best_val_loss']}, time.perf_counter() - start
+
+
+def cross_validate(features: np.ndarray, labels: np.ndarray, params: Dict,
+                   category_map: Dict[str, int], folds: int = 5, repeats: int = 1,
+                   epochs: int = 50, val_fraction: float = 0.1,
+                   workers: Optional[int] = None, seed: int = 0,
+                   pool: Optional[ProcessPoolExecutor] = None) -> Dict:
+    """
+    Cross-validate the head with the given hyperparameters.
+
+    Args:
+        features: (n, dim) embeddings
+        labels: (n,) class indices
+        params: learning_rate, dropout_rate, batch_size, early_stopping_patience
+            and optionally weight_decay
+        category_map: Category name -> index
+        folds: Folds per repeat (k)
+        repeats: Repetitions of k-fold with different shuffles
+        epochs: Epoch budget of each fold (early stopping may end it sooner)
+        val_fraction: Share of each fold's training rows used for early stopping
+        workers: Fold processes (default: one per CPU, at most one per fold)
+        seed: Fold and training seed
+        pool: Optional pool started with head_training.start_pool on specs
+            holding these arrays as "X" and "y"
+
+    Returns:
+        ModelEvaluator.compute_cv_scores of the test folds, plus the settings,
+        per-fold details and the wall-clock seconds
+    """
+    labels = np.asarray(labels, dtype=np.int64)
+    splits = fold_indices(labels, folds, repeats, val_fraction, seed)
+    start = time.perf_counter()
+    with contextlib.ExitStack() as stack:
+        if pool is None:
+            # One copy of the embeddings for every worker, unlinked on any exit
+            shared = stack.enter_context(head_training.SharedArrays({
+                'X': np.asarray(features, dtype=np.float32), 'y': labels
+            }))
+            pool = stack.enter_context(head_training.start_pool(
+                shared.specs, workers or min(len(splits), available_cpus())
+            ))
+        futures = [
+            pool.submit(_run_fold, split, params, len(category_map), epochs, seed + i)
+            for i, split in enumerate(splits)
+        ]
+        results = [future.result() for future in futures]
+    seconds = time.perf_counter() - start
+
+    fold_metrics = [metrics for _, metrics, _ in results]
+    report = ModelEvaluator(category_map).compute_cv_scores(fold_metrics)
+    report.update({
+        'folds': folds,
+        'repeats': repeats,
+        'params': params,
+        'seconds': round(seconds, 3),
+        'fold_details': [
+            {'repeat': split['repeat'], 'fold': split['fold'],
+             'train_samples': len(split['train']), 'test_samples': len(split['test']),
+             **{name: value for name, value in metrics.items() if name != 'confusion_matrix'},
+             'seconds': round(fold_seconds, 3)}
+            for split, metrics, fold_seconds in results
+        ],
+    })
+    accuracy, f1 = report['scores']['accuracy'], report['scores']['f1']
+    logger.info(f"{repeats}x{folds}-fold CV in {seconds:.1f}s: accuracy "
+                f"{accuracy['mean']:.4f} ± {accuracy['std']:.4f}, f1 {f1['mean']:.4f} ± {f1['std']:.4f}")
+    return report
@@ -0,0 +1,226 @@
+"""
+Embedding Cache
+
+Content-hash keyed cache for sentence embeddings with two tiers:
+1. A bounded in-process LRU
+2. A SQLite store on disk that every worker on a host can share and that
+   survives restarts
+
+Entries are namespaced by encoder id, so embeddings produced by one encoder
+(or precision) are never served for another.
+"""
+
+import hashlib
+import logging
+import sqlite3
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+def content_key(text: str) -> str:
+    """Stable content hash used as the cache key for a text."""
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+class EmbeddingStore:
+    """SQLite-backed embedding store shared between processes."""
+
+    def __init__(self, path: str, namespace: str):
+        """
+        Open (or create) an embedding store.
+
+        Args:
+            path: Path to the SQLite database file
+            namespace: Encoder id the stored vectors belong to
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.namespace = namespace
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        with self._lock:
+            conn = self._connection()
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS embeddings ("
+                " namespace TEXT NOT NULL,"
+                " key TEXT NOT NULL,"
+                " dim INTEGER NOT NULL,"
+                " vector BLOB NOT NULL,"
+                " PRIMARY KEY (namespace, key))"
+            )
+            conn.commit()
+
+    def _connection(self) -> sqlite3.Connection:
+        """The open connection, reconnecting after ``close`` (call under the lock)."""
+        if self._conn is None:
+            self._conn = sqlite3.connect(str(self.path), timeout=30, check_same_thread=False)
+            # WAL lets readers in other workers proceed while one writes
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+        return self._conn
+
+    def get_many(self, keys: Sequence[str]) -> Dict[str, np.ndarray]:
+        """Fetch the stored vectors for ``keys``; missing keys are omitted."""
+        found = {}
+        if not keys:
+            return found
+
+        # Stay well below SQLite's bound-parameter limit
+        chunk_size = 500
+        with self._lock:
+            for start in range(0, len(keys), chunk_size):
+                chunk = list(keys[start:start + chunk_size])
+                placeholders = ",".join("?" * len(chunk))
+                rows = self._connection().execute(
+                    f"SELECT key, vector FROM embeddings "
+                    f"WHERE namespace = ? AND key IN ({placeholders})",
+                    [self.namespace] + chunk
+                ).fetchall()
+                for key, blob in rows:
+                    found[key] = np.frombuffer(blob, dtype=np.float32)
+        return found
+
+    def put_many(self, vectors: Dict[str, np.ndarray]):
+        """Store vectors keyed by content hash."""
+        if not vectors:
+            return
+        rows = [
+            (self.namespace, key, int(vec.shape[-1]),
+             np.ascontiguousarray(vec, dtype=np.float32).tobytes())
+            for key, vec in vectors.items()
+        ]
+        with self._lock:
+            conn = self._connection()
+            conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (namespace, key, dim, vector) "
+                "VALUES (?, ?, ?, ?)",
+                rows
+            )
+            conn.commit()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._connection().execute(
+                "SELECT COUNT(*) FROM embeddings WHERE namespace = ?",
+                (self.namespace,)
+            ).fetchone()[0]
+
+    def close(self):
+        """
+        Close the connection. The next access reconnects, so a process can
+        close the store before forking and each child opens its own.
+        """
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+class EmbeddingCache:
+    """Two-tier (memory LRU + shared disk store) embedding cache."""
+
+    def __init__(self, namespace: str, memory_size: int = 4096,
+                 disk_path: Optional[str] = None):
+        """
+        Initialize the cache.
+
+        Args:
+            namespace: Encoder id (name/version) the cached vectors belong to
+            memory_size: Maximum number of vectors held in the in-process LRU
+            disk_path: Path to the shared SQLite store (None disables the tier)
+        """
+        self.namespace = namespace
+        self.memory_size = memory_size
+        self._memory: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.store = EmbeddingStore(disk_path, namespace) if disk_path else None
+
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _remember(self, key: str, vector: np.ndarray):
+        """Insert into the LRU, evicting the oldest entries if needed."""
+        if self.memory_size <= 0:
+            return
+        self._memory[key] = vector
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_size:
+            self._memory.popitem(last=False)
+            self.evictions += 1
+
+    def get_or_compute(self, texts: List[str],
+                       encode_fn: Callable[[List[str]], np.ndarray]) -> np.ndarray:
+        """
+        Return embeddings for ``texts``, encoding only the ones not cached.
+
+        Args:
+            texts: Input texts
+            encode_fn: Function encoding a list of texts to a (n, dim) array
+
+        Returns:
+            Array of shape (len(texts), dim) in input order
+        """
+        keys = [content_key(text) for text in texts]
+        vectors: Dict[str, np.ndarray] = {}
+
+        # Tier 1: in-process LRU
+        with self._lock:
+            for key in keys:
+                vector = self._memory.get(key)
+                if vector is not None:
+                    self._memory.move_to_end(key)
+                    vectors[key] = vector
+            self.memory_hits += sum(1 for key in keys if key in vectors)
+
+        # Tier 2: shared disk store
+        pending = [key for key in dict.fromkeys(keys) if key not in vectors]
+        if pending and self.store is not None:
+            found = self.store.get_many(pending)
+            with self._lock:
+                for key, vector in found.items():
+                    self._remember(key, vector)
+                self.disk_hits += sum(1 for key in keys if key in found)
+            vectors.update(found)
+
+        # Miss: encode the remaining unique texts in one call
+        missing = [key for key in dict.fromkeys(keys) if key not in vectors]
+        if missing:
+            text_by_key = dict(zip(keys, texts))
+            encoded = np.asarray(
+                encode_fn([text_by_key[key] for key in missing]), dtype=np.float32
+            )
+            computed = dict(zip(missing, encoded))
+            vectors.update(computed)
+            with self._lock:
+                for key, vector in computed.items():
+                    self._remember(key, vector)
+                self.misses += sum(1 for key in keys if key in computed)
+            if self.store is not None:
+                self.store.put_many(computed)
+
+        return np.stack([vectors[key] for key in keys])
+
+    def stats(self) -> Dict:
+        """Hit/miss/eviction counters for monitoring."""
+        with self._lock:
+            return {
+                "namespace": self.namespace,
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "memory_entries": len(self._memory),
+            }
+
+    def clear_memory(self):
+        """Drop the in-process tier (the shared store is left untouched)."""
+        with self._lock:
+            self._memory.clear()
@@ -0,0 +1,136 @@
+"""
+Encoder Registry
+
+Process-wide registry of sentence encoders. Every component that needs
+embeddings (classifier, predictor, data processor, API services) pulls its
+encoder from here so a serving process only ever holds one copy of each
+(model name, device, precision) combination.
+"""
+
+import hashlib
+import logging
+import threading
+from typing import TYPE_CHECKING, Dict, Tuple
+
+import torch
+
+from .precision import ENCODER_PRECISIONS, convert_encoder
+
+if TYPE_CHECKING:
+    from sentence_transformers import SentenceTransformer
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_ENCODER = 'all-MiniLM-L6-v2'
+DEFAULT_DEVICE = 'cpu'
+DEFAULT_PRECISION = 'fp32'
+
+_encoders: Dict[Tuple[str, str, str], 'SentenceTransformer'] = {}
+_fingerprints: Dict[str, str] = {}
+# Local directories serving a model name (see models/bundle.py)
+_paths: Dict[str, str] = {}
+_lock = threading.Lock()
+
+
+def _build_encoder(model_name: str, device: str, precision: str) -> 'SentenceTransformer':
+    """Load an encoder and cast it to the requested precision."""
+    if precision not in ENCODER_PRECISIONS:
+        raise ValueError(f"Unsupported encoder precision: {precision}")
+    if precision == 'int8' and device != 'cpu':
+        raise ValueError("int8 dynamic quantization is only supported on CPU")
+
+    # sentence-transformers (and transformers) take seconds to import, so
+    # processes that never load an encoder don't pay for them
+    from sentence_transformers import SentenceTransformer
+
+    source = _paths.get(model_name, model_name)
+    logger.info(f"Loading encoder {model_name} from {source} on {device} ({precision})")
+    encoder = SentenceTransformer(source, device=device)
+    convert_encoder(encoder, precision)
+    encoder.eval()
+    return encoder
+
+
+def get_encoder(model_name: str = DEFAULT_ENCODER,
+                device: str = DEFAULT_DEVICE,
+                precision: str = DEFAULT_PRECISION) -> 'SentenceTransformer':
+    """
+    Get the shared encoder for a model name, device and precision.
+
+    The encoder is loaded on first use and reused by every later caller.
+
+    Args:
+        model_name: Sentence-transformers model name or path
+        device: Torch device string (e.g. "cpu", "cuda")
+        precision: One of "fp32", "fp16", "bf16" or "int8"
+
+    Returns:
+        Shared SentenceTransformer instance
+    """
+    key = (model_name, str(device), precision)
+    encoder = _encoders.get(key)
+    if encoder is not None:
+        return encoder
+
+    with _lock:
+        # Another thread may have loaded it while we waited for the lock
+        if key not in _encoders:
+            _encoders[key] = _build_encoder(model_name, str(device), precision)
+        return _encoders[key]
+
+
+def register_encoder_path(model_name: str, path: str):
+    """
+    Load ``model_name`` from a local directory instead of the hub.
+
+    Registry keys, cache namespaces and fingerprints keep using the name.
+    """
+    _paths[model_name] = path
+
+
+def encoder_id(model_name: str = DEFAULT_ENCODER,
+               precision: str = DEFAULT_PRECISION) -> str:
+    """
+    Identifier for the vectors an encoder produces.
+
+    Used to namespace cached embeddings so that switching encoder or
+    precision never serves stale vectors.
+    """
+    return f"{model_name}@{precision}"
+
+
+def encoder_fingerprint(model_name: str = DEFAULT_ENCODER) -> str:
+    """
+    Content hash of an encoder's fp32 weights.
+
+    Checkpoints record it so a classification head can be matched to the
+    exact encoder that produced its training embeddings, and embedding
+    caches are namespaced by it so new weights behind the same name never
+    read old vectors.
+    """
+    if model_name not in _fingerprints:
+        # A process serving another precision does not keep an fp32 copy around
+        encoder = (_encoders.get((model_name, DEFAULT_DEVICE, DEFAULT_PRECISION))
+                   or _build_encoder(model_name, DEFAULT_DEVICE, DEFAULT_PRECISION))
+        _fingerprints[model_name] = weights_fingerprint(encoder)
+    return _fingerprints[model_name]
+
+
+def weights_fingerprint(encoder: 'SentenceTransformer') -> str:
+    """Content hash of a loaded (fp32) encoder's weights (see ``encoder_fingerprint``)."""
+    digest = hashlib.sha256()
+    for name, tensor in sorted(encoder.state_dict().items()):
+        digest.update(name.encode('utf-8'))
+        digest.update(tensor.detach().to('cpu', torch.float32).numpy().tobytes())
+    return digest.hexdigest()
+
+
+def loaded_encoders() -> Tuple[Tuple[str, str, str], ...]:
+    """Return the registry keys of all currently loaded encoders."""
+    return tuple(_encoders.keys())
+
+
+def clear_encoders():
+    """Drop all registered encoders (mainly for tests)."""
+    with _lock:
+        _encoders.clear()
@@ -0,0 +1,190 @@
+"""
+Inference Executor
+
+Bounded thread pool that runs blocking model calls off the asyncio event
+loop. The pool size and torch's intra-op thread count are derived from the
+CPUs available to the process so that, together, they do not oversubscribe
+the cores. Work beyond ``max_queue`` waiting calls is rejected instead of
+queueing without limit, and queue depth, wait and run times are exposed as
+metrics.
+"""
+
+import asyncio
+import logging
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+import torch
+
+logger = logging.getLogger(__name__)
+
+
+class InferenceQueueFull(RuntimeError):
+    """Raised when the executor already has ``max_queue`` calls waiting."""
+
+
+def available_cpus() -> int:
+    """CPUs this process may run on (respects affinity / cpusets)."""
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+class InferenceExecutor:
+    """Thread pool for blocking inference with bounded queueing."""
+
+    def __init__(self, max_workers: Optional[int] = None,
+                 torch_threads: Optional[int] = None,
+                 max_queue: int = 64, name: str = "inference",
+                 cpus: Optional[int] = None):
+        """
+        Initialize the executor.
+
+        Args:
+            max_workers: Concurrent inference calls (None: up to 2, bounded by CPUs)
+            torch_threads: torch intra-op threads (None: CPUs / max_workers).
+                This is a process-wide torch setting.
+            max_queue: Calls allowed to wait for a worker; 0 means unbounded
+            name: Thread name prefix and metrics label
+            cpus: CPUs this executor may use (None: all available to the
+                process; a forked serving worker passes its share)
+        """
+        cpus = cpus or available_cpus()
+        self.max_workers = max_workers or max(1, min(2, cpus))
+        self.torch_threads = torch_threads or max(1, cpus // self.max_workers)
+        self.max_queue = max_queue
+        self.name = name
+
+        torch.set_num_threads(self.torch_threads)
+        self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix=name)
+        self._lock = threading.Lock()
+        self._queued = 0
+        self._running = 0
+        self._counters = dict.fromkeys(
+            ('submitted', 'completed', 'failed', 'rejected', 'cancelled'), 0
+        )
+        self.max_queued = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+        self._run_total = 0.0
+        logger.info(f"{name} executor: {self.max_workers} workers x "
+                    f"{self.torch_threads} torch threads ({cpus} CPUs)")
+
+    @classmethod
+    def from_config(cls, config: Dict, cpus: Optional[int] = None) -> 'InferenceExecutor':
+        """Build from the ``executor`` section of the predictor config."""
+        return cls(
+            max_workers=config.get('max_workers'),
+            torch_threads=config.get('torch_threads'),
+            max_queue=config.get('max_queue', 64),
+            cpus=cpus,
+        )
+
+    def _submit(self, fn: Callable, *args, **kwargs) -> Future:
+        with self._lock:
+            if self.max_queue and self._queued >= self.max_queue:
+                self._counters['rejected'] += 1
+                raise InferenceQueueFull(
+                    f"{self.name}: {self._queued} calls already waiting"
+                )
+            self._queued += 1
+            self._counters['submitted'] += 1
+            self.max_queued = max(self.max_queued, self._queued)
+        submitted = time.perf_counter()
+
+        def task():
+            started = time.perf_counter()
+            with self._lock:
+                self._queued -= 1
+                self._running += 1
+                self._wait_total += started - submitted
+                self._wait_max = max(self._wait_max, started - submitted)
+            outcome = 'failed'
+            try:
+                result = fn(*args, **kwargs)
+                outcome = 'completed'
+                return result
+            finally:
+                with self._lock:
+                    self._running -= 1
+                    self._counters[outcome] += 1
+                    self._run_total += time.perf_counter() - started
+
+        future = self._pool.submit(task)
+
+        def on_done(done: Future):
+            # A future cancelled before it started never ran ``task``
+            if done.cancelled():
+                with self._lock:
+                    self._queued -= 1
+                    self._counters['cancelled'] += 1
+
+        future.add_done_callback(on_done)
+        return future
+
+    async def run(self, fn: Callable, *args, **kwargs) -> Any:
+        """
+        Run a blocking call on the pool and await its result.
+
+        Raises:
+            InferenceQueueFull: If ``max_queue`` calls are already waiting
+        """
+        return await asyncio.wrap_future(self._submit(fn, *args, **kwargs))
+
+    def stats(self) -> Dict:
+        """Queue depth, throughput and latency metrics."""
+        with self._lock:
+            counters = dict(self._counters)
+            started = counters['completed'] + counters['failed'] + self._running
+            finished = counters['completed'] + counters['failed']
+            return {
+                'max_workers': self.max_workers,
+                'torch_threads': self.torch_threads,
+                'max_queue': self.max_queue,
+                'queued': self._queued,
+                'running': self._running,
+                'max_queued': self.max_queued,
+                **counters,
+                'mean_wait_ms': 1000.0 * self._wait_total / started if started else 0.0,
+                'max_wait_ms': 1000.0 * self._wait_max,
+                'mean_run_ms': 1000.0 * self._run_total / finished if finished else 0.0,
+            }
+
+    def shutdown(self, wait: bool = True):
+        """Stop accepting work and (optionally) wait for running calls."""
+        self._pool.shutdown(wait=wait, cancel_futures=True)
+
+
+_shared: Optional[InferenceExecutor] = None
+_shared_lock = threading.Lock()
+
+
+def shared_executor(config: Optional[Dict] = None, cpus: Optional[int] = None) -> InferenceExecutor:
+    """
+    The process-wide inference executor, created on first use.
+
+    Args:
+        config: ``executor`` config section; only the first caller's applies
+        cpus: CPUs the executor may use (None: all available)
+
+    Returns:
+        The shared executor
+    """
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            _shared = InferenceExecutor.from_config(config or {}, cpus=cpus)
+        return _shared
+
+
+def shutdown_shared_executor():
+    """Shut down the shared executor; the next shared_executor() starts a new one."""
+    global _shared
+    with _shared_lock:
+        executor, _shared = _shared, None
+    if executor is not None:
+        executor.shutdown(wait=False)
@@ -0,0 +1,179 @@
+"""
+Model Export
+
+Exports a trained model (shared encoder + classification head) to
+optimized graph artifacts for the torchscript and onnxruntime backends,
+and checks them against eager PyTorch for parity and latency.
+"""
+
+import json
+import logging
+import statistics
+import time
+from pathlib import Path
+from typing import Dict, List, Sequence
+
+import numpy as np
+import torch
+import torch.nn.functional as F
+
+from .backends import (
+    EXPORT_REPORT, ONNX_ENCODER, ONNX_HEAD, TOKENIZER_DIR, TORCHSCRIPT_ENCODER,
+    TORCHSCRIPT_HEAD, EagerBackend, EncoderGraph, OnnxBackend, TorchScriptBackend, head_hash
+)
+from .encoder import weights_fingerprint
+
+logger = logging.getLogger(__name__)
+
+EXPORT_FORMATS = ('torchscript', 'onnx')
+ONNX_OPSET = 17
+
+
+def _example_inputs(encoder, embedding_dim: int):
+    """Token ids, mask and embeddings used to trace the graphs."""
+    tokens = encoder.tokenizer(
+        ["example task title", "a somewhat longer example task description"],
+        padding=True, truncation=True,
+        max_length=encoder.max_seq_length, return_tensors='pt'
+    )
+    return tokens['input_ids'], tokens['attention_mask'], torch.randn(2, embedding_dim)
+
+
+def export_torchscript(encoder_graph, head, example, output_dir: Path):
+    """Trace the encoder and head to TorchScript."""
+    input_ids, attention_mask, embeddings = example
+    with torch.no_grad():
+        traced_encoder = torch.jit.trace(encoder_graph, (input_ids, attention_mask), strict=False)
+        traced_head = torch.jit.trace(head, (embeddings,))
+    torch.jit.save(torch.jit.freeze(traced_encoder), str(output_dir / TORCHSCRIPT_ENCODER))
+    torch.jit.save(torch.jit.freeze(traced_head), str(output_dir / TORCHSCRIPT_HEAD))
+
+
+def export_onnx(encoder_graph, head, example, output_dir: Path):
+    """Export the encoder and head to ONNX with dynamic batch/sequence axes."""
+    input_ids, attention_mask, embeddings = example
+    with torch.no_grad():
+        torch.onnx.export(
+            encoder_graph, (input_ids, attention_mask), str(output_dir / ONNX_ENCODER),
+            input_names=['input_ids', 'attention_mask'],
+            output_names=['embeddings'],
+            dynamic_axes={
+                'input_ids': {0: 'batch', 1: 'sequence'},
+                'attention_mask': {0: 'batch', 1: 'sequence'},
+                'embeddings': {0: 'batch'},
+            },
+            opset_version=ONNX_OPSET,
+        )
+        torch.onnx.export(
+            head, (embeddings,), str(output_dir / ONNX_HEAD),
+            input_names=['embeddings'],
+            output_names=['logits'],
+            dynamic_axes={'embeddings': {0: 'batch'}, 'logits': {0: 'batch'}},
+            opset_version=ONNX_OPSET,
+        )
+
+
+def _probabilities(backend, texts: List[str]) -> np.ndarray:
+    embeddings = torch.from_numpy(np.asarray(backend.encode(texts), dtype=np.float32))
+    return F.softmax(backend.forward(embeddings), dim=-1).cpu().numpy()
+
+
+def check_parity(reference, backend, texts: List[str]) -> Dict[str, float]:
+    """
+    Compare a backend's class probabilities against a reference backend.
+
+    Returns:
+        Max absolute probability difference and argmax agreement rate
+    """
+    expected = _probabilities(reference, texts)
+    actual = _probabilities(backend, texts)
+    return {
+        'max_abs_prob_diff': float(np.abs(expected - actual).max()),
+        'argmax_agreement': float((expected.argmax(1) == actual.argmax(1)).mean()),
+    }
+
+
+def benchmark(backend, texts: List[str], batch_sizes: Sequence[int] = (1, 32),
+              repeats: int = 10) -> Dict[str, float]:
+    """
+    Median end-to-end latency (encode + head) per batch, in milliseconds.
+    """
+    results = {}
+    for batch_size in batch_sizes:
+        batch = (texts * (batch_size // max(len(texts), 1) + 1))[:batch_size]
+        _probabilities(backend, batch)  # warm-up
+        timings = []
+        for _ in range(repeats):
+            start = time.perf_counter()
+            _probabilities(backend, batch)
+            timings.append((time.perf_counter() - start) * 1000.0)
+        results[f"batch_{batch_size}_ms"] = statistics.median(timings)
+    return results
+
+
+def export_model(encoder, head, output_dir: str, texts: List[str],
+                 formats: Sequence[str] = EXPORT_FORMATS,
+                 metadata: Dict = None, tolerance: float = 1e-3) -> Dict:
+    """
+    Export encoder + head, then verify and benchmark every artifact.
+
+    Args:
+        encoder: SentenceTransformer used in eager serving
+        head: Trained TaskClassifier
+        output_dir: Directory receiving the graphs, tokenizer and report
+        texts: Sample texts for the parity check and latency comparison
+        formats: Subset of ("torchscript", "onnx")
+        metadata: Extra fields stored in the report (model version, ...)
+        tolerance: Largest accepted probability difference against eager
+
+    Returns:
+        Export report (also written to export_report.json)
+    """
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    head = head.cpu().eval()
+    embedding_dim = encoder.get_sentence_embedding_dimension()
+
+    # Graph backends read the tokenizer and report, so write them first
+    encoder.tokenizer.save_pretrained(str(output_dir / TOKENIZER_DIR))
+    report = {
+        **(metadata or {}),
+        # Serving refuses the artifact next to any other head
+        'head_digest': head_hash(head).hexdigest(),
+        # Namespaces the embeddings its encoder graph produces
+        'encoder_hash': weights_fingerprint(encoder),
+        'max_seq_length': encoder.max_seq_length,
+        'embedding_dim': embedding_dim,
+        'formats': list(formats),
+        'backends': {},
+    }
+    with open(output_dir / EXPORT_REPORT, 'w') as f:
+        json.dump(report, f, indent=2)
+
+    encoder_graph = EncoderGraph(encoder).cpu().eval()
+    example = _example_inputs(encoder, embedding_dim)
+    eager = EagerBackend(encoder, head)
+    report['backends']['eager'] = {'latency': benchmark(eager, texts)}
+
+    for export_format in formats:
+        logger.info(f"Exporting {export_format} graphs to {output_dir}")
+        if export_format == 'torchscript':
+            export_torchscript(encoder_graph, head, example, output_dir)
+            backend = TorchScriptBackend(str(output_dir))
+        elif export_format == 'onnx':
+            export_onnx(encoder_graph, head, example, output_dir)
+            backend = OnnxBackend(str(output_dir))
+        else:
+            raise ValueError(f"Unknown export format: {export_format}")
+
+        parity = check_parity(eager, backend, texts)
+        parity['passed'] = parity['max_abs_prob_diff'] <= tolerance
+        report['backends'][backend.name] = {
+            'parity': parity,
+            'latency': benchmark(backend, texts),
+        }
+        logger.info(f"{backend.name}: {report['backends'][backend.name]}")
+
+    with open(output_dir / EXPORT_REPORT, 'w') as f:
+        json.dump(report, f, indent=2)
+    return report
@@ -0,0 +1,242 @@
+"""
+Parallel Head Training
+
+Building blocks for training many classification heads at once (sweep
+trials, cross-validation folds) in a pool of worker processes:
+1. Embedding arrays every worker maps instead of copying: .npy files
+   memory-mapped read-only, or in-memory arrays placed in shared memory
+2. ``fit_head``: trains a head for a number of epochs on rows of those
+   arrays with early stopping, and can resume from the state it returned
+3. ``evaluate_head``: accuracy, precision, recall, F1 and the confusion matrix
+
+Workers are spawned (forking a process that holds torch threads can
+deadlock) and cap their torch threads so the pool does not oversubscribe
+the cores.
+"""
+
+import copy
+import logging
+import multiprocessing
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import torch
+from sklearn.metrics import confusion_matrix
+
+from ..data.batches import InMemoryBatches
+from ..utils.metrics import compute_metrics
+from .classifier import TaskClassifier
+from .executor import available_cpus
+
+logger = logging.getLogger(__name__)
+
+# Arrays attached by a pool worker, by name
+_worker: Dict[str, torch.Tensor] = {}
+
+
+def file_spec(path: str) -> Tuple:
+    """Spec of an .npy file that workers memory-map read-only."""
+    return ('file', str(path))
+
+
+class SharedArrays:
+    """In-memory arrays copied once into shared memory blocks for pool workers."""
+
+    def __init__(self, arrays: Dict[str, np.ndarray]):
+        self._blocks: List[shared_memory.SharedMemory] = []
+        self.specs: Dict[str, Tuple] = {}
+        try:
+            for name, array in arrays.items():
+                array = np.ascontiguousarray(array)
+                block = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+                self._blocks.append(block)
+                np.ndarray(array.shape, array.dtype, buffer=block.buf)[...] = array
+                self.specs[name] = ('shm', block.name, array.shape, array.dtype.str)
+        except BaseException:
+            # e.g. /dev/shm full: release the blocks created so far
+            self.close()
+            raise
+
+    def close(self):
+        """Release the blocks (after the workers are done with them)."""
+        for block in self._blocks:
+            block.close()
+            block.unlink()
+        self._blocks = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        self.close()
+
+
+def attach_array(spec: Tuple) -> np.ndarray:
+    """Map the array described by a spec without copying it."""
+    if spec[0] == 'file':
+        return np.load(spec[1], mmap_mode='r')
+    _, name, shape, dtype = spec
+    block = shared_memory.SharedMemory(name=name)
+    array = np.ndarray(shape, np.dtype(dtype), buffer=block.buf)
+    # Keep the mapping alive as long as the array
+    _worker.setdefault('_blocks', []).append(block)
+    return array
+
+
+def as_tensor(array: np.ndarray) -> torch.Tensor:
+    """Tensor sharing the memory of a (possibly read-only) mapped array."""
+    with warnings.catch_warnings():
+        # Training only ever reads the features; nothing writes through the tensor
+        warnings.simplefilter('ignore', UserWarning)
+        return torch.from_numpy(array)
+
+
+def _init_worker(specs: Dict[str, Tuple], torch_threads: int):
+    torch.set_num_threads(torch_threads)
+    for name, spec in specs.items():
+        _worker[name] = as_tensor(attach_array(spec))
+
+
+def worker_arrays() -> Dict[str, torch.Tensor]:
+    """Arrays attached by this pool worker."""
+    return {name: array for name, array in _worker.items() if not name.startswith('_')}
+
+
+def start_pool(specs: Dict[str, Tuple], workers: Optional[int] = None) -> ProcessPoolExecutor:
+    """
+    Start training workers that attach the arrays in ``specs``.
+
+    Args:
+        specs: Array name -> ``file_spec`` or ``SharedArrays.specs`` entry
+        workers: Processes (default: one per available CPU)
+
+    Returns:
+        The process pool
+    """
+    cpus = available_cpus()
+    workers = workers or cpus
+    torch_threads = max(1, cpus // workers)
+    logger.info(f"Starting {workers} training workers ({torch_threads} torch threads each)")
+    return ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context('spawn'),
+        initializer=_init_worker,
+        initargs=(specs, torch_threads)
+    )
+
+
+def build_head(params: Dict, num_classes: int, embedding_dim: int) -> TaskClassifier:
+    """Head configured with a trial's hyperparameters."""
+    return TaskClassifier({
+        'num_classes': num_classes,
+        'embedding_dim': embedding_dim,
+        'dropout_rate': params['dropout_rate'],
+        'num_epochs': params.get('num_epochs', 0),
+        'early_stopping_patience': params['early_stopping_patience'],
+        'model_dir': 'models/fine_tuned',
+    })
+
+
+def predict_labels(model: TaskClassifier, features: torch.Tensor,
+                   indices: Optional[Sequence[int]] = None, batch_size: int = 4096) -> np.ndarray:
+    """Predicted class of every (selected) row."""
+    model.eval()
+    labels = torch.zeros(len(features), dtype=torch.long)
+    predictions = []
+    with torch.no_grad():
+        for batch, _ in InMemoryBatches(features, labels, batch_size, indices=indices):
+            predictions.append(model(batch).argmax(dim=1))
+    return torch.cat(predictions).numpy() if predictions else np.empty(0, dtype=np.int64)
+
+
+def evaluate_head(model: TaskClassifier, features: torch.Tensor, labels: torch.Tensor,
+                  num_classes: int, indices: Optional[Sequence[int]] = None) -> Dict:
+    """
+    Metrics of a head on (selected rows of) a labeled set.
+
+    Returns:
+        {"accuracy", "precision", "recall", "f1", "confusion_matrix"}
+    """
+    y_pred = predict_labels(model, features, indices)
+    y_true = (labels if indices is None else labels[torch.as_tensor(indices)]).numpy()
+    metrics = {name: float(value) for name, value in compute_metrics(y_true, y_pred).items()}
+    metrics['confusion_matrix'] = confusion_matrix(
+        y_true, y_pred, labels=list(range(num_classes))
+    ).tolist()
+    return metrics
+
+
+def fit_head(features: torch.Tensor, labels: torch.Tensor, params: Dict, num_classes: int,
+             epochs: int, train_index: Optional[Sequence[int]] = None,
+             val_features: Optional[torch.Tensor] = None, val_labels: Optional[torch.Tensor] = None,
+             val_index: Optional[Sequence[int]] = None, state: Optional[Dict] = None,
+             seed: int = 0) -> Dict:
+    """
+    Train a head up to ``epochs`` total epochs, with early stopping on the
+    validation loss.
+
+    Args:
+        features, labels: Training arrays (rows ``train_index``, default all)
+        params: learning_rate, dropout_rate, batch_size, early_stopping_patience
+            and optionally weight_decay
+        num_classes: Output classes
+        epochs: Total epochs to have trained when this call returns
+        val_features, val_labels: Validation arrays (default: the training arrays)
+        val_index: Validation rows (default all)
+        state: State returned by an earlier call, to continue from
+        seed: Seed of the initialization, dropout and shuffling
+
+    Returns:
+        Resumable state: "epoch", "best_val_loss", "best_epoch", "stopped"
+        (early stopping triggered), "history", "model", "optimizer" and
+        "best_model" (weights of the best epoch)
+    """
+    if val_features is None:
+        val_features, val_labels = features, labels
+    epoch = state['epoch'] if state else 0
+    # Resumed segments draw fresh (but reproducible) randomness
+    torch.manual_seed(seed * 1000003 + epoch)
+    model = build_head(params, num_classes, features.shape[1])
+    optimizer = torch.optim.Adam(model.parameters(), lr=params['learning_rate'],
+                                 weight_decay=params.get('weight_decay', 0.0), foreach=True)
+    if state:
+        model.load_state_dict(state['model'])
+        optimizer.load_state_dict(state['optimizer'])
+        state = dict(state, history={name: list(values) for name, values in state['history'].items()})
+    else:
+        state = {'epoch': 0, 'best_val_loss': float('inf'), 'best_epoch': None,
+                 'patience_counter': 0, 'stopped': False, 'best_model': None,
+                 'history': {'train_loss': [], 'val_loss': []}}
+
+    criterion = torch.nn.CrossEntropyLoss()
+    train_batches = InMemoryBatches(features, labels, int(params['batch_size']),
+                                    shuffle=True, indices=train_index)
+    val_batches = InMemoryBatches(val_features, val_labels, 4096, indices=val_index)
+    while state['epoch'] < epochs and not state['stopped']:
+        train_loss, _ = model._train_epoch(train_batches, criterion, optimizer, 'cpu')
+        val_loss = model._validate(val_batches, criterion, 'cpu')
+        state['history']['train_loss'].append(train_loss)
+        state['history']['val_loss'].append(val_loss)
+        state['epoch'] += 1
+        if val_loss < state['best_val_loss']:
+            state.update(best_val_loss=val_loss, best_epoch=state['epoch'], patience_counter=0,
+                         best_model=copy.deepcopy(model.state_dict()))
+        else:
+            state['patience_counter'] += 1
+            state['stopped'] = state['patience_counter'] >= params['early_stopping_patience']
+
+    state['model'] = model.state_dict()
+    state['optimizer'] = optimizer.state_dict()
+    return state
+
+
+def best_head(state: Dict, params: Dict, num_classes: int, embedding_dim: int) -> TaskClassifier:
+    """Head with the best-epoch weights of a ``fit_head`` state."""
+    model = build_head(params, num_classes, embedding_dim)
+    model.load_state_dict(state['best_model'] or state['model'])
+    model.history = state['history']
+    model.best_val_loss = state['best_val_loss']
+    return model.eval()
@@ -5,12 +5,12 @@ Handles model loading, saving, and version management.
 """
 
 import os
+import shutil
 from pathlib import Path
 import json
 from typing import Dict, Optional
 from .classifier import TaskClassifier
 import logging
-import torch
 
 class ModelManager:
     def __init__(self, model_dir: str = "models/fine_tuned"):
@@ -23,6 +23,7 @@ class ModelManager:
         self.model_dir = Path(model_dir)
         self.model_dir.mkdir(parents=True, exist_ok=True)
         self.current_model: Optional[TaskClassifier] = None
+        self.model_metadata: Dict = {}
         
         # Initialize default category map
         self.category_map = {
@@ -51,17 +52,87 @@ class ModelManager:
         version_dir = self.model_dir / version
         version_dir.mkdir(exist_ok=True)
 
-        # Save model state
+        # Save model state (head only; the encoder is referenced by name/hash)
         model.save(str(version_dir / "model.pt"))
 
         # Save metadata
         metadata = {
             "version": version,
             "category_map": category_map,
-            "metrics": metrics
+            "metrics": metrics,
+            "encoder": {
+                "name": model.encoder_name,
+                "hash": model.config.get('encoder_hash')
+            }
         }
-        with open(version_dir / "metadata.json", "w") as f:
+        tmp_file = version_dir / "metadata.json.tmp"
+        with open(tmp_file, "w") as f:
             json.dump(metadata, f, indent=2)
+        os.replace(tmp_file, version_dir / "metadata.json")
+
+    def register_variant(self, model_path: str, precision: Dict[str, str],
+                         gate: Dict) -> Path:
+        """
+        Register a reduced-precision variant of a trained model.
+
+        The variant shares the fp32 head weights of the base model; its
+        metadata records the precision to convert to at load time and the
+        accuracy gate results it was accepted with. Variants are only served
+        when their model.pt is passed to ``load_model`` explicitly.
+
+        Args:
+            model_path: Path to the base model.pt
+            precision: {"encoder": ..., "head": ...} precision modes
+            gate: Evaluation results that passed the accuracy gate
+
+        Returns:
+            Directory of the registered variant
+        """
+        base_dir = Path(model_path).parent
+        base_metadata = self._read_metadata(base_dir)
+        suffix = f"{precision['encoder']}-{precision['head']}"
+        version = f"{base_metadata.get('version', base_dir.name)}-{suffix}"
+        version_dir = self.model_dir / version
+        version_dir.mkdir(parents=True, exist_ok=True)
+        shutil.copyfile(model_path, version_dir / "model.pt")
+
+        metadata = {
+            **base_metadata,
+            "version": version,
+            "base_version": base_metadata.get('version', base_dir.name),
+            "category_map": base_metadata.get('category_map', self.category_map),
+            "precision": precision,
+            "gate": gate
+        }
+        tmp_file = version_dir / "metadata.json.tmp"
+        with open(tmp_file, "w") as f:
+            json.dump(metadata, f, indent=2)
+        os.replace(tmp_file, version_dir / "metadata.json")
+        self.logger.info(f"Registered {suffix} variant at {version_dir}")
+        return version_dir
+
+    @staticmethod
+    def _read_metadata(version_dir: Path) -> Dict:
+        """Metadata stored next to a model.pt, if any."""
+        metadata_file = Path(version_dir) / "metadata.json"
+        if not metadata_file.exists():
+            return {}
+        with open(metadata_file) as f:
+            return json.load(f)
+
+    @classmethod
+    def latest_model(cls, model_dir: Path) -> Optional[Path]:
+        """
+        model.pt of the most recent trained version in ``model_dir``.
+
+        Reduced-precision variants (registered with a base_version) are
+        skipped: they are only served when their path is given explicitly.
+        """
+        models = [
+            path for path in Path(model_dir).glob('*/model.pt')
+            if 'base_version' not in cls._read_metadata(path.parent)
+        ]
+        return max(models, key=lambda p: p.parent.name) if models else None
 
     def load_model(self, model_version=None):
         """Load the model"""
@@ -82,18 +153,19 @@ class ModelManager:
             # Try to load the trained model
             if model_version and os.path.exists(model_version):
                 logging.info(f"Loading fine-tuned model from {model_version}")
-                model.load_state_dict(torch.load(model_version))
+                model.load(model_version)
+                self.model_metadata = self._read_metadata(Path(model_version).parent)
                 model.eval()  # Set to evaluation mode
                 return model
             else:
                 # List available models
                 model_dir = Path('models/fine_tuned')
                 if model_dir.exists():
-                    models = list(model_dir.glob('*/model.pt'))
-                    if models:
-                        latest_model = max(models, key=lambda p: p.parent.name)
+                    latest_model = self.latest_model(model_dir)
+                    if latest_model is not None:
                         logging.info(f"Loading latest model: {latest_model}")
-                        model.load_state_dict(torch.load(latest_model))
+                        model.load(latest_model)
+                        self.model_metadata = self._read_metadata(latest_model.parent)
                         model.eval()  # Set to evaluation mode
                         return model
                 
@@ -112,11 +184,10 @@ class ModelManager:
         train_model()  # This will train and save a new model
         
         # Try to load the newly trained model
-        model_dir = Path('models/fine_tuned')
-        latest_model = max(model_dir.glob('*/model.pt'), key=lambda p: p.parent.name)
+        latest_model = self.latest_model(Path('models/fine_tuned'))
         
         model = TaskClassifier(config=model_config)
-        model.load_state_dict(torch.load(latest_model))
+        model.load(latest_model)
         model.eval()
         
         return model
@@ -0,0 +1,205 @@
+"""
+Model Pool
+
+Process-wide pool of lazily loaded models (e.g. zero-shot NLI models):
+- Each model is loaded at most once, even when many requests ask for it
+  at the same time; later callers wait for the first caller's load.
+- Loaded models are kept in LRU order. When their total size exceeds the
+  memory budget, the least recently used ones are evicted.
+- Load times, sizes, hits and evictions are reported for the metrics
+  endpoint.
+"""
+
+import asyncio
+import functools
+import logging
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Iterable, Optional
+
+import torch
+
+logger = logging.getLogger(__name__)
+
+
+def module_bytes(model: Any) -> int:
+    """Bytes held by a module's parameters and buffers (0 for non-modules)."""
+    module = model if isinstance(model, torch.nn.Module) else getattr(model, 'model', None)
+    if not isinstance(module, torch.nn.Module):
+        return 0
+    tensors = list(module.parameters()) + list(module.buffers())
+    return sum(tensor.numel() * tensor.element_size() for tensor in tensors)
+
+
+class ModelPool:
+    """Load-once model pool with a memory budget and LRU eviction."""
+
+    def __init__(self, loader: Callable[[str], Any],
+                 memory_budget_mb: Optional[float] = None,
+                 size_fn: Callable[[Any], int] = module_bytes,
+                 name: str = "models"):
+        """
+        Initialize the pool.
+
+        Args:
+            loader: Function loading a model by name (blocking)
+            memory_budget_mb: Total size of resident models (None: unbounded)
+            size_fn: Function returning a loaded model's size in bytes
+            name: Name used in logs
+        """
+        self.loader = loader
+        self.memory_budget = memory_budget_mb * 2 ** 20 if memory_budget_mb else None
+        self.size_fn = size_fn
+        self.name = name
+
+        self._lock = threading.Lock()
+        self._models: "OrderedDict[str, Any]" = OrderedDict()
+        self._loading: Dict[str, Future] = {}
+        self._info: Dict[str, Dict] = {}
+        self._counters = dict.fromkeys(
+            ('hits', 'misses', 'waits', 'loads', 'load_failures', 'evictions'), 0
+        )
+
+    def _claim(self, name: str):
+        """Return (model, None), (None, future to wait on) or (None, None) for the loader."""
+        with self._lock:
+            if name in self._models:
+                self._models.move_to_end(name)
+                self._counters['hits'] += 1
+                self._info[name]['hits'] += 1
+                self._info[name]['last_used'] = time.time()
+                return self._models[name], None
+            if name in self._loading:
+                self._counters['waits'] += 1
+                return None, self._loading[name]
+            self._counters['misses'] += 1
+            self._loading[name] = Future()
+            return None, None
+
+    def _load(self, name: str) -> Any:
+        """Load a claimed model, admit it and wake up the waiters."""
+        with self._lock:
+            future = self._loading[name]
+        start = time.perf_counter()
+        try:
+            model = self.loader(name)
+        except BaseException as e:
+            with self._lock:
+                self._counters['load_failures'] += 1
+                del self._loading[name]
+            future.set_exception(e)
+            raise
+        load_s = time.perf_counter() - start
+        size = self.size_fn(model)
+
+        with self._lock:
+            self._models[name] = model
+            self._info[name] = {
+                'size_mb': size / 2 ** 20,
+                'load_s': load_s,
+                'hits': 0,
+                'last_used': time.time(),
+            }
+            self._counters['loads'] += 1
+            del self._loading[name]
+            evicted = self._evict(keep=name)
+        logger.info(f"{self.name}: loaded {name} in {load_s:.1f}s ({size / 2 ** 20:.0f} MB)"
+                    + (f", evicted {', '.join(evicted)}" if evicted else ""))
+        future.set_result(model)
+        return model
+
+    def _evict(self, keep: str):
+        """Drop least recently used models until the budget fits (call under the lock)."""
+        evicted = []
+        if self.memory_budget is None:
+            return evicted
+        while self._used_bytes() > self.memory_budget:
+            victim = next((name for name in self._models if name != keep), None)
+            if victim is None:
+                logger.warning(f"{self.name}: {keep} alone exceeds the memory budget")
+                break
+            del self._models[victim]
+            del self._info[victim]
+            self._counters['evictions'] += 1
+            evicted.append(victim)
+        return evicted
+
+    def _used_bytes(self) -> float:
+        return sum(info['size_mb'] for info in self._info.values()) * 2 ** 20
+
+    def get(self, name: str) -> Any:
+        """Return a model, loading it (once) if it is not resident."""
+        model, future = self._claim(name)
+        if model is not None:
+            return model
+        if future is not None:
+            return future.result()
+        return self._load(name)
+
+    async def aget(self, name: str, executor) -> Any:
+        """
+        Return a model without blocking the event loop.
+
+        Cancelling a caller (e.g. a disconnected client) never cancels the
+        shared load: it keeps running for the other callers and the pool.
+
+        Args:
+            name: Model name
+            executor: InferenceExecutor the load runs on
+
+        Returns:
+            The loaded model
+        """
+        model, future = self._claim(name)
+        if model is not None:
+            return model
+        if future is not None:
+            return await asyncio.shield(asyncio.wrap_future(future))
+        with self._lock:
+            claimed = self._loading[name]
+        load = asyncio.ensure_future(executor.run(self._load, name))
+        load.add_done_callback(functools.partial(self._load_done, name, claimed))
+        return await asyncio.shield(load)
+
+    def _load_done(self, name: str, claimed: Future, load: asyncio.Future):
+        """Release a claim whose load never ran (queue full or cancelled)."""
+        error = None if load.cancelled() else load.exception()
+        if claimed.done():
+            # _load ran and already resolved the waiters
+            return
+        with self._lock:
+            if self._loading.get(name) is claimed:
+                # Let the next caller claim it
+                del self._loading[name]
+        if error is None:
+            claimed.cancel()
+        else:
+            claimed.set_exception(error)
+
+    def preload(self, names: Iterable[str]):
+        """Load models ahead of the first request."""
+        for name in names:
+            self.get(name)
+
+    def peek(self, name: str) -> Optional[Any]:
+        """A resident model, without loading it or counting a lookup."""
+        with self._lock:
+            return self._models.get(name)
+
+    def stats(self) -> Dict:
+        """Resident models, memory use and hit/load/eviction counters."""
+        with self._lock:
+            counters = dict(self._counters)
+            models = {name: dict(self._info[name]) for name in self._models}
+            loading = list(self._loading)
+        lookups = counters['hits'] + counters['misses'] + counters['waits']
+        return {
+            'memory_budget_mb': self.memory_budget / 2 ** 20 if self.memory_budget else None,
+            'used_mb': sum(info['size_mb'] for info in models.values()),
+            **counters,
+            'hit_rate': counters['hits'] / lookups if lookups else 0.0,
+            'loading': loading,
+            'models': models,
+        }
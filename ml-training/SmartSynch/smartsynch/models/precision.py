@@ -0,0 +1,143 @@
+"""
+Reduced Precision
+
+Helpers for running the encoder and classification head in reduced
+precision on CPU:
+- int8: dynamic quantization of nn.Linear layers
+- bf16: bfloat16 weights and activations
+"""
+
+import copy
+import io
+import statistics
+import time
+from typing import Dict, Tuple
+
+import numpy as np
+import torch
+import torch.nn as nn
+
+HEAD_PRECISIONS = ('fp32', 'bf16', 'int8')
+ENCODER_PRECISIONS = ('fp32', 'fp16', 'bf16', 'int8')
+
+_FLOAT_DTYPES = {
+    'fp32': torch.float32,
+    'fp16': torch.float16,
+    'bf16': torch.bfloat16,
+}
+
+
+def _quantize_dynamic(module: nn.Module) -> nn.Module:
+    return torch.ao.quantization.quantize_dynamic(module, {nn.Linear}, dtype=torch.qint8)
+
+
+def convert_encoder(encoder: nn.Module, precision: str) -> nn.Module:
+    """
+    Convert an encoder in place to the requested precision.
+
+    Args:
+        encoder: SentenceTransformer (or any module) in fp32
+        precision: One of ENCODER_PRECISIONS
+
+    Returns:
+        The converted encoder
+    """
+    if precision not in ENCODER_PRECISIONS:
+        raise ValueError(f"Unsupported encoder precision: {precision}")
+    if precision == 'int8':
+        # Swap each Linear for its dynamically quantized counterpart
+        torch.ao.quantization.quantize_dynamic(
+            encoder, {nn.Linear}, dtype=torch.qint8, inplace=True
+        )
+    elif precision != 'fp32':
+        encoder.to(_FLOAT_DTYPES[precision])
+    return encoder
+
+
+def convert_head(head: nn.Module, precision: str) -> nn.Module:
+    """
+    Copy of a TaskClassifier in the requested precision.
+
+    int8 quantizes the Linear layers of ``head.classifier``; bf16 casts the
+    whole head. The original module is left untouched.
+
+    Args:
+        head: TaskClassifier in fp32
+        precision: One of HEAD_PRECISIONS
+
+    Returns:
+        Converted copy in eval mode (or ``head`` itself for fp32)
+    """
+    if precision not in HEAD_PRECISIONS:
+        raise ValueError(f"Unsupported head precision: {precision}")
+    if precision == 'fp32':
+        return head
+
+    converted = copy.deepcopy(head).cpu().eval()
+    if precision == 'int8':
+        converted.classifier = _quantize_dynamic(converted.classifier)
+    else:
+        converted.to(_FLOAT_DTYPES[precision])
+    return converted
+
+
+def input_dtype(module: nn.Module) -> torch.dtype:
+    """Dtype a module expects its float inputs in."""
+    for param in module.parameters():
+        if param.is_floating_point():
+            return param.dtype
+    return torch.float32
+
+
+def serialized_size(module: nn.Module) -> int:
+    """Size in bytes of a module's serialized state (including packed int8 weights)."""
+    buffer = io.BytesIO()
+    torch.save(module.state_dict(), buffer)
+    return buffer.getbuffer().nbytes
+
+
+def run_head(head: nn.Module, embeddings: torch.Tensor,
+             repeats: int = 20) -> Tuple[np.ndarray, np.ndarray, float]:
+    """
+    Classify embeddings with a (possibly converted) head and time it.
+
+    Returns:
+        Predicted class ids, confidences and median latency in milliseconds
+    """
+    inputs = embeddings.to(input_dtype(head))
+    timings = []
+    with torch.no_grad():
+        for _ in range(max(repeats, 1)):
+            start = time.perf_counter()
+            logits = head(inputs)
+            timings.append((time.perf_counter() - start) * 1000.0)
+    probabilities = torch.softmax(logits.float(), dim=-1)
+    confidences, predictions = probabilities.max(dim=-1)
+    return predictions.numpy(), confidences.numpy(), statistics.median(timings)
+
+
+def accuracy_gate(reference: np.ndarray, predictions: np.ndarray, labels: np.ndarray,
+                  max_accuracy_drop: float, min_agreement: float) -> Dict:
+    """
+    Decide whether a reduced-precision variant is accurate enough to ship.
+
+    Args:
+        reference: fp32 predictions
+        predictions: Variant predictions
+        labels: True labels
+        max_accuracy_drop: Largest accepted accuracy loss against fp32
+        min_agreement: Smallest accepted fraction of predictions equal to fp32
+
+    Returns:
+        Accuracy, agreement with fp32 and whether the gate passed
+    """
+    reference_accuracy = float((reference == labels).mean())
+    accuracy = float((predictions == labels).mean())
+    agreement = float((predictions == reference).mean())
+    return {
+        'accuracy': accuracy,
+        'accuracy_drop': reference_accuracy - accuracy,
+        'agreement': agreement,
+        'passed': (reference_accuracy - accuracy <= max_accuracy_drop
+                   and agreement >= min_agreement),
+    }
@@ -6,16 +6,27 @@ Provides a high-level interface for making task category predictions.
 
 from typing import List, Dict, Tuple
 from smartsynch.models.manager import ModelManager
-from smartsynch.data.processor import DataProcessor
+from smartsynch.data.processor import prepared_text
+from smartsynch.models.encoder import get_encoder, encoder_fingerprint, encoder_id
+from smartsynch.models.embedding_cache import EmbeddingCache
+from smartsynch.models.backends import head_hash, load_backend
+from smartsynch.models.bundle import activate_configured_bundle
+from smartsynch.models.precision import convert_head
+from smartsynch.models.executor import InferenceExecutor, shared_executor
+from smartsynch.utils.helpers import load_predictor_config
 import torch
 import torch.nn.functional as F
 import logging
-from sentence_transformers import SentenceTransformer
 
 logger = logging.getLogger(__name__)
 
 class Predictor:
-    def __init__(self, model_path=None):
+    def __init__(self, model_path=None, config_path=None):
+        self.config = load_predictor_config(config_path)
+        # A configured bundle serves the encoder, NLTK data and (by default) the head
+        self.bundle = activate_configured_bundle(self.config)
+        if model_path is None and self.bundle is not None and self.bundle.path('head'):
+            model_path = str(self.bundle.path('head'))
         self.model_manager = ModelManager()
         self.model = self.model_manager.load_model(model_path)
         self.categories = list(self.model_manager.category_map.keys())
@@ -23,96 +34,168 @@ class Predictor:
         self.confidence_threshold = 0.15
         self.model.to(self.device)
         self.model.eval()
-        self.sentence_transformer = SentenceTransformer('all-MiniLM-L6-v2')
+        head_digest = self._head_digest()
+        encoder_config = self.config['model']
+        inference_config = self.config['inference']
+        
+        # Variants registered by scripts/evaluate_model.py carry their precision
+        self.precision = self.model_manager.model_metadata.get('precision', {
+            'encoder': encoder_config['precision'],
+            'head': encoder_config['head_precision']
+        })
+        
+        # Exported graph backends bring their own encoder
+        self.sentence_transformer = None
+        if inference_config['backend'] == 'eager':
+            if self.precision['head'] != 'fp32':
+                # Reduced-precision heads are CPU inference modes
+                self.device = torch.device('cpu')
+                self.model = convert_head(self.model.cpu(), self.precision['head'])
+            self.sentence_transformer = get_encoder(
+                encoder_config['name'],
+                device=str(self.device),
+                precision=self.precision['encoder']
+            )
+        self.backend = load_backend(inference_config, self.sentence_transformer, self.model)
+        
+        cache_config = self.config['cache']
+        # Keyed by the encoder weights too: the disk tier outlives encoder upgrades
+        namespace = encoder_id(encoder_config['name'], self.precision['encoder'])
+        if self.backend.name == 'eager':
+            namespace = f"{namespace}@{encoder_fingerprint(encoder_config['name'])[:16]}"
+        else:
+            # The artifact's own encoder graph
+            encoder_hash = self.backend.report['encoder_hash']
+            namespace = f"{namespace}+{self.backend.name}@{encoder_hash[:16]}"
+        self.embedding_cache = EmbeddingCache(
+            namespace,
+            memory_size=cache_config['memory_size'],
+            disk_path=cache_config['disk_path']
+        )
+        
+        # Changes whenever the head weights, encoder, precision or backend do
+        serving = f"{namespace}|{self.precision['head']}|{inference_config.get('artifact_dir')}"
+        head_digest.update(serving.encode('utf-8'))
+        version = self.model_manager.model_metadata.get('version', 'unversioned')
+        self.model_version = f"{version}-{head_digest.hexdigest()[:12]}"
 
-    def get_embeddings(self, text):
-        """Get embeddings for input text using SentenceTransformer"""
-        return self.sentence_transformer.encode(text, convert_to_tensor=True)
+    @property
+    def executor(self) -> InferenceExecutor:
+        """Process-wide executor the async methods run inference on."""
+        return shared_executor(self.config['executor'])
 
-    def predict(self, title, description=None):
-        # Combine with more emphasis on title
+    def _head_digest(self):
+        """Hash of the (fp32) head weights."""
+        return head_hash(self.model)
+
+    def get_embeddings(self, text, batch_size: int = 32):
+        """Get embeddings for input text, served from the embedding cache when possible"""
+        texts = [text] if isinstance(text, str) else list(text)
+        embeddings = self.embedding_cache.get_or_compute(
+            texts,
+            lambda missing: self.backend.encode(missing, batch_size=batch_size)
+        )
+        embeddings = torch.from_numpy(embeddings).to(self.device)
+        return embeddings[0] if isinstance(text, str) else embeddings
+
+    def embed(self, tasks: List[Dict[str, str]]):
+        """
+        Embeddings of tasks as a (n, dim) float32 array, from the same
+        cleaned text prepare_data embeds (comparable with X_train.npy).
+        """
+        texts = [prepared_text(task['title'], task.get('description')) for task in tasks]
+        return self.get_embeddings(texts).float().cpu().numpy()
+
+    @staticmethod
+    def combine_text(title, description=None):
+        """Combine title and description with more emphasis on the title"""
         if description:
-            text = f"{title} - {title} - {description}"
-        else:
-            text = title
+            return f"{title} - {title} - {description}"
+        return title
+
+    def _classify(self, embeddings, top_k=2):
+        """Run the head on a batch of embeddings and rank the classes."""
+        probabilities = F.softmax(self.backend.forward(embeddings), dim=-1)
+        top_probs, top_indices = torch.topk(
+            probabilities, k=min(top_k, probabilities.size(-1)), dim=-1
+        )
+        return probabilities, top_probs, top_indices
+
+    def _format_results(self, probabilities, top_indices) -> List[Dict[str, any]]:
+        """Build result dicts with one host transfer per batch."""
+        rows = probabilities.cpu().tolist()
+        best = top_indices[:, 0].cpu().tolist()
+        return [
+            {
+                "category": self.categories[index],
+                "category_id": index,
+                "confidence": row[index],
+                "probabilities": dict(zip(self.categories, row))
+            }
+            for row, index in zip(rows, best)
+        ]
+
+    def predict(self, title, description=None):
+        text = self.combine_text(title, description)
         
         logging.info(f"Processing text: {text}")
         
-        # Get embeddings
-        embeddings = self.get_embeddings(text)
-        logging.info(f"Embedding shape: {embeddings.shape}")
-        
-        # Get predictions
-        with torch.no_grad():
-            outputs = self.model(embeddings)
-            logging.info(f"Raw outputs: {outputs}")
-            
-            probabilities = F.softmax(outputs, dim=-1)
-            logging.info(f"Softmax probabilities: {probabilities}")
-        
-        # Convert to list and get prediction
-        probabilities = probabilities.squeeze().tolist()
-        max_prob = max(probabilities)
-        max_index = probabilities.index(max_prob)
+        # Same path as batch_predict, with a batch of one
+        embeddings = self.get_embeddings([text])
+        probabilities, top_probs, top_indices = self._classify(embeddings)
         
         # Get top 2 predictions for comparison
-        sorted_probs = sorted(enumerate(probabilities), key=lambda x: x[1], reverse=True)
-        top_2 = [(self.categories[idx], prob) for idx, prob in sorted_probs[:2]]
+        top_2 = [
+            (self.categories[idx], prob)
+            for idx, prob in zip(top_indices[0].tolist(), top_probs[0].tolist())
+        ]
         logging.info(f"Top 2 predictions: {top_2}")
         
-        probs_dict = {cat: float(prob) for cat, prob in zip(self.categories, probabilities)}
-        
-        result = {
-            "category": self.categories[max_index],
-            "category_id": max_index,
-            "confidence": max_prob,
-            "probabilities": probs_dict
-        }
-        
-        return result
+        return self._format_results(probabilities, top_indices)[0]
+
+    def batch_predict(self, tasks: List[Dict[str, str]],
+                      chunk_size: int = None) -> List[Dict[str, any]]:
+        """
+        Make predictions for multiple tasks.
+
+        Texts are encoded in one chunked encode call (cached texts are
+        skipped) and the head runs once per chunk.
+
+        Args:
+            tasks: Dicts with "title" and optional "description"
+            chunk_size: Encoder batch size and head chunk size
+
+        Returns:
+            One result dict per task, identical in form to ``predict``
+        """
+        if not tasks:
+            return []
+        chunk_size = chunk_size or self.config['batching']['chunk_size']
 
-    def batch_predict(self, tasks: List[Dict[str, str]]) -> List[Dict[str, any]]:
-        """Make predictions for multiple tasks."""
         try:
-            # Process all texts
             texts = [
-                self.processor.combine_title_description(
-                    task['title'], task['description']
-                )
+                self.combine_text(task['title'], task.get('description'))
                 for task in tasks
             ]
-            
-            # Get batch predictions
-            with torch.no_grad():
-                # Convert texts to tensors
-                input_tensors = torch.stack([
-                    self.processor.text_to_tensor(text) for text in texts
-                ]).to(self.device)
-                
-                # Get predictions
-                logits = self.model.forward(input_tensors)
-                probabilities = F.softmax(logits, dim=1)
-                
-                # Get predicted classes and confidences
-                confidences, predicted_classes = torch.max(probabilities, dim=1)
-                
-                # Format results
-                results = []
-                for idx, (pred_class, conf, probs) in enumerate(zip(
-                    predicted_classes, confidences, probabilities)):
-                    results.append({
-                        "category": self.category_map_reverse.get(int(pred_class), "Unknown"),
-                        "category_id": int(pred_class),
-                        "confidence": float(conf),
-                        "probabilities": {
-                            self.category_map_reverse.get(i): float(prob)
-                            for i, prob in enumerate(probs)
-                        }
-                    })
-                
-                return results
+            embeddings = self.get_embeddings(texts, batch_size=chunk_size)
+
+            results = []
+            for start in range(0, len(texts), chunk_size):
+                probabilities, _, top_indices = self._classify(
+                    embeddings[start:start + chunk_size]
+                )
+                results.extend(self._format_results(probabilities, top_indices))
+            return results
                 
         except Exception as e:
             logger.error(f"Batch prediction failed: {str(e)}")
             raise ValueError(f"Batch prediction error: {str(e)}")
 
+    async def apredict(self, title, description=None) -> Dict[str, any]:
+        """``predict`` on the inference executor, without blocking the event loop."""
+        return await self.executor.run(self.predict, title, description)
+
+    async def abatch_predict(self, tasks: List[Dict[str, str]],
+                             chunk_size: int = None) -> List[Dict[str, any]]:
+        """``batch_predict`` on the inference executor, without blocking the event loop."""
+        return await self.executor.run(self.batch_predict, tasks, chunk_size)
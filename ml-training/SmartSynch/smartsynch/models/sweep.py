@@ -0,0 +1,240 @@
+"""
+Hyperparameter Sweep
+
+Trains heads for many hyperparameter settings in parallel worker processes
+that all map the same embedding arrays (see head_training). Trials advance
+in rungs of epochs; between rungs poor trials are pruned:
+1. grid / random: trials whose best validation loss is worse than the
+   median of all trials so far stop (median stopping rule)
+2. halving: successive halving keeps the best 1/eta of the trials per
+   rung, while the epoch budget grows by eta
+"""
+
+import itertools
+import logging
+import math
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from . import head_training
+
+logger = logging.getLogger(__name__)
+
+STRATEGIES = ('grid', 'random', 'halving')
+
+COMPLETED = "completed"
+EARLY_STOPPED = "early_stopped"
+PRUNED = "pruned"
+
+
+def _is_range(values) -> bool:
+    return isinstance(values, dict)
+
+
+def sample_trials(space: Dict, strategy: str, num_trials: int = 20,
+                  seed: int = 0) -> List[Dict]:
+    """
+    Hyperparameter settings of a sweep.
+
+    Args:
+        space: Name -> list of choices, or {"low", "high", "log", "int"} range
+            (ranges are only sampled by random / halving)
+        strategy: "grid" (every combination), "random" or "halving"
+            (``num_trials`` samples)
+        num_trials: Samples drawn by random / halving
+        seed: Sampling seed
+
+    Returns:
+        One params dict per trial
+    """
+    if strategy not in STRATEGIES:
+        raise ValueError(f"Unknown sweep strategy: {strategy}")
+    names = sorted(space)
+    if strategy == 'grid':
+        ranges = [name for name in names if _is_range(space[name])]
+        if ranges:
+            raise ValueError(f"Grid sweeps need lists of choices, got ranges for {ranges}")
+        return [dict(zip(names, values)) for values in itertools.product(*(space[name] for name in names))]
+
+    rng = np.random.default_rng(seed)
+    trials = []
+    for _ in range(num_trials):
+        params = {}
+        for name in names:
+            values = space[name]
+            if not _is_range(values):
+                params[name] = values[rng.integers(len(values))]
+                continue
+            low, high = float(values['low']), float(values['high'])
+            if values.get('log'):
+                value = float(np.exp(rng.uniform(np.log(low), np.log(high))))
+            else:
+                value = float(rng.uniform(low, high))
+            params[name] = int(round(value)) if values.get('int') else value
+        trials.append(params)
+    return trials
+
+
+def rung_epochs(strategy: str, max_epochs: int, min_epochs: int, eta: int = 3) -> List[int]:
+    """Total epochs trained by the end of each rung."""
+    min_epochs = max(1, min(min_epochs, max_epochs))
+    if strategy == 'halving':
+        rungs, epochs = [], min_epochs
+        while epochs < max_epochs:
+            rungs.append(epochs)
+            epochs *= eta
+        return rungs + [max_epochs]
+    return list(range(min_epochs, max_epochs, min_epochs)) + [max_epochs]
+
+
+def _run_trial(trial: int, params: Dict, state: Optional[Dict], epochs: int,
+               num_classes: int, seed: int) -> Tuple[int, Dict, Dict, float]:
+    """Advance a trial to ``epochs`` on the worker's arrays (pool task)."""
+    start = time.perf_counter()
+    arrays = head_training.worker_arrays()
+    state = head_training.fit_head(
+        arrays['X_train'], arrays['y_train'], params, num_classes, epochs,
+        val_features=arrays['X_val'], val_labels=arrays['y_val'],
+        state=state, seed=seed
+    )
+    model = head_training.best_head(state, params, num_classes, arrays['X_train'].shape[1])
+    metrics = head_training.evaluate_head(model, arrays['X_val'], arrays['y_val'], num_classes)
+    return trial, state, metrics, time.perf_counter() - start
+
+
+class HyperparameterSweep:
+    """Runs a sweep's trials in a process pool and ranks them."""
+
+    def __init__(self, specs: Dict[str, Tuple], space: Dict, num_classes: int,
+                 strategy: str = 'halving', num_trials: int = 20, max_epochs: int = 50,
+                 min_epochs: int = 3, eta: int = 3, prune: bool = True,
+                 workers: Optional[int] = None, seed: int = 0, defaults: Optional[Dict] = None):
+        """
+        Initialize the sweep.
+
+        Args:
+            specs: Array specs for X_train, y_train, X_val and y_val
+                (see head_training.file_spec)
+            space: Search space (see ``sample_trials``)
+            num_classes: Output classes
+            strategy: "grid", "random" or "halving"
+            num_trials: Trials sampled by random / halving
+            max_epochs: Epoch budget of a trial that is never pruned
+            min_epochs: First rung (halving) or pruning interval (grid / random)
+            eta: Halving rate (keep 1/eta of the trials, eta times the epochs)
+            prune: Apply the median stopping rule to grid / random sweeps
+            workers: Worker processes (default: one per CPU)
+            seed: Sampling and training seed
+            defaults: Params not in the space (learning_rate, dropout_rate,
+                batch_size, early_stopping_patience)
+        """
+        self.specs = specs
+        self.num_classes = num_classes
+        self.strategy = strategy
+        self.max_epochs = max_epochs
+        self.eta = eta
+        self.prune = prune
+        self.workers = workers
+        self.seed = seed
+        self.rungs = rung_epochs(strategy, max_epochs, min_epochs, eta)
+        self.trials = [
+            {'trial': i, 'params': {**(defaults or {}), **params}, 'status': None,
+             'state': None, 'metrics': {}, 'seconds': 0.0}
+            for i, params in enumerate(sample_trials(space, strategy, num_trials, seed))
+        ]
+
+    def _survivors(self, alive: List[Dict], rung: int) -> List[Dict]:
+        """Trials continuing past a rung; the others are marked pruned."""
+        ranked = sorted(alive, key=lambda trial: trial['state']['best_val_loss'])
+        ran = [trial for trial in self.trials if trial['state'] is not None]
+        if self.strategy == 'halving':
+            keep = ranked[:max(1, math.ceil(len(ranked) / self.eta))]
+        elif self.prune and len(ran) > 2:
+            # Over every trial so far: those already stopped or pruned keep counting
+            median = float(np.median([trial['state']['best_val_loss'] for trial in ran]))
+            keep = [trial for trial in ranked if trial['state']['best_val_loss'] <= median]
+        else:
+            keep = ranked
+        for trial in ranked[len(keep):]:
+            trial['status'] = PRUNED
+            trial['pruned_at'] = rung
+        return [trial for trial in alive if trial['status'] is None]
+
+    def _release_finished(self):
+        """Finished trials only keep their best weights (not the resumable state)."""
+        for trial in self.trials:
+            if trial['status'] is not None and trial['state'] is not None:
+                trial['state'].pop('model', None)
+                trial['state'].pop('optimizer', None)
+
+    def run(self, pool: Optional[ProcessPoolExecutor] = None) -> List[Dict]:
+        """
+        Run every trial until it completes, stops early or is pruned.
+
+        Args:
+            pool: Optional pool started with head_training.start_pool(specs)
+
+        Returns:
+            The leaderboard (see ``leaderboard``)
+        """
+        own_pool = pool is None
+        pool = pool or head_training.start_pool(self.specs, self.workers)
+        start = time.perf_counter()
+        try:
+            alive = list(self.trials)
+            for rung, epochs in enumerate(self.rungs):
+                futures = [
+                    pool.submit(_run_trial, trial['trial'], trial['params'], trial['state'],
+                                epochs, self.num_classes, self.seed + trial['trial'])
+                    for trial in alive
+                ]
+                for future in futures:
+                    index, state, metrics, seconds = future.result()
+                    trial = self.trials[index]
+                    trial.update(state=state, metrics=metrics)
+                    trial['seconds'] += seconds
+                    if state['stopped']:
+                        trial['status'] = EARLY_STOPPED
+                    elif state['epoch'] >= self.max_epochs:
+                        trial['status'] = COMPLETED
+                alive = [trial for trial in alive if trial['status'] is None]
+                if alive and rung < len(self.rungs) - 1:
+                    alive = self._survivors(alive, epochs)
+                self._release_finished()
+                logger.info(f"Rung {rung + 1}/{len(self.rungs)} ({epochs} epochs): "
+                            f"{len(futures)} trials ran, best val loss "
+                            f"{self.leaderboard()[0]['best_val_loss']:.4f}, {len(alive)} continue")
+        finally:
+            if own_pool:
+                pool.shutdown()
+        self.seconds = time.perf_counter() - start
+        logger.info(f"Sweep of {len(self.trials)} trials finished in {self.seconds:.1f}s")
+        return self.leaderboard()
+
+    def leaderboard(self) -> List[Dict]:
+        """Trials that ran, by best validation loss."""
+        ran = [trial for trial in self.trials if trial['state'] is not None]
+        ranked = sorted(ran, key=lambda trial: trial['state']['best_val_loss'])
+        return [
+            {
+                'rank': rank + 1,
+                'trial': trial['trial'],
+                'params': trial['params'],
+                'status': trial['status'],
+                'epochs': trial['state']['epoch'],
+                'best_epoch': trial['state']['best_epoch'],
+                'best_val_loss': trial['state']['best_val_loss'],
+                **{name: value for name, value in trial['metrics'].items()
+                   if name != 'confusion_matrix'},
+                'pruned_at': trial.get('pruned_at'),
+                'seconds': round(trial['seconds'], 3),
+            }
+            for rank, trial in enumerate(ranked)
+        ]
+
+    def best(self) -> Dict:
+        """The best trial (params, metrics and training state)."""
+        return self.trials[self.leaderboard()[0]['trial']]
@@ -0,0 +1,359 @@
+"""
+Vector Index
+
+Nearest-neighbour search over sentence embeddings (cosine similarity):
+1. ExactIndex: one matrix product over every stored vector, for catalogs
+   up to tens of thousands of tasks
+2. IVFIndex: an inverted-file index whose k-means lists are probed
+   selectively, for millions of vectors
+
+Both keep their vectors in preallocated, geometrically grown buffers, so
+tasks can be inserted in place (e.g. as predictions are made) while the
+index keeps serving searches.
+"""
+
+import json
+import logging
+import threading
+import time
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+def normalize(vectors: np.ndarray) -> np.ndarray:
+    """L2-normalize rows as float32 (inner product == cosine similarity)."""
+    vectors = np.atleast_2d(np.asarray(vectors, dtype=np.float32))
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-12)
+
+
+def top_k(scores: np.ndarray, k: int) -> np.ndarray:
+    """Column indices of the ``k`` highest scores per row, best first."""
+    k = min(k, scores.shape[1])
+    if k == 0:
+        return np.empty((scores.shape[0], 0), dtype=np.int64)
+    if k < scores.shape[1]:
+        candidates = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    else:
+        candidates = np.tile(np.arange(scores.shape[1]), (scores.shape[0], 1))
+    order = np.argsort(-np.take_along_axis(scores, candidates, axis=1), axis=1, kind='stable')
+    return np.take_along_axis(candidates, order, axis=1)
+
+
+class _Buffer:
+    """Growable (capacity-doubling) row buffer of vectors and row ids."""
+
+    def __init__(self, dim: int, capacity: int = 64):
+        self.vectors = np.empty((max(capacity, 1), dim), dtype=np.float32)
+        self.rows = np.empty(max(capacity, 1), dtype=np.int64)
+        self.size = 0
+
+    def append(self, vectors: np.ndarray, rows: np.ndarray):
+        end = self.size + len(vectors)
+        if end > len(self.vectors):
+            capacity = max(end, 2 * len(self.vectors))
+            grown = np.empty((capacity, self.vectors.shape[1]), dtype=np.float32)
+            grown[:self.size] = self.vectors[:self.size]
+            grown_rows = np.empty(capacity, dtype=np.int64)
+            grown_rows[:self.size] = self.rows[:self.size]
+            self.vectors, self.rows = grown, grown_rows
+        self.vectors[self.size:end] = vectors
+        self.rows[self.size:end] = rows
+        self.size = end
+
+    def view(self) -> Tuple[np.ndarray, np.ndarray]:
+        return self.vectors[:self.size], self.rows[:self.size]
+
+
+class VectorIndex(ABC):
+    """Shared bookkeeping of the index kinds: labels, payloads and counters."""
+
+    kind = "base"
+    insert_chunk = 8192
+
+    def __init__(self, dim: int):
+        self.dim = dim
+        self.labels: List[str] = []
+        self.payloads: List[Optional[Dict]] = []
+        self._lock = threading.RLock()
+        self._counters = dict.fromkeys(('searches', 'queries', 'inserts', 'candidates'), 0)
+        self._search_seconds = 0.0
+
+    def __len__(self) -> int:
+        return len(self.labels)
+
+    def add(self, vectors: np.ndarray, labels: Sequence[str],
+            payloads: Optional[Sequence[Optional[Dict]]] = None) -> List[int]:
+        """
+        Insert vectors in place.
+
+        Args:
+            vectors: (n, dim) embeddings (normalized here)
+            labels: Category of each vector
+            payloads: Optional per-vector dicts returned with its matches
+
+        Returns:
+            Ids of the inserted vectors
+        """
+        vectors = np.atleast_2d(vectors)
+        if vectors.shape[1] != self.dim:
+            raise ValueError(f"Expected {self.dim}-d vectors, got {vectors.shape[1]}-d")
+        if len(labels) != len(vectors):
+            raise ValueError("Need one label per vector")
+        payloads = list(payloads) if payloads is not None else [None] * len(vectors)
+        with self._lock:
+            start = len(self.labels)
+            rows = np.arange(start, start + len(vectors), dtype=np.int64)
+            # Normalized chunk by chunk so bulk loads never hold a second full copy
+            for chunk in range(0, len(vectors), self.insert_chunk):
+                end = chunk + self.insert_chunk
+                self._insert(normalize(vectors[chunk:end]), rows[chunk:end])
+            self.labels.extend(labels)
+            self.payloads.extend(payloads)
+            self._counters['inserts'] += len(vectors)
+        return rows.tolist()
+
+    def search(self, queries: np.ndarray, k: int = 5) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Find the ``k`` most similar stored vectors per query.
+
+        Args:
+            queries: (m, dim) or (dim,) query embeddings
+            k: Neighbours per query
+
+        Returns:
+            (scores, ids), each (m, <=k) and ordered by descending cosine
+            similarity
+        """
+        queries = normalize(queries)
+        if queries.shape[1] != self.dim:
+            raise ValueError(f"Expected {self.dim}-d queries, got {queries.shape[1]}-d")
+        start = time.perf_counter()
+        with self._lock:
+            scores, ids, candidates = self._search(queries, k)
+            self._counters['searches'] += 1
+            self._counters['queries'] += len(queries)
+            self._counters['candidates'] += candidates
+            self._search_seconds += time.perf_counter() - start
+        return scores, ids
+
+    def neighbours(self, query: np.ndarray, k: int = 5) -> List[Dict]:
+        """Matches of one query as dicts with id, score, category and payload."""
+        scores, ids = self.search(query, k)
+        with self._lock:
+            return [
+                {'id': int(i), 'score': float(score), 'category': self.labels[i],
+                 **(self.payloads[i] or {})}
+                for score, i in zip(scores[0], ids[0])
+            ]
+
+    def stats(self) -> Dict:
+        """Size and search counters for the metrics endpoint."""
+        with self._lock:
+            counters = dict(self._counters)
+            searches = counters['searches']
+            return {
+                'kind': self.kind,
+                'size': len(self),
+                'dim': self.dim,
+                **counters,
+                'mean_search_ms': 1000.0 * self._search_seconds / searches if searches else 0.0,
+            }
+
+    @abstractmethod
+    def _insert(self, vectors: np.ndarray, rows: np.ndarray):
+        """Store normalized vectors under their row ids (called under the lock)."""
+
+    @abstractmethod
+    def _search(self, queries: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray, int]:
+        """Return (scores, row ids, candidates scored) for normalized queries."""
+
+
+class ExactIndex(VectorIndex):
+    """Brute-force search: one (n, dim) x (dim, m) product per call."""
+
+    kind = "exact"
+
+    def __init__(self, dim: int, capacity: int = 1024):
+        super().__init__(dim)
+        self._buffer = _Buffer(dim, capacity)
+
+    def _insert(self, vectors: np.ndarray, rows: np.ndarray):
+        self._buffer.append(vectors, rows)
+
+    def _search(self, queries: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray, int]:
+        vectors, rows = self._buffer.view()
+        scores = queries @ vectors.T
+        best = top_k(scores, k)
+        return np.take_along_axis(scores, best, axis=1), rows[best], len(vectors)
+
+
+def train_centroids(vectors: np.ndarray, nlist: int, iterations: int = 10,
+                    sample_size: int = 65536, seed: int = 0) -> np.ndarray:
+    """
+    Spherical k-means centroids of (a sample of) normalized vectors.
+
+    Args:
+        vectors: (n, dim) embeddings
+        nlist: Number of centroids
+        iterations: Lloyd iterations
+        sample_size: Vectors k-means runs on (a random subset beyond this)
+        seed: Random seed
+
+    Returns:
+        (nlist, dim) normalized centroids
+    """
+    rng = np.random.default_rng(seed)
+    if len(vectors) > sample_size:
+        vectors = vectors[np.sort(rng.choice(len(vectors), sample_size, replace=False))]
+    vectors = normalize(vectors)
+    nlist = min(nlist, len(vectors))
+    centroids = vectors[rng.choice(len(vectors), nlist, replace=False)].copy()
+    for _ in range(iterations):
+        assignment = np.argmax(vectors @ centroids.T, axis=1)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assignment, vectors)
+        counts = np.bincount(assignment, minlength=nlist)
+        # Empty lists keep their previous centroid
+        filled = counts > 0
+        centroids[filled] = normalize(sums[filled])
+    return centroids
+
+
+class IVFIndex(VectorIndex):
+    """
+    Inverted-file index: vectors are bucketed by their nearest k-means
+    centroid and a query only scans the ``nprobe`` closest buckets.
+    """
+
+    kind = "ivf"
+
+    def __init__(self, centroids: np.ndarray, nprobe: int = 8):
+        """
+        Initialize an empty index.
+
+        Args:
+            centroids: (nlist, dim) coarse centroids (see ``train_centroids``)
+            nprobe: Lists scanned per query (recall/latency trade-off)
+        """
+        centroids = normalize(centroids)
+        super().__init__(centroids.shape[1])
+        self.centroids = centroids
+        self.nprobe = min(nprobe, len(centroids))
+        self._lists = [_Buffer(self.dim, 16) for _ in range(len(centroids))]
+
+    def _insert(self, vectors: np.ndarray, rows: np.ndarray):
+        assignment = np.argmax(vectors @ self.centroids.T, axis=1)
+        order = np.argsort(assignment, kind='stable')
+        bounds = np.flatnonzero(np.diff(assignment[order])) + 1
+        for group in np.split(order, bounds):
+            if len(group):
+                self._lists[assignment[group[0]]].append(vectors[group], rows[group])
+
+    def _search(self, queries: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray, int]:
+        probes = top_k(queries @ self.centroids.T, self.nprobe)
+        all_scores = np.full((len(queries), k), -np.inf, dtype=np.float32)
+        all_ids = np.full((len(queries), k), -1, dtype=np.int64)
+        scanned = 0
+        for q, (query, lists) in enumerate(zip(queries, probes)):
+            views = [self._lists[i].view() for i in lists if self._lists[i].size]
+            if not views:
+                continue
+            scores = np.concatenate([vectors @ query for vectors, _ in views])
+            rows = np.concatenate([list_rows for _, list_rows in views])
+            best = top_k(scores[None, :], k)[0]
+            all_scores[q, :len(best)] = scores[best]
+            all_ids[q, :len(best)] = rows[best]
+            scanned += len(scores)
+        # Drop the padding when fewer than k vectors were scanned
+        found = int((all_ids >= 0).sum(axis=1).min())
+        return all_scores[:, :found], all_ids[:, :found], scanned
+
+    def stats(self) -> Dict:
+        stats = super().stats()
+        with self._lock:
+            sizes = [buffer.size for buffer in self._lists]
+        return {**stats, 'nlist': len(self._lists), 'nprobe': self.nprobe,
+                'largest_list': max(sizes, default=0)}
+
+
+def build_index(vectors: np.ndarray, labels: Sequence[str],
+                payloads: Optional[Sequence[Optional[Dict]]] = None, kind: str = 'auto',
+                exact_limit: int = 20000, nlist: Optional[int] = None,
+                nprobe: int = 8, seed: int = 0) -> VectorIndex:
+    """
+    Build an index over labeled embeddings.
+
+    Args:
+        vectors: (n, dim) embeddings
+        labels: Category of each embedding
+        payloads: Optional per-vector dicts returned with matches
+        kind: "exact", "ivf" or "auto" (IVF above ``exact_limit`` vectors)
+        exact_limit: Largest catalog "auto" searches exhaustively
+        nlist: IVF lists (default: 4 * sqrt(n))
+        nprobe: IVF lists scanned per query
+        seed: k-means seed
+
+    Returns:
+        The populated index
+    """
+    vectors = np.atleast_2d(vectors)
+    if kind == 'auto':
+        kind = 'exact' if len(vectors) <= exact_limit else 'ivf'
+    if kind == 'exact':
+        # Room for inserts before the first reallocation
+        index = ExactIndex(vectors.shape[1], capacity=len(vectors) + max(1024, len(vectors) // 8))
+    elif kind == 'ivf':
+        if not len(vectors):
+            raise ValueError("An IVF index needs vectors to train its centroids")
+        nlist = nlist or max(1, int(4 * np.sqrt(len(vectors))))
+        index = IVFIndex(train_centroids(vectors, nlist, seed=seed), nprobe=nprobe)
+    else:
+        raise ValueError(f"Unknown index kind: {kind}")
+    if len(vectors):
+        index.add(vectors, labels, payloads)
+    logger.info(f"Built {index.kind} index over {len(index)} vectors")
+    return index
+
+
+def load_labeled_embeddings(data_dir: str, split: str = 'train') -> Tuple[np.ndarray, List[str]]:
+    """
+    Load the embeddings and category names written by scripts/prepare_data.py.
+
+    Args:
+        data_dir: Directory holding X_<split>.npy, y_<split>.npy and category_map.npy
+        split: "train" or "val"
+
+    Returns:
+        (vectors, labels)
+    """
+    data_dir = Path(data_dir)
+    # Memory-mapped: only the normalized copy held by the index stays resident
+    vectors = np.load(data_dir / f"X_{split}.npy", mmap_mode='r')
+    label_ids = np.load(data_dir / f"y_{split}.npy")
+    category_map = np.load(data_dir / "category_map.npy", allow_pickle=True).item()
+    categories = {index: category for category, index in category_map.items()}
+    return vectors, [categories[int(label)] for label in label_ids]
+
+
+def load_texts(data_dir: str, split: str = 'train') -> Optional[List[Dict]]:
+    """
+    Titles and descriptions of the rows of a split, if they were written.
+
+    scripts/prepare_data.py writes samples_<split>.jsonl next to the
+    embeddings; streaming preparation does not, and its matches then carry
+    only id and category.
+
+    Returns:
+        One {"title", "description"} dict per row, or None
+    """
+    path = Path(data_dir) / f"samples_{split}.jsonl"
+    if not path.exists():
+        return None
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
@@ -0,0 +1,201 @@
+"""
+Zero-Shot Classifier
+
+NLI-based zero-shot classification (as in the transformers
+``zero-shot-classification`` pipeline) built for batched serving:
+- The (premise, hypothesis) pairs of many requests are scored together,
+  sorted by length and packed into padded batches of up to
+  ``max_pairs_per_forward`` pairs.
+- Hypotheses ("This example is {label}.") are tokenized once per label
+  set and cached; each request only tokenizes its own text.
+- Scores are the softmax of the entailment logits over a request's
+  candidate labels, matching the pipeline's single-label mode.
+"""
+
+import copy
+import logging
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Sequence, Tuple
+
+import torch
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TEMPLATE = "This example is {}."
+
+
+class ZeroShotClassifier:
+    """Batched NLI zero-shot classifier with cached hypothesis tokens."""
+
+    def __init__(self, model_name: str, hypothesis_template: str = DEFAULT_TEMPLATE,
+                 max_length: int = None, max_pairs_per_forward: int = 64,
+                 max_label_sets: int = 256, device: str = 'cpu'):
+        """
+        Load an NLI model and its (fast) tokenizer.
+
+        Args:
+            model_name: Hub name or local path of an NLI sequence classifier
+            hypothesis_template: Template turning a label into a hypothesis
+            max_length: Longest pair in tokens; premises are truncated to fit
+                (None: the tokenizer's limit)
+            max_pairs_per_forward: Largest padded batch of pairs per forward pass
+            max_label_sets: Label sets whose hypothesis tokens are cached
+            device: Torch device
+        """
+        from transformers import AutoModelForSequenceClassification, AutoTokenizer
+
+        self.model_name = model_name
+        self.hypothesis_template = hypothesis_template
+        self.max_pairs_per_forward = max_pairs_per_forward
+        self.max_label_sets = max_label_sets
+        self.device = torch.device(device)
+
+        tokenizer = AutoTokenizer.from_pretrained(model_name)
+        if not tokenizer.is_fast:
+            raise ValueError(f"{model_name} has no fast tokenizer")
+        # Private copy so truncation/padding settings never leak into encode()
+        self._tokenizer = copy.deepcopy(tokenizer.backend_tokenizer)
+        self._tokenizer.no_truncation()
+        self._tokenizer.no_padding()
+        self.pad_token_id = tokenizer.pad_token_id or 0
+        self.pad_left = tokenizer.padding_side == 'left'
+        self.use_token_type_ids = 'token_type_ids' in tokenizer.model_input_names
+        limit = tokenizer.model_max_length
+        self.max_length = max_length or (limit if limit and limit < 100000 else 512)
+        self._special_tokens = self._tokenizer.num_special_tokens_to_add(True)
+
+        self.model = AutoModelForSequenceClassification.from_pretrained(model_name)
+        self.model.to(self.device).eval()
+        self.entailment_id = next(
+            (index for label, index in self.model.config.label2id.items()
+             if label.lower().startswith('entail')),
+            -1
+        )
+
+        self._hypotheses: "OrderedDict[Tuple[str, ...], List]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._counters = dict.fromkeys(
+            ('requests', 'pairs', 'forwards', 'tokens', 'padded_tokens',
+             'hypothesis_hits', 'hypothesis_misses'), 0
+        )
+
+    def _count(self, **increments):
+        with self._lock:
+            for name, value in increments.items():
+                self._counters[name] += value
+
+    def hypotheses(self, labels: Sequence[str]) -> List:
+        """Tokenized hypotheses for a label set (cached)."""
+        key = tuple(labels)
+        with self._lock:
+            encodings = self._hypotheses.get(key)
+            if encodings is not None:
+                self._hypotheses.move_to_end(key)
+                self._counters['hypothesis_hits'] += 1
+                return encodings
+            self._counters['hypothesis_misses'] += 1
+
+        encodings = self._tokenizer.encode_batch(
+            [self.hypothesis_template.format(label) for label in labels],
+            add_special_tokens=False
+        )
+        with self._lock:
+            self._hypotheses[key] = encodings
+            while len(self._hypotheses) > self.max_label_sets:
+                self._hypotheses.popitem(last=False)
+        return encodings
+
+    def _pair(self, premise, hypothesis):
+        """Join a premise and hypothesis with special tokens, truncating the premise."""
+        premise = copy.copy(premise)
+        budget = self.max_length - len(hypothesis.ids) - self._special_tokens
+        if len(premise.ids) > budget:
+            premise.truncate(max(budget, 1))
+        return self._tokenizer.post_process(premise, hypothesis, add_special_tokens=True)
+
+    def _forward(self, pairs: List) -> torch.Tensor:
+        """Entailment logits for one padded batch of encoded pairs."""
+        width = max(len(pair.ids) for pair in pairs)
+        input_ids = torch.full((len(pairs), width), self.pad_token_id, dtype=torch.long)
+        attention_mask = torch.zeros((len(pairs), width), dtype=torch.long)
+        token_type_ids = torch.zeros((len(pairs), width), dtype=torch.long)
+        for row, pair in enumerate(pairs):
+            length = len(pair.ids)
+            span = slice(width - length, width) if self.pad_left else slice(0, length)
+            input_ids[row, span] = torch.tensor(pair.ids)
+            attention_mask[row, span] = 1
+            token_type_ids[row, span] = torch.tensor(pair.type_ids)
+
+        inputs = {'input_ids': input_ids, 'attention_mask': attention_mask}
+        if self.use_token_type_ids:
+            inputs['token_type_ids'] = token_type_ids
+        with torch.inference_mode():
+            logits = self.model(**{k: v.to(self.device) for k, v in inputs.items()}).logits
+        self._count(forwards=1, tokens=int(attention_mask.sum()), padded_tokens=input_ids.numel())
+        return logits[:, self.entailment_id].float().cpu()
+
+    def classify_batch(self, requests: Sequence[Tuple[str, Sequence[str]]]) -> List[Dict]:
+        """
+        Classify several texts, each against its own candidate labels.
+
+        Args:
+            requests: (text, candidate_labels) tuples
+
+        Returns:
+            One {"sequence", "labels", "scores"} dict per request, labels
+            sorted by descending score
+        """
+        if not requests:
+            return []
+        premises = self._tokenizer.encode_batch(
+            [text for text, _ in requests], add_special_tokens=False
+        )
+        pairs, owners = [], []
+        for index, ((_, labels), premise) in enumerate(zip(requests, premises)):
+            for hypothesis in self.hypotheses(labels):
+                pairs.append(self._pair(premise, hypothesis))
+                owners.append(index)
+
+        # Similar lengths share a batch, so little compute goes to padding
+        order = sorted(range(len(pairs)), key=lambda i: len(pairs[i].ids))
+        entailment = torch.empty(len(pairs))
+        for start in range(0, len(order), self.max_pairs_per_forward):
+            chunk = order[start:start + self.max_pairs_per_forward]
+            entailment[chunk] = self._forward([pairs[i] for i in chunk])
+        self._count(requests=len(requests), pairs=len(pairs))
+
+        results, offset = [], 0
+        for text, labels in requests:
+            scores = entailment[offset:offset + len(labels)].softmax(-1).tolist()
+            offset += len(labels)
+            ranked = sorted(zip(labels, scores), key=lambda item: item[1], reverse=True)
+            results.append({
+                'sequence': text,
+                'labels': [label for label, _ in ranked],
+                'scores': [score for _, score in ranked],
+            })
+        return results
+
+    def __call__(self, text: str, candidate_labels: Sequence[str]) -> Dict:
+        """Classify one text (pipeline-compatible call)."""
+        return self.classify_batch([(text, candidate_labels)])[0]
+
+    def stats(self) -> Dict:
+        """Batch efficiency and hypothesis cache counters."""
+        with self._lock:
+            counters = dict(self._counters)
+            label_sets = len(self._hypotheses)
+        lookups = counters['hypothesis_hits'] + counters['hypothesis_misses']
+        return {
+            'model': self.model_name,
+            **counters,
+            'label_sets_cached': label_sets,
+            'hypothesis_hit_rate': counters['hypothesis_hits'] / lookups if lookups else 0.0,
+            'mean_pairs_per_forward': (
+                counters['pairs'] / counters['forwards'] if counters['forwards'] else 0.0
+            ),
+            'padding_efficiency': (
+                counters['tokens'] / counters['padded_tokens'] if counters['padded_tokens'] else 0.0
+            ),
+        }
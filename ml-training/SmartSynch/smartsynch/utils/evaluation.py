@@ -13,8 +13,6 @@ from sklearn.metrics import (
     accuracy_score, precision_recall_fscore_support,
     confusion_matrix, classification_report
 )
-import matplotlib.pyplot as plt
-import seaborn as sns
 
 class ModelEvaluator:
     def __init__(self, category_map: Dict[str, int]):
@@ -79,6 +77,10 @@ class ModelEvaluator:
             y_pred: Predicted labels
             output_path: Path to save plot (optional)
         """
+        # Plotting libraries are only imported when a plot is requested
+        import matplotlib.pyplot as plt
+        import seaborn as sns
+        
         cm = self.compute_confusion_matrix(y_true, y_pred)
         
         plt.figure(figsize=(10, 8))
@@ -119,6 +121,40 @@ class ModelEvaluator:
         )
         return report
 
+    def compute_cv_scores(self, fold_metrics: List[Dict]) -> Dict:
+        """
+        Aggregate the test metrics of cross-validation folds.
+        
+        Args:
+            fold_metrics: One dict per fold with accuracy, precision, recall,
+                f1 and its confusion_matrix (rows: true, columns: predicted)
+            
+        Returns:
+            Dictionary with mean/std/per-fold scores of every metric, the
+            confusion matrix summed over the folds (each sample counts once
+            per repeat) and its row-normalized version (per-class recall)
+        """
+        scores = {}
+        for name in ("accuracy", "precision", "recall", "f1"):
+            values = np.array([fold[name] for fold in fold_metrics], dtype=float)
+            scores[name] = {
+                "mean": float(values.mean()),
+                "std": float(values.std()),
+                "folds": values.tolist()
+            }
+        
+        cm = np.sum([fold["confusion_matrix"] for fold in fold_metrics], axis=0)
+        support = cm.sum(axis=1, keepdims=True)
+        normalized = np.divide(cm, support, out=np.zeros(cm.shape), where=support > 0)
+        
+        return {
+            "num_folds": len(fold_metrics),
+            "scores": scores,
+            "categories": self.categories,
+            "confusion_matrix": cm.tolist(),
+            "confusion_matrix_normalized": normalized.round(4).tolist()
+        }
+
     def evaluate_model(
         self, y_true: List[int], y_pred: List[int], 
         confidences: List[float]
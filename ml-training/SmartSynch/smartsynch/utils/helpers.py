@@ -0,0 +1,120 @@
+"""
+Helper Utilities
+
+Small shared helpers used across the package.
+"""
+
+from pathlib import Path
+from typing import Dict, Optional
+import yaml
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+PREDICTOR_CONFIG_PATH = PROJECT_ROOT / "configs" / "predictor_config.yaml"
+
+DEFAULT_PREDICTOR_CONFIG = {
+    "model": {
+        "name": "all-MiniLM-L6-v2",
+        "max_sequence_length": 128,
+        "embedding_dim": 384,
+        "device": "cpu",
+        "precision": "fp32",
+        "head_precision": "fp32",
+    },
+    "inference": {
+        "backend": "eager",
+        "artifact_dir": None,
+        "compile": False,
+    },
+    "cache": {
+        "memory_size": 4096,
+        "disk_path": None,
+    },
+    "batching": {
+        "enabled": True,
+        "max_batch_size": 32,
+        "max_wait_ms": 5.0,
+        "chunk_size": 256,
+    },
+    "executor": {
+        "max_workers": None,
+        "torch_threads": None,
+        "max_queue": 64,
+    },
+    "zero_shot": {
+        "hypothesis_template": "This example is {}.",
+        "max_length": None,
+        "max_pairs_per_forward": 64,
+        "max_batch_size": 16,
+        "max_wait_ms": 10.0,
+        "preload": [],
+        "memory_budget_mb": None,
+    },
+    "cascade": {
+        "enabled": False,
+        "threshold": 0.4,
+        "model": "task-categorization",
+    },
+    "vector_index": {
+        # Needs the prepared training embeddings, which serving images do not ship
+        "enabled": False,
+        "data_dir": "data/processed",
+        "kind": "auto",
+        "exact_limit": 20000,
+        "nlist": None,
+        "nprobe": 8,
+        "insert_predictions": True,
+        "min_confidence": 0.5,
+        "max_predictions": 50000,
+    },
+    "prediction_cache": {
+        "enabled": True,
+        "ttl_s": 3600,
+        "lock_ttl_ms": 5000,
+        "wait_timeout_ms": 2000,
+        "poll_interval_ms": 20,
+    },
+    "bundle": {
+        "path": None,
+        "verify": False,
+    },
+    "serving": {
+        "workers": None,
+        "weights": "cow",
+    },
+    "startup": {
+        "preload": True,
+        "warmup": True,
+    },
+}
+
+
+def _merge(base: Dict, override: Dict) -> Dict:
+    """Recursively merge ``override`` into a copy of ``base``."""
+    merged = dict(base)
+    for key, value in (override or {}).items():
+        if isinstance(value, dict) and isinstance(merged.get(key), dict):
+            merged[key] = _merge(merged[key], value)
+        else:
+            merged[key] = value
+    return merged
+
+
+def load_predictor_config(path: Optional[str] = None) -> Dict:
+    """
+    Load the predictor configuration.
+
+    Missing files or keys fall back to the built-in defaults, so serving
+    images that only ship the package still start.
+
+    Args:
+        path: Path to a YAML config (defaults to configs/predictor_config.yaml)
+
+    Returns:
+        Configuration dictionary
+    """
+    config_path = Path(path) if path else PREDICTOR_CONFIG_PATH
+    if not config_path.exists():
+        return _merge(DEFAULT_PREDICTOR_CONFIG, {})
+
+    with open(config_path) as f:
+        return _merge(DEFAULT_PREDICTOR_CONFIG, yaml.safe_load(f) or {})
@@ -0,0 +1,108 @@
+"""
+Startup Profiler
+
+Records where time goes between process start and the first request the
+API serves: module imports, model loading, warm-up and the first request
+itself. The report is logged once the first request completes and is
+exposed through the metrics endpoint.
+"""
+
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+def process_start_time() -> Optional[float]:
+    """Wall-clock time the current process started (Linux only, else None)."""
+    try:
+        with open('/proc/self/stat') as f:
+            # Fields after the parenthesised command name; starttime is field 22
+            fields = f.read().rsplit(')', 1)[1].split()
+        with open('/proc/uptime') as f:
+            uptime = float(f.read().split()[0])
+        ticks = os.sysconf('SC_CLK_TCK')
+        boot_time = time.time() - uptime
+        return boot_time + int(fields[19]) / ticks
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+class StartupProfiler:
+    """Timeline of startup phases and milestones relative to process start."""
+
+    def __init__(self):
+        now = time.time()
+        self.process_start = process_start_time() or now
+        self._lock = threading.Lock()
+        self.phases: Dict[str, Dict[str, float]] = {}
+        self.milestones: Dict[str, float] = {'profiler_created': now - self.process_start}
+
+    def mark(self, name: str):
+        """Record a milestone (first occurrence wins)."""
+        with self._lock:
+            self.milestones.setdefault(name, time.time() - self.process_start)
+
+    @contextmanager
+    def phase(self, name: str):
+        """Time a block as a named startup phase."""
+        start = time.time()
+        try:
+            yield
+        finally:
+            end = time.time()
+            with self._lock:
+                self.phases[name] = {
+                    'start_s': start - self.process_start,
+                    'duration_s': end - start,
+                }
+
+    @property
+    def ready(self) -> bool:
+        return 'first_request' in self.milestones
+
+    def first_request_done(self):
+        """Mark the first served request and log the report once."""
+        if self.ready:
+            return
+        self.mark('first_request')
+        report = self.report()
+        phases = ', '.join(
+            f"{name}={phase['duration_s']:.2f}s" for name, phase in report['phases'].items()
+        )
+        logger.info(f"Process start to first request: "
+                    f"{report['process_start_to_first_request_s']:.2f}s ({phases})")
+
+    def report(self) -> Dict:
+        """Milestones and phase durations in seconds since process start."""
+        with self._lock:
+            return {
+                'process_start_to_first_request_s': self.milestones.get('first_request'),
+                'milestones': dict(sorted(self.milestones.items(), key=lambda item: item[1])),
+                'phases': dict(sorted(self.phases.items(), key=lambda item: item[1]['start_s'])),
+            }
+
+
+# Process-wide profiler; created when smartsynch.utils.startup is first imported
+profiler = StartupProfiler()
+
+
+class FirstRequestMiddleware:
+    """ASGI middleware marking the end of the first HTTP request."""
+
+    def __init__(self, app, startup_profiler: StartupProfiler = None):
+        self.app = app
+        self.profiler = startup_profiler or profiler
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http' or self.profiler.ready:
+            await self.app(scope, receive, send)
+            return
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.profiler.first_request_done()
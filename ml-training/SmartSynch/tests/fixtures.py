@@ -0,0 +1,21 @@
+"""
+Shared test data
+"""
+
+import numpy as np
+
+def clustered(n, dim=8, num_classes=3, seed=0, balanced=False):
+    """
+    Embeddings scattered around one center per class.
+
+    The centers are the same for every seed, so different seeds give
+    training and held-out sets of the same classes.
+
+    Returns:
+        (float32 features of shape (n, dim), int64 labels)
+    """
+    centers = 3 * np.random.default_rng(42).normal(size=(num_classes, dim))
+    rng = np.random.default_rng(seed)
+    labels = np.arange(n) % num_classes if balanced else rng.integers(num_classes, size=n)
+    features = centers[labels] + rng.normal(size=(n, dim))
+    return features.astype(np.float32), labels.astype(np.int64)
@@ -0,0 +1,76 @@
+"""
+Unit tests for Predictor.batch_predict
+"""
+
+import copy
+import unittest
+from unittest.mock import Mock, patch
+import numpy as np
+import torch
+from smartsynch.models.classifier import TaskClassifier
+from smartsynch.models.predictor import Predictor
+from smartsynch.utils.helpers import DEFAULT_PREDICTOR_CONFIG
+
+def fake_encode(texts, **kwargs):
+    """Deterministic per-text vectors standing in for the encoder."""
+    return np.stack([
+        np.random.default_rng(sum(map(ord, text))).standard_normal(384).astype(np.float32)
+        for text in texts
+    ])
+
+class TestBatchPredict(unittest.TestCase):
+    def setUp(self):
+        """Build a predictor around a small untrained head."""
+        torch.manual_seed(0)
+        self.model = TaskClassifier({
+            'num_classes': 5,
+            'embedding_dim': 384,
+            'dropout_rate': 0.2,
+            'model_dir': 'models/fine_tuned'
+        })
+        self.encoder = Mock()
+        self.encoder.encode.side_effect = fake_encode
+
+        # Defaults keep the shared disk tier off
+        config = copy.deepcopy(DEFAULT_PREDICTOR_CONFIG)
+        with patch('smartsynch.models.predictor.ModelManager') as mock_manager, \
+                patch('smartsynch.models.predictor.get_encoder', return_value=self.encoder), \
+                patch('smartsynch.models.predictor.encoder_fingerprint', return_value='0' * 64), \
+                patch('smartsynch.models.predictor.load_predictor_config', return_value=config):
+            mock_manager.return_value.category_map = {
+                "Design": 0, "Development": 1, "Meeting": 2, "Planning": 3, "Research": 4
+            }
+            mock_manager.return_value.load_model.return_value = self.model
+            mock_manager.return_value.model_metadata = {}
+            self.predictor = Predictor()
+
+        self.tasks = [
+            {"title": f"Task {i}", "description": f"Description {i}" if i % 3 else ""}
+            for i in range(10)
+        ]
+
+    def test_matches_single_predict(self):
+        """Test batch results match single predictions."""
+        batch = self.predictor.batch_predict(self.tasks, chunk_size=4)
+        single = [
+            self.predictor.predict(task["title"], task["description"])
+            for task in self.tasks
+        ]
+
+        for batch_result, single_result in zip(batch, single):
+            self.assertEqual(batch_result["category"], single_result["category"])
+            self.assertEqual(batch_result["category_id"], single_result["category_id"])
+            self.assertAlmostEqual(batch_result["confidence"], single_result["confidence"], places=5)
+            for category, prob in single_result["probabilities"].items():
+                self.assertAlmostEqual(batch_result["probabilities"][category], prob, places=5)
+
+    def test_single_encode_call(self):
+        """Test all texts are encoded in one chunked call."""
+        self.predictor.batch_predict(self.tasks, chunk_size=4)
+
+        self.encoder.encode.assert_called_once()
+        self.assertEqual(self.encoder.encode.call_args.kwargs["batch_size"], 4)
+
+    def test_empty_batch(self):
+        """Test an empty batch returns no results."""
+        self.assertEqual(self.predictor.batch_predict([]), [])
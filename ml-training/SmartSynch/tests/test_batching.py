@@ -0,0 +1,70 @@
+"""
+Unit tests for the asyncio micro-batcher
+"""
+
+import asyncio
+import unittest
+from smartsynch.api.batching import MicroBatcher
+
+class TestMicroBatcher(unittest.TestCase):
+    def setUp(self):
+        """Set up a batcher that records the batches it sees."""
+        self.batches = []
+
+        def process(items):
+            self.batches.append(list(items))
+            return [item * 2 for item in items]
+
+        self.process = process
+
+    def run_async(self, coro):
+        return asyncio.run(coro)
+
+    def test_concurrent_requests_are_batched(self):
+        """Test concurrent submissions share one batch."""
+        batcher = MicroBatcher(self.process, max_batch_size=8, max_wait_ms=50)
+
+        async def scenario():
+            results = await asyncio.gather(*(batcher.submit(i) for i in range(5)))
+            await batcher.stop()
+            return results
+
+        results = self.run_async(scenario())
+
+        self.assertEqual(results, [0, 2, 4, 6, 8])
+        self.assertEqual(len(self.batches), 1)
+        self.assertEqual(batcher.stats()["batch_size_histogram"], {"<=8": 1})
+
+    def test_max_batch_size_respected(self):
+        """Test batches never exceed the configured size."""
+        batcher = MicroBatcher(self.process, max_batch_size=4, max_wait_ms=50)
+
+        async def scenario():
+            results = await asyncio.gather(*(batcher.submit(i) for i in range(10)))
+            await batcher.stop()
+            return results
+
+        results = self.run_async(scenario())
+
+        self.assertEqual(results, [i * 2 for i in range(10)])
+        self.assertTrue(all(len(batch) <= 4 for batch in self.batches))
+        self.assertEqual(batcher.stats()["total_items"], 10)
+
+    def test_errors_propagate_to_every_caller(self):
+        """Test a failing batch fails each waiting request."""
+        def failing(items):
+            raise ValueError("model unavailable")
+
+        batcher = MicroBatcher(failing, max_batch_size=4, max_wait_ms=10)
+
+        async def scenario():
+            results = await asyncio.gather(
+                batcher.submit(1), batcher.submit(2), return_exceptions=True
+            )
+            await batcher.stop()
+            return results
+
+        results = self.run_async(scenario())
+
+        self.assertTrue(all(isinstance(r, ValueError) for r in results))
+        self.assertEqual(batcher.stats()["failed_batches"], 1)
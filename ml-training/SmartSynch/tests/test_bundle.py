@@ -0,0 +1,85 @@
+"""
+Unit tests for offline model bundles
+"""
+
+import os
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+import numpy as np
+import torch
+from smartsynch.models import bundle as bundles
+from smartsynch.models import encoder as encoder_registry
+from smartsynch.models.classifier import TaskClassifier
+from tests.test_export import build_tiny_encoder
+
+class TestBundle(unittest.TestCase):
+    def setUp(self):
+        """Save a tiny encoder and head to build bundles from."""
+        torch.manual_seed(0)
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp_dir.name)
+        self.encoder_dir = self.root / 'tiny-encoder'
+        self.encoder_dir.mkdir()
+        build_tiny_encoder(self.encoder_dir).save(str(self.encoder_dir))
+        self.head_path = self.root / 'model.pt'
+        TaskClassifier({
+            'num_classes': 5, 'embedding_dim': 32, 'dropout_rate': 0.2
+        }).save(str(self.head_path))
+        self.env = patch.dict(os.environ)
+        self.env.start()
+        encoder_registry.clear_encoders()
+
+    def tearDown(self):
+        self.env.stop()
+        bundles._active = None
+        encoder_registry._paths.clear()
+        encoder_registry.clear_encoders()
+        self.tmp_dir.cleanup()
+
+    def build(self, **kwargs):
+        return bundles.build_bundle(
+            str(self.root / 'bundles'), 'v1',
+            encoder_name=str(self.encoder_dir),
+            head_path=str(self.head_path),
+            zero_shot_model=None,
+            nltk_packages=(),
+            **kwargs
+        )
+
+    def test_build_and_verify(self):
+        """Test the manifest lists every file and detects tampering."""
+        bundle = bundles.open_bundle(str(self.build()))
+        self.assertEqual(bundle.version, 'v1')
+        self.assertEqual(set(bundle.components), {'encoder', 'head'})
+        self.assertIn('head/model.pt', bundle.manifest['files'])
+        self.assertEqual(bundle.verify(), {})
+
+        with open(bundle.path('head'), 'ab') as f:
+            f.write(b'0')
+        self.assertEqual(bundle.verify(), {'head/model.pt': 'hash mismatch'})
+
+    def test_activate_archive(self):
+        """Test an archived bundle unpacks and serves the encoder offline."""
+        archive = self.build(archive=True)
+        reference = encoder_registry.get_encoder(str(self.encoder_dir)).encode(['fix login bug'])
+        encoder_registry.clear_encoders()
+
+        bundle = bundles.activate_bundle(str(archive))
+        self.assertEqual(os.environ['HF_HUB_OFFLINE'], '1')
+        self.assertEqual(bundle.root, self.root / 'bundles' / 'v1')
+        self.assertEqual(bundles.resolve_model(str(self.encoder_dir)), str(bundle.path('encoder')))
+
+        # Loading by name now reads the bundled copy
+        self.encoder_dir.rename(self.root / 'moved')
+        bundled = encoder_registry.get_encoder(str(self.encoder_dir)).encode(['fix login bug'])
+        np.testing.assert_allclose(bundled, reference, atol=1e-6)
+
+    def test_configured_bundle(self):
+        """Test the environment variable takes precedence over the config."""
+        path = self.build()
+        os.environ[bundles.BUNDLE_ENV] = str(path)
+        bundle = bundles.activate_configured_bundle({'bundle': {'path': None}})
+        self.assertIs(bundles.active_bundle(), bundle)
+        self.assertEqual(bundles.resolve_model('facebook/bart-large-mnli'), 'facebook/bart-large-mnli')
@@ -0,0 +1,158 @@
+"""
+Unit tests for the predictor -> zero-shot confidence cascade
+"""
+
+import asyncio
+import unittest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from smartsynch.api.cascade import Cascade, TIER_PREDICTOR, TIER_ZERO_SHOT
+from smartsynch.api.dependencies import (
+    get_cascade, get_prediction_batcher, get_prediction_cache, get_predictor, get_redis_client
+)
+from smartsynch.api.routes import predictions
+
+CATEGORIES = ["Design", "Development", "Meeting"]
+
+def predictor_result(category_id, confidence):
+    return {
+        "category": CATEGORIES[category_id],
+        "category_id": category_id,
+        "confidence": confidence,
+        "probabilities": {},
+    }
+
+class FakePredictor:
+    """Head answering each task title with a preset (category, confidence)."""
+
+    config = {'batching': {'enabled': False}, 'prediction_cache': {'enabled': False}}
+
+    def __init__(self, answers):
+        self.answers = answers
+
+    async def apredict(self, title, description=None):
+        return predictor_result(*self.answers[title])
+
+    async def abatch_predict(self, tasks):
+        return [predictor_result(*self.answers[task["title"]]) for task in tasks]
+
+class TestCascade(unittest.TestCase):
+    def setUp(self):
+        """Set up a cascade over a stand-in zero-shot model."""
+        self.calls = []
+
+        async def classify(text, labels):
+            self.calls.append((text, list(labels)))
+            await asyncio.sleep(0.01)
+            return {"sequence": text, "labels": ["Meeting", "Design", "Development"],
+                    "scores": [0.7, 0.2, 0.1]}
+
+        self.cascade = Cascade(CATEGORIES, 0.4, "task-categorization", classify)
+
+    def test_confident_predictions_stay_on_the_predictor(self):
+        """Test results above the threshold never reach the zero-shot model."""
+        result = asyncio.run(self.cascade.resolve(predictor_result(1, 0.9), "Fix bug", "Login"))
+        self.assertEqual(result["tier"], TIER_PREDICTOR)
+        self.assertEqual(result["category"], "Development")
+        self.assertEqual(self.calls, [])
+
+    def test_unsure_predictions_are_escalated(self):
+        """Test the zero-shot answer replaces a low-confidence prediction."""
+        result = asyncio.run(self.cascade.resolve(predictor_result(0, 0.3), "Sync", "Weekly"))
+
+        self.assertEqual(self.calls, [("Sync. Weekly", CATEGORIES)])
+        self.assertEqual(result["tier"], TIER_ZERO_SHOT)
+        self.assertEqual((result["category"], result["category_id"]), ("Meeting", 2))
+        self.assertAlmostEqual(result["confidence"], 0.7)
+        self.assertEqual(list(result["probabilities"]), CATEGORIES)
+        self.assertAlmostEqual(result["predictor_confidence"], 0.3)
+
+    def test_failed_escalation_keeps_the_predictor_answer(self):
+        """Test an unavailable zero-shot model does not fail the request."""
+        async def broken(text, labels):
+            raise RuntimeError("model failed to load")
+
+        cascade = Cascade(CATEGORIES, 0.4, "task-categorization", broken)
+        result = asyncio.run(cascade.resolve(predictor_result(0, 0.1), "Logo"))
+        self.assertEqual(result["tier"], TIER_PREDICTOR)
+        self.assertEqual(cascade.stats()["escalation_failures"], 1)
+
+    def test_batch_escalation_counters(self):
+        """Test only the unsure part of a batch is escalated and counted."""
+        tasks = [{"title": f"task {i}", "description": "x"} for i in range(4)]
+        results = [predictor_result(0, confidence) for confidence in (0.9, 0.2, 0.5, 0.39)]
+
+        resolved = asyncio.run(self.cascade.resolve_many(results, tasks))
+
+        self.assertEqual([r["tier"] for r in resolved],
+                         [TIER_PREDICTOR, TIER_ZERO_SHOT, TIER_PREDICTOR, TIER_ZERO_SHOT])
+        stats = self.cascade.stats()
+        self.assertEqual((stats["requests"], stats["escalations"]), (4, 2))
+        self.assertAlmostEqual(stats["escalation_rate"], 0.5)
+
+class TestCascadeRoutes(unittest.TestCase):
+    def setUp(self):
+        """Set up the prediction routes with the cascade in front of a fake head."""
+        self.calls = []
+        self.zero_shot_fails = False
+
+        async def classify(text, labels):
+            self.calls.append(text)
+            if self.zero_shot_fails:
+                raise RuntimeError("model failed to load")
+            return {"sequence": text, "labels": ["Meeting", "Design", "Development"],
+                    "scores": [0.7, 0.2, 0.1]}
+
+        predictor = FakePredictor({"Fix bug": (1, 0.9), "Sync": (0, 0.3)})
+        cascade = Cascade(CATEGORIES, 0.4, "task-categorization", classify)
+        app = FastAPI()
+        app.include_router(predictions.router, prefix="/api/v1")
+        app.dependency_overrides[get_predictor] = lambda: predictor
+        app.dependency_overrides[get_cascade] = lambda: cascade
+        # Batching and the prediction cache are disabled in the fake config
+        for unused in (get_prediction_batcher, get_prediction_cache, get_redis_client):
+            app.dependency_overrides[unused] = lambda: None
+        self.client = TestClient(app)
+
+    def predict(self, title):
+        response = self.client.post("/api/v1/predict", json={"title": title, "description": "x"})
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_predict_accepts_the_zero_shot_answer(self):
+        """Test /predict returns the zero-shot answer for an unsure head."""
+        result = self.predict("Sync")
+        self.assertEqual((result["tier"], result["category"]), (TIER_ZERO_SHOT, "meeting"))
+        self.assertAlmostEqual(result["predictor_confidence"], 0.3)
+        self.assertEqual(self.calls, ["Sync. x"])
+
+    def test_predict_falls_back_to_the_head(self):
+        """Test /predict keeps the head's answer when confident or when zero-shot fails."""
+        result = self.predict("Fix bug")
+        self.assertEqual((result["tier"], result["category"]), (TIER_PREDICTOR, "development"))
+        self.assertEqual(self.calls, [])
+
+        self.zero_shot_fails = True
+        result = self.predict("Sync")
+        self.assertEqual((result["tier"], result["category"]), (TIER_PREDICTOR, "design"))
+        self.assertAlmostEqual(result["confidence"], 0.3)
+
+    def test_batch_escalates_only_unsure_tasks(self):
+        """Test /predict/batch mixes head and zero-shot answers per task."""
+        tasks = [{"title": title, "description": "x"} for title in ("Fix bug", "Sync")]
+        response = self.client.post("/api/v1/predict/batch", json={"tasks": tasks})
+        self.assertEqual(response.status_code, 200)
+        results = response.json()
+
+        self.assertEqual([(r["tier"], r["category"]) for r in results],
+                         [(TIER_PREDICTOR, "Development"), (TIER_ZERO_SHOT, "Meeting")])
+        self.assertEqual(self.calls, ["Sync. x"])
+
+    def test_batch_falls_back_to_the_head(self):
+        """Test /predict/batch keeps the head's answers if zero-shot fails."""
+        self.zero_shot_fails = True
+        tasks = [{"title": title, "description": "x"} for title in ("Fix bug", "Sync")]
+        results = self.client.post("/api/v1/predict/batch", json={"tasks": tasks}).json()
+
+        self.assertEqual([(r["tier"], r["category"]) for r in results],
+                         [(TIER_PREDICTOR, "Development"), (TIER_PREDICTOR, "Design")])
@@ -0,0 +1,90 @@
+"""
+Unit tests for head-only checkpoints and resumable training
+"""
+
+import os
+import tempfile
+import unittest
+import torch
+from torch.utils.data import DataLoader, TensorDataset
+from smartsynch.models.checkpoint import CheckpointWriter, load_checkpoint
+from smartsynch.models.classifier import TaskClassifier
+
+class TestCheckpoints(unittest.TestCase):
+    def setUp(self):
+        """Set up a small head and a temporary model directory."""
+        torch.manual_seed(0)
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.config = {
+            'num_classes': 3,
+            'embedding_dim': 16,
+            'dropout_rate': 0.2,
+            'num_epochs': 2,
+            'early_stopping_patience': 10,
+            'model_dir': self.tmp_dir.name,
+            'encoder_hash': 'abc123'
+        }
+        X = torch.randn(32, 16)
+        y = torch.randint(0, 3, (32,))
+        self.train_loader = DataLoader(TensorDataset(X, y), batch_size=8, shuffle=True)
+        self.val_loader = DataLoader(TensorDataset(X, y), batch_size=8)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_checkpoint_is_head_only(self):
+        """Test saved checkpoints reference the encoder instead of storing it."""
+        model = TaskClassifier(self.config)
+        path = os.path.join(self.tmp_dir.name, 'model.pt')
+        model.save(path)
+
+        checkpoint = load_checkpoint(path)
+        self.assertFalse(any(k.startswith('encoder.') for k in checkpoint['head_state']))
+        self.assertEqual(checkpoint['encoder']['name'], 'all-MiniLM-L6-v2')
+        self.assertEqual(checkpoint['encoder']['hash'], 'abc123')
+
+    def test_legacy_state_dict_loads(self):
+        """Test plain state dicts with encoder weights still load."""
+        model = TaskClassifier(self.config)
+        legacy = dict(model.state_dict())
+        legacy['encoder.0.auto_model.weight'] = torch.zeros(2, 2)
+        path = os.path.join(self.tmp_dir.name, 'legacy.pt')
+        torch.save(legacy, path)
+
+        TaskClassifier(self.config).load(path)
+
+    def test_writer_flushes_latest(self):
+        """Test the background writer persists the newest checkpoint per path."""
+        path = os.path.join(self.tmp_dir.name, 'checkpoint.pt')
+        writer = CheckpointWriter()
+        for epoch in range(5):
+            writer.submit({'epoch': epoch}, path)
+        writer.close()
+
+        self.assertEqual(torch.load(path)['epoch'], 4)
+        self.assertEqual(
+            [f for f in os.listdir(self.tmp_dir.name) if f.endswith('.tmp')], []
+        )
+
+    def test_resume_training(self):
+        """Test training continues from the last checkpoint."""
+        model = TaskClassifier(self.config)
+        optimizer = torch.optim.Adam(model.parameters(), lr=1e-3)
+        model.train_model(self.train_loader, self.val_loader,
+                          torch.nn.CrossEntropyLoss(), optimizer, 'cpu')
+        run_dir = model.model_save_dir
+
+        self.assertTrue(os.path.exists(os.path.join(run_dir, 'best_model.pt')))
+        self.assertTrue(os.path.exists(os.path.join(run_dir, 'training_history.json')))
+
+        config = dict(self.config, num_epochs=4)
+        resumed = TaskClassifier(config)
+        optimizer = torch.optim.Adam(resumed.parameters(), lr=1e-3)
+        start_epoch = resumed.resume(run_dir, optimizer)
+        self.assertEqual(start_epoch, 2)
+
+        resumed.train_model(self.train_loader, self.val_loader,
+                            torch.nn.CrossEntropyLoss(), optimizer, 'cpu',
+                            start_epoch=start_epoch)
+        self.assertEqual(len(resumed.history['train_loss']), 4)
+        self.assertEqual(resumed.model_save_dir, os.path.abspath(run_dir))
@@ -0,0 +1,93 @@
+"""
+Unit tests for parallel cross-validation
+"""
+
+import unittest
+from multiprocessing import shared_memory
+from unittest import mock
+import numpy as np
+from smartsynch.models import head_training
+from smartsynch.models.cross_validation import cross_validate, fold_indices
+from smartsynch.utils.evaluation import ModelEvaluator
+from tests.fixtures import clustered
+
+CATEGORY_MAP = {'Development': 0, 'Design': 1, 'Research': 2}
+
+class TestFoldIndices(unittest.TestCase):
+    def test_test_folds_partition_each_repeat(self):
+        """Test every sample is tested once per repeat, in stratified folds."""
+        _, labels = clustered(90, balanced=True)
+        splits = fold_indices(labels, folds=5, repeats=2, val_fraction=0.2, seed=0)
+
+        self.assertEqual(len(splits), 10)
+        for repeat in range(2):
+            tests = [split['test'] for split in splits if split['repeat'] == repeat]
+            self.assertEqual(sorted(np.concatenate(tests).tolist()), list(range(90)))
+        for split in splits:
+            self.assertEqual(np.bincount(labels[split['test']]).tolist(), [6, 6, 6])
+            rows = np.concatenate([split['train'], split['val'], split['test']])
+            self.assertEqual(len(set(rows.tolist())), 90)
+            self.assertEqual(len(split['val']), 15)
+
+    def test_no_early_stopping_slice(self):
+        """Test a zero val fraction keeps all training rows."""
+        _, labels = clustered(90, balanced=True)
+        split = fold_indices(labels, folds=3, val_fraction=0)[0]
+        self.assertIsNone(split['val'])
+        self.assertEqual(len(split['train']), 60)
+
+class TestCrossValidationScores(unittest.TestCase):
+    def test_aggregates_folds(self):
+        """Test mean/std per metric and the summed, row-normalized confusion matrix."""
+        folds = [
+            {'accuracy': 1.0, 'precision': 1.0, 'recall': 1.0, 'f1': 1.0,
+             'confusion_matrix': [[2, 0, 0], [0, 2, 0], [0, 0, 0]]},
+            {'accuracy': 0.5, 'precision': 0.25, 'recall': 0.5, 'f1': 0.33,
+             'confusion_matrix': [[1, 1, 0], [1, 1, 0], [0, 0, 0]]},
+        ]
+        scores = ModelEvaluator(CATEGORY_MAP).compute_cv_scores(folds)
+
+        self.assertEqual(scores['num_folds'], 2)
+        self.assertAlmostEqual(scores['scores']['accuracy']['mean'], 0.75)
+        self.assertAlmostEqual(scores['scores']['accuracy']['std'], 0.25)
+        self.assertEqual(scores['scores']['f1']['folds'], [1.0, 0.33])
+        self.assertEqual(scores['confusion_matrix'], [[3, 1, 0], [1, 3, 0], [0, 0, 0]])
+        self.assertEqual(scores['confusion_matrix_normalized'][0], [0.75, 0.25, 0.0])
+        self.assertEqual(scores['confusion_matrix_normalized'][2], [0.0, 0.0, 0.0])
+
+class TestCrossValidate(unittest.TestCase):
+    def test_repeated_k_fold_in_worker_pool(self):
+        """Test folds train in workers over shared memory and are aggregated."""
+        features, labels = clustered(90, balanced=True)
+        params = {'learning_rate': 0.01, 'dropout_rate': 0.0, 'batch_size': 16,
+                  'early_stopping_patience': 5}
+        report = cross_validate(features, labels, params, CATEGORY_MAP, folds=3, repeats=2,
+                                epochs=20, workers=2, seed=0)
+
+        self.assertEqual(report['num_folds'], 6)
+        self.assertEqual(np.sum(report['confusion_matrix']), 2 * len(labels))
+        self.assertEqual(len(report['fold_details']), 6)
+        self.assertGreater(report['scores']['accuracy']['mean'], 0.9)
+        self.assertAlmostEqual(report['scores']['accuracy']['mean'],
+                               np.mean([fold['accuracy'] for fold in report['fold_details']]))
+        self.assertEqual({fold['test_samples'] for fold in report['fold_details']}, {30})
+
+    def test_shared_memory_is_released_when_the_pool_fails(self):
+        """Test the embeddings' shared memory is unlinked if no pool starts."""
+        features, labels = clustered(30, balanced=True)
+        created = []
+        original = head_training.SharedArrays.__init__
+
+        def record(shared, arrays):
+            original(shared, arrays)
+            created.append(shared)
+
+        with mock.patch.object(head_training.SharedArrays, '__init__', record), \
+                mock.patch.object(head_training, 'start_pool', side_effect=OSError("no processes")):
+            with self.assertRaises(OSError):
+                cross_validate(features, labels, {}, CATEGORY_MAP, folds=3)
+
+        self.assertEqual(len(created), 1)
+        for spec in created[0].specs.values():
+            with self.assertRaises(FileNotFoundError):
+                shared_memory.SharedMemory(name=spec[1])
@@ -0,0 +1,69 @@
+"""
+Unit tests for near-duplicate detection
+"""
+
+import unittest
+import numpy as np
+from smartsynch.data.dedup import (
+    blocked_pairs, connected_groups, dedup_report, find_duplicates, ivf_pairs
+)
+from smartsynch.models.vector_index import normalize
+
+def with_duplicates(n=600, copies=60, dim=32, seed=0):
+    """Random vectors where ``copies`` rows are noisy copies of earlier rows."""
+    rng = np.random.default_rng(seed)
+    vectors = rng.normal(size=(n, dim)).astype(np.float32)
+    targets = rng.choice(np.arange(n // 2, n), copies, replace=False)
+    sources = rng.choice(n // 2, copies, replace=False)
+    vectors[targets] = vectors[sources] + 0.01 * rng.normal(size=(copies, dim))
+    return vectors, set(zip(sources.tolist(), targets.tolist()))
+
+class TestDedup(unittest.TestCase):
+    def setUp(self):
+        """Set up vectors with planted duplicates."""
+        self.vectors, self.planted = with_duplicates()
+        scores = normalize(self.vectors) @ normalize(self.vectors).T
+        i, j = np.nonzero(np.triu(scores >= 0.95, k=1))
+        self.expected = set(zip(i.tolist(), j.tolist()))
+
+    def test_blocked_pairs_match_brute_force(self):
+        """Test blocked search finds exactly the pairs above the threshold."""
+        i, j = blocked_pairs(self.vectors, 0.95, block_size=64)
+        self.assertEqual(set(zip(i.tolist(), j.tolist())), self.expected)
+        self.assertTrue(self.planted <= self.expected)
+        self.assertTrue(np.all(i < j))
+
+    def test_ivf_pairs_find_the_planted_duplicates(self):
+        """Test bucketed search finds duplicates without comparing all pairs."""
+        i, j = ivf_pairs(self.vectors, 0.95, nlist=8, probes=2, block_size=64)
+        self.assertEqual(set(zip(i.tolist(), j.tolist())), self.expected)
+
+    def test_connected_groups_collapse_chains(self):
+        """Test chained pairs end up in one group labeled by its first member."""
+        edges = np.array([[5, 3], [3, 8], [1, 2], [8, 6]])
+        groups = connected_groups(10, edges[:, 0], edges[:, 1])
+        np.testing.assert_array_equal(groups, [0, 1, 1, 3, 4, 3, 3, 7, 3, 9])
+
+    def test_find_duplicates_keeps_one_sample_per_group(self):
+        """Test kept indices and groups (kept sample first)."""
+        result = find_duplicates(self.vectors, 0.95, method='blocked', block_size=128)
+        groups = {tuple(group.tolist()) for group in result['groups']}
+        self.assertEqual(groups, {pair for pair in self.expected})
+        self.assertEqual(len(result['keep']), len(self.vectors) - len(self.expected))
+        self.assertFalse(set(result['keep'].tolist()) & {j for _, j in self.expected})
+
+    def test_report_flags_conflicting_labels(self):
+        """Test the report lists removed samples and label conflicts."""
+        vectors = np.array([[1, 0], [1, 0.01], [0, 1], [0.01, 1], [-1, 0]], dtype=np.float32)
+        labels = ["Design", "Design", "Meeting", "Planning", "Research"]
+        samples = [{"title": f"task {i}"} for i in range(5)]
+        result = find_duplicates(vectors, 0.99)
+        report = dedup_report(vectors, result, labels, 0.99, samples)
+
+        self.assertEqual((report['samples'], report['kept'], report['removed']), (5, 3, 2))
+        self.assertEqual(report['conflicting_groups'], 1)
+        first, second = report['groups']
+        self.assertEqual(first['kept'], {'index': 0, 'category': 'Design', 'title': 'task 0'})
+        self.assertEqual(first['removed'][0]['index'], 1)
+        self.assertGreater(first['removed'][0]['similarity'], 0.99)
+        self.assertTrue(second['conflicting_labels'])
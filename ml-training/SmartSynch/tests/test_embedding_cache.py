@@ -0,0 +1,132 @@
+"""
+Unit tests for the two-tier embedding cache
+"""
+
+import copy
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import Mock, patch
+import numpy as np
+from smartsynch.models.classifier import TaskClassifier
+from smartsynch.models.embedding_cache import EmbeddingCache
+from smartsynch.models.predictor import Predictor
+from smartsynch.utils.helpers import DEFAULT_PREDICTOR_CONFIG
+
+def fake_encode(texts):
+    """Deterministic stand-in for SentenceTransformer.encode."""
+    return np.array([[len(text), text.count('a'), 1.0] for text in texts], dtype=np.float32)
+
+class TestEmbeddingCache(unittest.TestCase):
+    def setUp(self):
+        """Set up a temporary shared store."""
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.disk_path = str(Path(self.tmp_dir.name) / "embeddings.sqlite")
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_memory_hits(self):
+        """Test repeated texts are served from memory."""
+        cache = EmbeddingCache("encoder@fp32", memory_size=10)
+        encode = Mock(side_effect=fake_encode)
+
+        first = cache.get_or_compute(["alpha", "beta"], encode)
+        second = cache.get_or_compute(["beta", "alpha"], encode)
+
+        encode.assert_called_once()
+        np.testing.assert_array_equal(first[::-1], second)
+        stats = cache.stats()
+        self.assertEqual(stats["misses"], 2)
+        self.assertEqual(stats["memory_hits"], 2)
+
+    def test_duplicates_encoded_once(self):
+        """Test duplicate texts in one call are only encoded once."""
+        cache = EmbeddingCache("encoder@fp32", memory_size=10)
+        encode = Mock(side_effect=fake_encode)
+
+        result = cache.get_or_compute(["alpha", "alpha", "beta"], encode)
+
+        self.assertEqual(result.shape, (3, 3))
+        self.assertEqual(encode.call_args[0][0], ["alpha", "beta"])
+
+    def test_lru_eviction(self):
+        """Test the memory tier stays bounded."""
+        cache = EmbeddingCache("encoder@fp32", memory_size=2)
+        cache.get_or_compute(["a", "b", "c"], fake_encode)
+
+        stats = cache.stats()
+        self.assertEqual(stats["memory_entries"], 2)
+        self.assertEqual(stats["evictions"], 1)
+
+    def test_disk_tier_survives_restart(self):
+        """Test a new cache instance reads vectors written by another."""
+        writer = EmbeddingCache("encoder@fp32", disk_path=self.disk_path)
+        expected = writer.get_or_compute(["alpha"], fake_encode)
+
+        reader = EmbeddingCache("encoder@fp32", disk_path=self.disk_path)
+        encode = Mock(side_effect=fake_encode)
+        result = reader.get_or_compute(["alpha"], encode)
+
+        encode.assert_not_called()
+        np.testing.assert_array_equal(expected, result)
+        self.assertEqual(reader.stats()["disk_hits"], 1)
+
+    def test_namespaces_are_isolated(self):
+        """Test vectors from one encoder are not served for another."""
+        EmbeddingCache("encoder@fp32", disk_path=self.disk_path).get_or_compute(
+            ["alpha"], fake_encode
+        )
+
+        other = EmbeddingCache("encoder@bf16", disk_path=self.disk_path)
+        encode = Mock(side_effect=fake_encode)
+        other.get_or_compute(["alpha"], encode)
+
+        encode.assert_called_once()
+
+    def test_store_reconnects_after_close(self):
+        """Test a closed store (e.g. before forking workers) reopens on use."""
+        cache = EmbeddingCache("encoder@fp32", memory_size=0, disk_path=self.disk_path)
+        expected = cache.get_or_compute(["alpha"], fake_encode)
+        cache.store.close()
+
+        encode = Mock(side_effect=fake_encode)
+        np.testing.assert_array_equal(cache.get_or_compute(["alpha"], encode), expected)
+        encode.assert_not_called()
+
+class TestPredictorNamespace(unittest.TestCase):
+    def setUp(self):
+        """Set up a predictor config with a temporary shared store."""
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.config = copy.deepcopy(DEFAULT_PREDICTOR_CONFIG)
+        self.config['cache']['disk_path'] = str(Path(self.tmp_dir.name) / "embeddings.sqlite")
+        self.encoder = Mock()
+        self.encoder.encode.side_effect = lambda texts, **kwargs: fake_encode(texts)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def predictor(self, fingerprint):
+        """A predictor (as after a restart) whose encoder weights hash to ``fingerprint``."""
+        head = TaskClassifier({'num_classes': 2, 'embedding_dim': 3, 'dropout_rate': 0.0,
+                               'model_dir': self.tmp_dir.name})
+        with patch('smartsynch.models.predictor.ModelManager') as manager, \
+                patch('smartsynch.models.predictor.get_encoder', return_value=self.encoder), \
+                patch('smartsynch.models.predictor.encoder_fingerprint', return_value=fingerprint), \
+                patch('smartsynch.models.predictor.load_predictor_config', return_value=self.config):
+            manager.return_value.category_map = {"Design": 0, "Development": 1}
+            manager.return_value.load_model.return_value = head
+            manager.return_value.model_metadata = {}
+            return Predictor()
+
+    def test_new_encoder_weights_do_not_read_old_vectors(self):
+        """Test the disk tier is keyed by the encoder weights, not just its name."""
+        self.predictor('a' * 64).get_embeddings(["fix login"])
+        self.predictor('a' * 64).get_embeddings(["fix login"])
+        self.assertEqual(self.encoder.encode.call_count, 1)
+
+        upgraded = self.predictor('b' * 64)
+        upgraded.get_embeddings(["fix login"])
+        self.assertEqual(self.encoder.encode.call_count, 2)
+        self.assertEqual(upgraded.embedding_cache.stats()["disk_hits"], 0)
+        self.assertTrue(upgraded.embedding_cache.namespace.endswith("@" + "b" * 16))
@@ -0,0 +1,56 @@
+"""
+Unit tests for the shared encoder registry
+"""
+
+import unittest
+from unittest.mock import Mock, patch
+from smartsynch.models import encoder as encoder_registry
+from smartsynch.models.classifier import TaskClassifier
+
+class TestEncoderRegistry(unittest.TestCase):
+    def setUp(self):
+        """Start every test with an empty registry."""
+        encoder_registry.clear_encoders()
+
+    def tearDown(self):
+        encoder_registry.clear_encoders()
+
+    @patch('sentence_transformers.SentenceTransformer')
+    def test_encoder_is_shared(self, mock_transformer):
+        """Test repeated lookups return the same instance."""
+        first = encoder_registry.get_encoder('all-MiniLM-L6-v2')
+        second = encoder_registry.get_encoder('all-MiniLM-L6-v2')
+
+        self.assertIs(first, second)
+        mock_transformer.assert_called_once()
+
+    @patch('sentence_transformers.SentenceTransformer')
+    def test_encoders_keyed_by_device_and_precision(self, mock_transformer):
+        """Test distinct devices and precisions get distinct encoders."""
+        mock_transformer.side_effect = lambda *args, **kwargs: Mock()
+
+        fp32 = encoder_registry.get_encoder('all-MiniLM-L6-v2', 'cpu', 'fp32')
+        bf16 = encoder_registry.get_encoder('all-MiniLM-L6-v2', 'cpu', 'bf16')
+
+        self.assertIsNot(fp32, bf16)
+        self.assertEqual(len(encoder_registry.loaded_encoders()), 2)
+
+    def test_unsupported_precision(self):
+        """Test unknown precisions are rejected."""
+        with self.assertRaises(ValueError):
+            encoder_registry.get_encoder('all-MiniLM-L6-v2', 'cpu', 'fp8')
+
+    @patch('sentence_transformers.SentenceTransformer')
+    def test_classifier_is_pure_head(self, mock_transformer):
+        """Test building the classifier does not load an encoder."""
+        model = TaskClassifier({
+            'num_classes': 5,
+            'embedding_dim': 384,
+            'dropout_rate': 0.2,
+            'model_dir': 'models/fine_tuned'
+        })
+
+        mock_transformer.assert_not_called()
+        self.assertFalse(
+            any(key.startswith('encoder.') for key in model.state_dict())
+        )
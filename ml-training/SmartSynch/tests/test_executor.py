@@ -0,0 +1,92 @@
+"""
+Unit tests for the bounded inference executor
+"""
+
+import asyncio
+import threading
+import time
+import unittest
+import torch
+from smartsynch.api.batching import MicroBatcher
+from smartsynch.models.executor import InferenceExecutor, InferenceQueueFull
+
+class TestInferenceExecutor(unittest.TestCase):
+    def setUp(self):
+        """Set up a single-worker executor with a short queue."""
+        self.torch_threads = torch.get_num_threads()
+        self.executor = InferenceExecutor(max_workers=1, torch_threads=1, max_queue=1)
+
+    def tearDown(self):
+        self.executor.shutdown()
+        torch.set_num_threads(self.torch_threads)
+
+    def test_blocking_calls_do_not_stall_the_event_loop(self):
+        """Test other coroutines keep running while inference blocks."""
+        ticks = []
+
+        async def ticker():
+            for _ in range(5):
+                ticks.append(time.perf_counter())
+                await asyncio.sleep(0.01)
+
+        async def run():
+            result, _ = await asyncio.gather(
+                self.executor.run(lambda: time.sleep(0.2) or "done"), ticker()
+            )
+            return result
+
+        started = time.perf_counter()
+        self.assertEqual(asyncio.run(run()), "done")
+        self.assertEqual(len(ticks), 5)
+        self.assertLess(ticks[-1] - started, 0.15)
+
+    def test_work_beyond_the_queue_bound_is_rejected(self):
+        """Test a full queue rejects instead of growing without limit."""
+        release = threading.Event()
+
+        async def run():
+            running = asyncio.ensure_future(self.executor.run(release.wait))
+            while self.executor.stats()['running'] == 0:
+                await asyncio.sleep(0.005)
+            queued = asyncio.ensure_future(self.executor.run(lambda: "queued"))
+            await asyncio.sleep(0)
+            with self.assertRaises(InferenceQueueFull):
+                await self.executor.run(lambda: "rejected")
+            stats = self.executor.stats()
+            release.set()
+            return await queued, stats, await running
+
+        result, stats, _ = asyncio.run(run())
+        self.assertEqual(result, "queued")
+        self.assertEqual((stats['running'], stats['queued'], stats['rejected']), (1, 1, 1))
+        final = self.executor.stats()
+        self.assertEqual((final['completed'], final['queued'], final['running']), (2, 0, 0))
+
+    def test_failures_are_counted_and_raised(self):
+        """Test exceptions reach the caller and show up in the metrics."""
+        def fail():
+            raise ValueError("bad input")
+
+        with self.assertRaises(ValueError):
+            asyncio.run(self.executor.run(fail))
+        self.assertEqual(self.executor.stats()['failed'], 1)
+
+    def test_batcher_dispatches_on_the_executor(self):
+        """Test micro-batches run on the inference executor."""
+        threads = []
+
+        def process(items):
+            threads.append(threading.current_thread().name)
+            return [item + 1 for item in items]
+
+        batcher = MicroBatcher(process, max_batch_size=4, max_wait_ms=20,
+                               executor=self.executor)
+
+        async def run():
+            results = await asyncio.gather(*(batcher.submit(i) for i in range(3)))
+            await batcher.stop()
+            return results
+
+        self.assertEqual(asyncio.run(run()), [1, 2, 3])
+        self.assertTrue(threads[0].startswith("inference"))
+        self.assertEqual(self.executor.stats()['completed'], 1)
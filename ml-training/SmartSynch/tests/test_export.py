@@ -0,0 +1,104 @@
+"""
+Unit tests for model export and graph backends
+"""
+
+import tempfile
+import unittest
+from pathlib import Path
+import numpy as np
+import torch
+from transformers import BertConfig, BertModel, BertTokenizerFast
+from sentence_transformers import SentenceTransformer, models
+from smartsynch.models.backends import EagerBackend, head_hash, load_backend
+from smartsynch.models.classifier import TaskClassifier
+from smartsynch.models.encoder import weights_fingerprint
+from smartsynch.models.export import export_model
+
+VOCAB = ['[PAD]', '[UNK]', '[CLS]', '[SEP]', '[MASK]'] + (
+    'example task title a somewhat longer description fix login bug '
+    'design logo plan sprint meeting research api'
+).split()
+
+def build_tiny_encoder(path: Path) -> SentenceTransformer:
+    """Small random BERT sentence encoder that needs no downloads."""
+    (path / 'vocab.txt').write_text('\n'.join(VOCAB))
+    BertTokenizerFast(str(path / 'vocab.txt')).save_pretrained(str(path))
+    BertModel(BertConfig(
+        vocab_size=len(VOCAB), hidden_size=32, num_hidden_layers=1,
+        num_attention_heads=2, intermediate_size=64
+    )).save_pretrained(str(path))
+    return SentenceTransformer(modules=[
+        models.Transformer(str(path), max_seq_length=32),
+        models.Pooling(32, 'mean'),
+        models.Normalize()
+    ], device='cpu')
+
+class TestExport(unittest.TestCase):
+    def setUp(self):
+        """Build a tiny encoder and head."""
+        torch.manual_seed(0)
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        root = Path(self.tmp_dir.name)
+        (root / 'encoder').mkdir()
+        self.encoder = build_tiny_encoder(root / 'encoder')
+        self.head = TaskClassifier({
+            'num_classes': 5, 'embedding_dim': 32,
+            'dropout_rate': 0.2, 'model_dir': str(root)
+        }).eval()
+        self.output_dir = root / 'export'
+        self.texts = ['fix login bug', 'design logo', 'plan sprint meeting', 'research api']
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_torchscript_parity(self):
+        """Test the TorchScript artifact matches eager outputs."""
+        report = export_model(
+            self.encoder, self.head, str(self.output_dir), self.texts,
+            formats=['torchscript']
+        )
+
+        parity = report['backends']['torchscript']['parity']
+        self.assertTrue(parity['passed'])
+        self.assertEqual(parity['argmax_agreement'], 1.0)
+        self.assertIn('batch_1_ms', report['backends']['eager']['latency'])
+
+        backend = load_backend({'backend': 'torchscript', 'artifact_dir': str(self.output_dir)},
+                               head=self.head)
+        eager = EagerBackend(self.encoder, self.head)
+        np.testing.assert_allclose(
+            backend.encode(self.texts), eager.encode(self.texts), atol=1e-5
+        )
+
+    def test_artifact_of_another_head_is_refused(self):
+        """Test a stale artifact is not served under the loaded head's labels."""
+        report = export_model(self.encoder, self.head, str(self.output_dir), self.texts,
+                              formats=['torchscript'], metadata={'model_path': 'v1/model.pt'})
+        retrained = TaskClassifier({
+            'num_classes': 5, 'embedding_dim': 32,
+            'dropout_rate': 0.2, 'model_dir': self.tmp_dir.name
+        }).eval()
+
+        self.assertEqual(report['head_digest'], head_hash(self.head).hexdigest())
+        self.assertEqual(report['encoder_hash'], weights_fingerprint(self.encoder))
+        with self.assertRaisesRegex(ValueError, "v1/model.pt"):
+            load_backend({'backend': 'torchscript', 'artifact_dir': str(self.output_dir)},
+                         head=retrained)
+        with self.assertRaisesRegex(ValueError, "no onnxruntime export"):
+            load_backend({'backend': 'onnxruntime', 'artifact_dir': str(self.output_dir)},
+                         head=self.head)
+
+    def test_failed_parity_is_refused(self):
+        """Test an artifact outside the parity tolerance never loads."""
+        report = export_model(self.encoder, self.head, str(self.output_dir), self.texts,
+                              formats=['torchscript'], tolerance=-1.0)
+
+        self.assertFalse(report['backends']['torchscript']['parity']['passed'])
+        with self.assertRaisesRegex(ValueError, "parity"):
+            load_backend({'backend': 'torchscript', 'artifact_dir': str(self.output_dir)},
+                         head=self.head)
+
+    def test_unknown_backend(self):
+        """Test unknown backends are rejected."""
+        with self.assertRaises(ValueError):
+            load_backend({'backend': 'tensorrt'})
@@ -0,0 +1,87 @@
+"""
+Unit tests for in-memory batches and the fast head training mode
+"""
+
+import tempfile
+import unittest
+import torch
+from torch.utils.data import DataLoader, TensorDataset
+from smartsynch.data.batches import InMemoryBatches
+from smartsynch.models.classifier import TaskClassifier
+
+class TestInMemoryBatches(unittest.TestCase):
+    def setUp(self):
+        """Set up a small feature matrix."""
+        self.X = torch.arange(50, dtype=torch.float32).unsqueeze(1).repeat(1, 4)
+        self.y = torch.arange(50) % 3
+
+    def test_shuffled_epoch_covers_every_sample_once(self):
+        """Test each epoch is a permutation, sliced into full batches."""
+        batches = InMemoryBatches(self.X, self.y, batch_size=16, shuffle=True,
+                                  generator=torch.Generator().manual_seed(0))
+        first = torch.cat([features[:, 0] for features, _ in batches])
+        second = torch.cat([features[:, 0] for features, _ in batches])
+
+        self.assertEqual(len(batches), 4)
+        self.assertEqual(sorted(first.long().tolist()), list(range(50)))
+        self.assertFalse(torch.equal(first, second))
+        for features, labels in batches:
+            self.assertTrue(torch.equal(labels, features[:, 0].long() % 3))
+
+    def test_drop_last(self):
+        """Test the partial batch is skipped on request."""
+        batches = InMemoryBatches(self.X.numpy(), self.y.numpy(), batch_size=16, drop_last=True)
+        self.assertEqual([len(labels) for _, labels in batches], [16, 16, 16])
+
+class TestFastTraining(unittest.TestCase):
+    def setUp(self):
+        """Set up a small head and data."""
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.config = {
+            'num_classes': 3,
+            'embedding_dim': 16,
+            'dropout_rate': 0.2,
+            'num_epochs': 3,
+            'early_stopping_patience': 10,
+            'model_dir': self.tmp_dir.name,
+        }
+        torch.manual_seed(0)
+        self.X = torch.randn(96, 16)
+        self.y = torch.randint(0, 3, (96,))
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def train(self, train_loader, val_loader, **kwargs):
+        torch.manual_seed(1)
+        model = TaskClassifier(self.config)
+        optimizer = torch.optim.Adam(model.parameters(), lr=1e-3)
+        model.train_model(train_loader, val_loader, torch.nn.CrossEntropyLoss(),
+                          optimizer, 'cpu', **kwargs)
+        return model
+
+    def test_in_memory_batches_match_data_loaders(self):
+        """Test the fast path trains exactly like DataLoaders over the same order."""
+        # DataLoaders draw from the global RNG, which would change the dropout masks
+        self.config['dropout_rate'] = 0.0
+        reference = self.train(DataLoader(TensorDataset(self.X, self.y), batch_size=16),
+                               DataLoader(TensorDataset(self.X, self.y), batch_size=16))
+        fast = self.train(InMemoryBatches(self.X, self.y, 16),
+                          InMemoryBatches(self.X, self.y, 16))
+
+        for name in ('train_loss', 'val_loss'):
+            for got, expected in zip(fast.history[name], reference.history[name]):
+                self.assertAlmostEqual(got, expected, places=5)
+
+    def test_epoch_throughput_is_recorded(self):
+        """Test epoch time and samples/sec are kept in the history."""
+        model = self.train(InMemoryBatches(self.X, self.y, 16, shuffle=True),
+                           InMemoryBatches(self.X, self.y, 96),
+                           autocast_dtype=torch.bfloat16)
+
+        self.assertEqual(len(model.history['epoch_time']), 3)
+        self.assertEqual(len(model.history['samples_per_sec']), 3)
+        for epoch_time, throughput in zip(model.history['epoch_time'],
+                                          model.history['samples_per_sec']):
+            self.assertAlmostEqual(throughput * epoch_time, 96, places=3)
+        self.assertTrue(all(loss == loss for loss in model.history['train_loss']))
@@ -0,0 +1,145 @@
+"""
+Unit tests for the load-once model pool
+"""
+
+import asyncio
+import threading
+import time
+import unittest
+import torch
+from smartsynch.models.executor import InferenceExecutor
+from smartsynch.models.model_pool import ModelPool, module_bytes
+
+class TestModelPool(unittest.TestCase):
+    def setUp(self):
+        """Set up a loader building 1 MB modules and recording its calls."""
+        self.loads = []
+        self.lock = threading.Lock()
+
+    def loader(self, name):
+        with self.lock:
+            self.loads.append(name)
+        time.sleep(0.05)
+        return torch.nn.Linear(512, 512, bias=False)  # 1 MB of fp32 weights
+
+    def test_concurrent_first_requests_load_once(self):
+        """Test threads asking for a cold model share one load."""
+        pool = ModelPool(self.loader)
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(pool.get("nli")))
+            for _ in range(6)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(self.loads, ["nli"])
+        self.assertTrue(all(result is results[0] for result in results))
+        stats = pool.stats()
+        self.assertEqual((stats['misses'], stats['waits'], stats['loads']), (1, 5, 1))
+
+    def test_async_callers_load_once_off_the_loop(self):
+        """Test coroutines share one load run on the executor."""
+        pool = ModelPool(self.loader)
+        executor = InferenceExecutor(max_workers=2, torch_threads=torch.get_num_threads())
+
+        async def run():
+            return await asyncio.gather(*(pool.aget("nli", executor) for _ in range(4)))
+
+        try:
+            results = asyncio.run(run())
+        finally:
+            executor.shutdown()
+        self.assertEqual(self.loads, ["nli"])
+        self.assertTrue(all(result is results[0] for result in results))
+
+    def test_cancelled_waiter_does_not_cancel_the_load(self):
+        """Test cancelling one of two concurrent callers leaves the other its model."""
+        pool = ModelPool(self.loader)
+        executor = InferenceExecutor(max_workers=2, torch_threads=torch.get_num_threads())
+
+        async def run():
+            loader = asyncio.ensure_future(pool.aget("nli", executor))
+            waiter = asyncio.ensure_future(pool.aget("nli", executor))
+            await asyncio.sleep(0.01)
+            waiter.cancel()
+            model = await loader
+            with self.assertRaises(asyncio.CancelledError):
+                await waiter
+            return model
+
+        try:
+            model = asyncio.run(run())
+        finally:
+            executor.shutdown()
+        self.assertIs(pool.peek("nli"), model)
+        self.assertEqual(self.loads, ["nli"])
+
+    def test_cancelled_loader_still_loads_for_waiters(self):
+        """Test cancelling the caller whose load is still queued neither hangs nor drops it."""
+        pool = ModelPool(self.loader)
+        executor = InferenceExecutor(max_workers=1, torch_threads=torch.get_num_threads())
+        release = threading.Event()
+
+        async def run():
+            busy = asyncio.ensure_future(executor.run(release.wait))
+            loader = asyncio.ensure_future(pool.aget("nli", executor))
+            await asyncio.sleep(0.01)
+            loader.cancel()  # its load is queued behind ``busy``
+            waiter = asyncio.ensure_future(pool.aget("nli", executor))
+            await asyncio.sleep(0.01)
+            release.set()
+            await busy
+            return await asyncio.wait_for(waiter, timeout=5)
+
+        try:
+            model = asyncio.run(run())
+        finally:
+            release.set()
+            executor.shutdown()
+        self.assertIs(pool.peek("nli"), model)
+        self.assertEqual(pool.stats()['loading'], [])
+
+    def test_least_recently_used_models_are_evicted(self):
+        """Test the pool stays within its memory budget."""
+        pool = ModelPool(self.loader, memory_budget_mb=2.5)
+        pool.preload(["a", "b"])
+        pool.get("a")  # "b" is now least recently used
+        pool.get("c")
+
+        self.assertIsNone(pool.peek("b"))
+        self.assertIsNotNone(pool.peek("a"))
+        stats = pool.stats()
+        self.assertEqual(stats['evictions'], 1)
+        self.assertEqual(sorted(stats['models']), ["a", "c"])
+        self.assertAlmostEqual(stats['used_mb'], 2.0)
+        self.assertAlmostEqual(stats['models']['a']['size_mb'], 1.0)
+
+        pool.get("b")  # reloads
+        self.assertEqual(self.loads, ["a", "b", "c", "b"])
+
+    def test_failed_load_is_retried(self):
+        """Test a failing load reaches the caller and does not stick."""
+        attempts = []
+
+        def flaky(name):
+            attempts.append(name)
+            if len(attempts) == 1:
+                raise OSError("no such model")
+            return self.loader(name)
+
+        pool = ModelPool(flaky)
+        with self.assertRaises(OSError):
+            pool.get("nli")
+        self.assertIsInstance(pool.get("nli"), torch.nn.Linear)
+        self.assertEqual(pool.stats()['load_failures'], 1)
+
+    def test_module_bytes_sees_wrapped_models(self):
+        """Test sizes are read from a wrapper's .model attribute."""
+        class Wrapper:
+            model = torch.nn.Linear(4, 4)
+
+        self.assertEqual(module_bytes(Wrapper()), (16 + 4) * 4)
+        self.assertEqual(module_bytes(object()), 0)
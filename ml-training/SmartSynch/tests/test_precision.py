@@ -0,0 +1,78 @@
+"""
+Unit tests for reduced-precision heads and the accuracy gate
+"""
+
+import tempfile
+import unittest
+from pathlib import Path
+import numpy as np
+import torch
+from smartsynch.models.backends import EagerBackend
+from smartsynch.models.classifier import TaskClassifier
+from smartsynch.models.manager import ModelManager
+from smartsynch.models.precision import (
+    accuracy_gate, convert_head, input_dtype, run_head, serialized_size
+)
+
+class TestPrecision(unittest.TestCase):
+    def setUp(self):
+        """Set up a trained-size head and random embeddings."""
+        torch.manual_seed(0)
+        self.head = TaskClassifier({
+            'num_classes': 5,
+            'embedding_dim': 384,
+            'dropout_rate': 0.2
+        }).eval()
+        self.embeddings = torch.randn(64, 384)
+
+    def test_reduced_heads_agree_with_fp32(self):
+        """Test bf16 and int8 heads mostly predict the fp32 class."""
+        reference, _, _ = run_head(self.head, self.embeddings, repeats=1)
+        for precision in ('bf16', 'int8'):
+            predictions, _, _ = run_head(convert_head(self.head, precision),
+                                         self.embeddings, repeats=1)
+            self.assertGreaterEqual((predictions == reference).mean(), 0.9, precision)
+
+    def test_reduced_heads_are_smaller(self):
+        """Test converted heads serialize smaller and leave the original intact."""
+        fp32_size = serialized_size(self.head)
+        for precision in ('bf16', 'int8'):
+            self.assertLess(serialized_size(convert_head(self.head, precision)), fp32_size)
+        self.assertEqual(input_dtype(self.head), torch.float32)
+
+    def test_eager_backend_casts_inputs(self):
+        """Test the eager backend feeds bf16 heads and returns float logits."""
+        backend = EagerBackend(None, convert_head(self.head, 'bf16'))
+        logits = backend.forward(self.embeddings)
+        self.assertEqual(logits.dtype, torch.float32)
+        self.assertEqual(tuple(logits.shape), (64, 5))
+
+    def test_accuracy_gate(self):
+        """Test the gate rejects variants that drift from fp32."""
+        labels = np.array([0, 1, 2, 3])
+        reference = np.array([0, 1, 2, 0])
+        self.assertTrue(accuracy_gate(reference, reference, labels, 0.0, 1.0)['passed'])
+
+        drifted = accuracy_gate(reference, np.array([0, 1, 1, 0]), labels, 0.01, 0.99)
+        self.assertFalse(drifted['passed'])
+        self.assertAlmostEqual(drifted['agreement'], 0.75)
+        self.assertAlmostEqual(drifted['accuracy_drop'], 0.25)
+
+    def test_unknown_precision(self):
+        """Test unsupported head precisions are rejected."""
+        with self.assertRaises(ValueError):
+            convert_head(self.head, 'fp8')
+
+    def test_latest_model_skips_variants(self):
+        """Test registered variants are never picked as the latest model."""
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            manager = ModelManager(tmp_dir)
+            self.head.encoder_name = 'all-MiniLM-L6-v2'
+            manager.save_model(self.head, '20261018_120000', manager.category_map, {})
+            base = Path(tmp_dir) / '20261018_120000' / 'model.pt'
+            variant = manager.register_variant(str(base), {'encoder': 'fp32', 'head': 'int8'},
+                                               gate={'accuracy': 1.0})
+
+            self.assertGreater(variant.name, base.parent.name)
+            self.assertEqual(ModelManager.latest_model(Path(tmp_dir)), base)
+
@@ -0,0 +1,138 @@
+"""
+Unit tests for the NDJSON streaming prediction endpoint
+"""
+
+import asyncio
+import json
+import unittest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from smartsynch.api.dependencies import get_predictor
+from smartsynch.api.routes import predictions
+from smartsynch.api.streaming import DuplexStreamingResponse, iter_ndjson_chunks
+from smartsynch.models.executor import InferenceQueueFull
+
+class FakePredictor:
+    """Predictor classifying every task as Design, optionally failing some calls."""
+
+    def __init__(self, chunk_size=2, fail_calls=()):
+        self.config = {'batching': {'chunk_size': chunk_size}}
+        self.fail_calls = fail_calls
+        self.calls = []
+
+    async def abatch_predict(self, tasks):
+        self.calls.append([task['title'] for task in tasks])
+        if len(self.calls) in self.fail_calls:
+            raise InferenceQueueFull("inference: 64 calls already waiting")
+        return [{'category': 'Design', 'category_id': 1, 'confidence': 0.9} for _ in tasks]
+
+class FakeRequest:
+    """Request whose body arrives in the given pieces."""
+
+    def __init__(self, pieces):
+        self.pieces = pieces
+
+    async def stream(self):
+        for piece in self.pieces:
+            yield piece
+
+def ndjson(*records):
+    return "".join(json.dumps(record) + "\n" for record in records)
+
+def collect(pieces, chunk_size=10, max_line_bytes=1 << 20):
+    async def run():
+        return [chunk async for chunk in
+                iter_ndjson_chunks(FakeRequest(pieces), chunk_size, max_line_bytes)]
+    return asyncio.run(run())
+
+class TestNdjsonChunks(unittest.TestCase):
+    def test_records_split_across_pieces(self):
+        """Test lines split over body pieces are parsed in order and chunked."""
+        chunks = collect([b'{"title": "a"}\n{"ti', b'tle": "b"}\n\n[1]\n', b'{"title": "c"}'],
+                         chunk_size=2)
+        self.assertEqual(chunks, [
+            [{"line": 1, "data": {"title": "a"}}, {"line": 2, "data": {"title": "b"}}],
+            [{"line": 4, "error": "Expected a JSON object"}, {"line": 5, "data": {"title": "c"}}],
+        ])
+
+    def test_oversized_line_is_skipped(self):
+        """Test a too long line becomes an error record and parsing resumes after it."""
+        chunks = collect([b'{"title": "a"}\n{"title": "', b'x' * 40, b'x' * 40, b'"}\n{"title": "b"}\n'],
+                         max_line_bytes=32)
+        self.assertEqual(chunks, [[
+            {"line": 1, "data": {"title": "a"}},
+            {"line": 2, "error": "Line exceeds 32 bytes"},
+            {"line": 3, "data": {"title": "b"}},
+        ]])
+
+class TestDuplexStreamingResponse(unittest.TestCase):
+    def test_disconnect_after_the_body_stops_the_stream(self):
+        """Test a client leaving once the body is read cancels the remaining work."""
+        body_read = asyncio.Event()
+        produced = []
+
+        async def content():
+            body_read.set()
+            for i in range(1000):
+                produced.append(i)
+                yield b"{}\n"
+                await asyncio.sleep(0.01)
+
+        async def receive():
+            await asyncio.sleep(0.05)
+            return {"type": "http.disconnect"}
+
+        async def send(message):
+            pass
+
+        response = DuplexStreamingResponse(content(), body_read=body_read)
+        asyncio.run(asyncio.wait_for(response({"type": "http"}, receive, send), timeout=5))
+        self.assertLess(len(produced), 100)
+
+class TestPredictStreamRoute(unittest.TestCase):
+    def client(self, predictor):
+        app = FastAPI()
+        app.include_router(predictions.router, prefix="/api/v1")
+        app.dependency_overrides[get_predictor] = lambda: predictor
+        return TestClient(app)
+
+    def post(self, predictor, body):
+        response = self.client(predictor).post("/api/v1/predict/stream", content=body)
+        self.assertEqual(response.status_code, 200)
+        return [json.loads(line) for line in response.text.splitlines()]
+
+    def test_streams_results_in_input_order(self):
+        """Test every line gets a result with its line number and id."""
+        predictor = FakePredictor()
+        body = ndjson({"title": "a", "description": "x", "id": 7},
+                      {"title": "b", "description": "y"},
+                      {"title": "c"},  # no description
+                      {"title": "d", "description": "z"})
+        results = self.post(predictor, body)
+
+        self.assertEqual([result["line"] for result in results], [1, 2, 3, 4])
+        self.assertEqual(results[0]["id"], 7)
+        self.assertEqual(results[1]["category"], "Design")
+        self.assertIn("error", results[2])
+        self.assertEqual(predictor.calls, [["a", "b"], ["d"]])
+
+    def test_oversized_line_gets_an_error_record(self):
+        """Test a line over the limit is reported without aborting the stream."""
+        body = ndjson({"title": "a", "description": "x"}) + "x" * ((1 << 20) + 10) + "\n" \
+            + ndjson({"title": "b", "description": "y"})
+        results = self.post(FakePredictor(), body)
+
+        self.assertEqual([result["line"] for result in results], [1, 2, 3])
+        self.assertIn("exceeds", results[1]["error"])
+        self.assertEqual(results[2]["category"], "Design")
+
+    def test_queue_full_mid_stream(self):
+        """Test a rejected chunk reports its tasks and later chunks still run."""
+        predictor = FakePredictor(fail_calls=(2,))
+        body = ndjson(*({"title": title, "description": "x"} for title in "abcdef"))
+        results = self.post(predictor, body)
+
+        self.assertEqual([result["line"] for result in results], [1, 2, 3, 4, 5, 6])
+        self.assertEqual([result.get("error") for result in results[2:4]],
+                         ["Inference queue is full, retry later"] * 2)
+        self.assertEqual({result["category"] for result in results[:2] + results[4:]}, {"Design"})
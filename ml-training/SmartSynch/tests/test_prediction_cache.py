@@ -0,0 +1,64 @@
+"""
+Unit tests for the Redis prediction cache
+"""
+
+import asyncio
+import unittest
+import fakeredis
+from redis import RedisError
+from smartsynch.api.prediction_cache import PredictionCache, prediction_key
+
+class TestPredictionCache(unittest.TestCase):
+    def setUp(self):
+        """Set up a cache over an in-memory Redis stand-in."""
+        self.redis = fakeredis.FakeAsyncRedis(decode_responses=True)
+        self.cache = PredictionCache('v1-abc', poll_interval_ms=5)
+        self.calls = 0
+
+    async def compute(self):
+        self.calls += 1
+        await asyncio.sleep(0.05)
+        return {"category": "design", "confidence": 0.9}
+
+    def test_keys_normalize_text_and_include_model_version(self):
+        """Test equivalent tasks share a key and model versions do not."""
+        key = prediction_key("Fix  Login\tbug ", "Users can't log in", 'v1')
+        self.assertEqual(key, prediction_key("fix login bug", "users can't log in", 'v1'))
+        self.assertNotEqual(key, prediction_key("fix login bug", "users can't log in", 'v2'))
+        self.assertNotEqual(key, prediction_key("fix login", "bug users can't log in", 'v1'))
+
+    def test_repeat_is_served_from_cache(self):
+        """Test the second identical request does not run inference."""
+        async def run():
+            first = await self.cache.get_or_compute(self.redis, "Logo", "Design it", self.compute)
+            second = await self.cache.get_or_compute(self.redis, "logo ", "design it", self.compute)
+            return first, second
+
+        first, second = asyncio.run(run())
+        self.assertEqual(first, second)
+        self.assertEqual(self.calls, 1)
+        self.assertEqual(self.cache.stats()['hits'], 1)
+        self.assertEqual(asyncio.run(self.redis.keys('*:lock')), [])
+
+    def test_concurrent_misses_compute_once(self):
+        """Test a hot key is computed by one caller while the rest wait."""
+        async def run():
+            return await asyncio.gather(*[
+                self.cache.get_or_compute(self.redis, "Sprint", "Plan it", self.compute)
+                for _ in range(5)
+            ])
+
+        results = asyncio.run(run())
+        self.assertEqual(self.calls, 1)
+        self.assertTrue(all(result == results[0] for result in results))
+        self.assertEqual(self.cache.stats()['wait_hits'], 4)
+
+    def test_redis_failure_falls_back_to_inference(self):
+        """Test an unavailable Redis does not fail the request."""
+        class BrokenRedis:
+            async def get(self, key):
+                raise RedisError("down")
+
+        result = asyncio.run(self.cache.get_or_compute(BrokenRedis(), "a", "b", self.compute))
+        self.assertEqual(result["category"], "design")
+        self.assertEqual(self.cache.stats()['errors'], 1)
@@ -0,0 +1,126 @@
+"""
+Unit tests for sharded DataProcessor preprocessing
+"""
+
+import multiprocessing
+import tempfile
+import unittest
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from unittest import mock
+import numpy as np
+from smartsynch.data import processor
+from smartsynch.data.processor import DataProcessor
+
+class FakeEncoder:
+    """Deterministic stand-in for the sentence encoder."""
+
+    def encode(self, texts, **kwargs):
+        return np.array([[len(text), text.count('e'), sum(map(ord, text)) % 97]
+                         for text in texts], dtype=np.float32)
+
+def fake_normalize(text):
+    """Stand-in for NLTK cleaning (its data is not needed here)."""
+    return ' '.join(text.lower().split())
+
+def _init_fake_worker(encoder_name, torch_threads):
+    processor._init_worker(encoder_name, torch_threads)
+    processor._normalize = fake_normalize
+    processor.get_encoder = lambda name: FakeEncoder()
+
+def fake_pool(workers=2):
+    """Spawned pool like DataProcessor._start_pool, with the fakes installed."""
+    return ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'),
+                               initializer=_init_fake_worker, initargs=('fake', 1))
+
+class TestShardedPreprocessing(unittest.TestCase):
+    def setUp(self):
+        """Patch the encoder and cleaning in this process."""
+        patches = [
+            mock.patch.object(processor, 'get_encoder', return_value=FakeEncoder()),
+            mock.patch.object(processor, '_normalize', side_effect=fake_normalize),
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+        self.samples = [
+            {'title': f"Task {i}", 'description': f"Write   the Spec number {i}", 'category': 'Design'}
+            for i in range(23)
+        ]
+
+    def test_workers_match_the_serial_path(self):
+        """Test sharded cleaning/encoding keeps input order and records each stage."""
+        serial = DataProcessor(encoder_name='fake', num_workers=1, shard_size=5)
+        expected = serial.embed_samples(self.samples)
+
+        pooled = DataProcessor(encoder_name='fake', num_workers=2, shard_size=5)
+        with mock.patch.object(pooled, '_start_pool', side_effect=fake_pool), \
+                mock.patch.object(pooled, '_map_shards', wraps=pooled._map_shards) as map_shards:
+            embeddings = pooled.embed_samples(self.samples)
+
+        np.testing.assert_array_equal(embeddings, expected)
+        stages = [call.args[1] for call in map_shards.call_args_list]
+        self.assertEqual(stages, [processor._clean_shard, processor._encode_shard])
+        for totals in (serial.throughput, pooled.throughput):
+            self.assertEqual(sorted(totals), ['clean', 'encode'])
+            for stage in totals.values():
+                self.assertEqual(stage['samples'], 23)
+                self.assertGreater(stage['samples_per_sec'], 0)
+
+    def test_pool_threads_follow_the_available_cpus(self):
+        """Test workers split the CPUs the process may use, not os.cpu_count()."""
+        data = DataProcessor(encoder_name='fake', num_workers=2)
+        self.assertIsNone(DataProcessor(encoder_name='fake')._start_pool())
+        with mock.patch.object(processor, 'available_cpus', return_value=6), \
+                mock.patch.object(processor, 'ProcessPoolExecutor') as executor:
+            data._start_pool()
+        self.assertEqual(executor.call_args.kwargs['initargs'], ('fake', 3))
+        self.assertEqual(executor.call_args.kwargs['max_workers'], 2)
+
+class TestEmbeddingStore(unittest.TestCase):
+    def setUp(self):
+        """Set up a processor with a counting encoder and a temporary store."""
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.store_path = str(Path(self.tmp_dir.name) / "embeddings.sqlite")
+        self.encoder = FakeEncoder()
+        self.encode = mock.Mock(side_effect=self.encoder.encode)
+        self.fingerprint = 'a' * 64
+        patches = [
+            mock.patch.object(processor, 'get_encoder', return_value=self.encoder),
+            mock.patch.object(processor, 'encoder_fingerprint',
+                              side_effect=lambda name: self.fingerprint),
+            mock.patch.object(self.encoder, 'encode', self.encode),
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+        self.processor = DataProcessor(encoder_name='fake')
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def encoded(self):
+        return [text for call in self.encode.call_args_list for text in call.args[0]]
+
+    def test_stored_texts_are_not_encoded_again(self):
+        """Test a second run only encodes texts missing from the store."""
+        first = self.processor.encode_texts(["fix login", "draw logo"], self.store_path)
+        second = self.processor.encode_texts(["draw logo", "plan sprint", "fix login"],
+                                             self.store_path)
+
+        self.assertEqual(self.encoded(), ["fix login", "draw logo", "plan sprint"])
+        np.testing.assert_array_equal(second[[0, 2]], first[[1, 0]])
+        np.testing.assert_array_equal(
+            second, FakeEncoder().encode(["draw logo", "plan sprint", "fix login"]))
+        self.assertEqual(self.processor.store_stats,
+                         {'namespace': 'fake@' + 'a' * 16, 'reused': 2, 'encoded': 3})
+
+    def test_new_encoder_weights_use_a_new_namespace(self):
+        """Test vectors of a previous encoder version are never reused."""
+        self.processor.encode_texts(["fix login"], self.store_path)
+        namespace = self.processor.store_namespace()
+        self.fingerprint = 'b' * 64
+        self.processor.encode_texts(["fix login"], self.store_path)
+
+        self.assertNotEqual(self.processor.store_namespace(), namespace)
+        self.assertEqual(self.encoded(), ["fix login", "fix login"])
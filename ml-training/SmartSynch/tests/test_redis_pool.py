@@ -0,0 +1,77 @@
+"""
+Unit tests for the pooled asyncio Redis access
+"""
+
+import asyncio
+import unittest
+from unittest.mock import patch
+import fakeredis
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from smartsynch.api import redis_pool
+from smartsynch.api.dependencies import get_redis_client
+from smartsynch.api.routes import feedback
+
+class TestRedisPool(unittest.TestCase):
+    def tearDown(self):
+        asyncio.run(redis_pool.close_pool())
+
+    def test_settings_come_from_environment(self):
+        """Test host, port and db are read from REDIS_* variables."""
+        settings = redis_pool.redis_settings({
+            'REDIS_HOST': 'redis', 'REDIS_PORT': '6390', 'REDIS_DB': '2'
+        })
+        self.assertEqual((settings['host'], settings['port'], settings['db']), ('redis', 6390, 2))
+        self.assertTrue(settings['decode_responses'])
+
+    def test_clients_share_one_pool(self):
+        """Test every client borrows from the same pool until it is closed."""
+        with patch.dict('os.environ', {'REDIS_HOST': 'cache', 'REDIS_PORT': '6391'}):
+            first, second = get_redis_client(), get_redis_client()
+        self.assertIs(first.connection_pool, second.connection_pool)
+        self.assertEqual(first.connection_pool.connection_kwargs['host'], 'cache')
+        self.assertEqual(first.connection_pool.connection_kwargs['port'], 6391)
+
+        asyncio.run(redis_pool.close_pool())
+        self.assertIsNot(get_redis_client().connection_pool, first.connection_pool)
+
+    def test_pipelined_sends_commands_with_keyword_arguments(self):
+        """Test a pipeline returns one reply per command."""
+        async def run():
+            client = fakeredis.FakeAsyncRedis(decode_responses=True)
+            replies = await redis_pool.pipelined(client, [
+                ("set", "k", "v", {"ex": 60}),
+                ("lpush", "items", "a", "b"),
+                ("hincrby", "stats", "n", 3),
+            ])
+            return replies, await client.ttl("k")
+
+        replies, ttl = asyncio.run(run())
+        self.assertEqual(replies, [True, 2, 3])
+        self.assertGreater(ttl, 0)
+
+class TestFeedbackWithRedis(unittest.TestCase):
+    def setUp(self):
+        """Serve the feedback routes over an in-memory Redis stand-in."""
+        self.redis = fakeredis.FakeAsyncRedis(decode_responses=True)
+        app = FastAPI()
+        app.include_router(feedback.router, prefix="/api/v1")
+        app.dependency_overrides[get_redis_client] = lambda: self.redis
+        self.client = TestClient(app)
+
+    def test_feedback_is_stored_and_counted(self):
+        """Test submitted feedback is listed and reflected in the stats."""
+        payload = {
+            "task_id": "1",
+            "predicted_category": "Design",
+            "actual_category": "Design",
+            "confidence": 0.9,
+            "accepted": True
+        }
+        for accepted in (True, True, False):
+            response = self.client.post("/api/v1/feedback", json={**payload, "accepted": accepted})
+            self.assertEqual(response.status_code, 200)
+
+        stats = self.client.get("/api/v1/feedback/stats").json()
+        self.assertEqual(stats, {"accepted": 2, "rejected": 1})
+        self.assertEqual(asyncio.run(self.redis.llen("prediction_feedback")), 3)
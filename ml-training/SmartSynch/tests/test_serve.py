@@ -0,0 +1,38 @@
+"""
+Unit tests for the preforking server helpers
+"""
+
+import unittest
+from unittest.mock import patch
+import torch
+from smartsynch.api import serve
+
+class TestServe(unittest.TestCase):
+    def setUp(self):
+        """Set up a small module standing in for the encoder and head."""
+        self.module = torch.nn.Sequential(torch.nn.Linear(8, 4), torch.nn.Dropout(0.1))
+
+    def test_cow_freezes_weights_in_place(self):
+        """Test weights are put in inference mode without being moved."""
+        weight = self.module[0].weight.data_ptr()
+        serve.freeze_weights([self.module], 'cow')
+        self.assertFalse(self.module.training)
+        self.assertTrue(all(not p.requires_grad for p in self.module.parameters()))
+        self.assertEqual(self.module[0].weight.data_ptr(), weight)
+
+    def test_shm_moves_weights_to_shared_memory(self):
+        """Test shm mode backs every parameter with shared memory."""
+        serve.freeze_weights([self.module], 'shm')
+        self.assertTrue(all(p.is_shared() for p in self.module.parameters()))
+
+    def test_unknown_mode_rejected(self):
+        """Test an unsupported weight sharing mode fails fast."""
+        with self.assertRaises(ValueError):
+            serve.freeze_weights([self.module], 'mmap')
+
+    def test_workers_split_the_cpus(self):
+        """Test each worker gets an equal share of at least one CPU."""
+        with patch.object(serve, 'available_cpus', return_value=8):
+            self.assertEqual(serve.worker_cpus(4), 2)
+            self.assertEqual(serve.worker_cpus(3), 2)
+            self.assertEqual(serve.worker_cpus(16), 1)
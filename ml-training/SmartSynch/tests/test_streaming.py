@@ -0,0 +1,66 @@
+"""
+Unit tests for streaming dataset preparation helpers
+"""
+
+import json
+import os
+import tempfile
+import unittest
+import numpy as np
+from smartsynch.data.streaming import NpyAppender, assign_split, iter_samples, sample_key
+
+class TestStreaming(unittest.TestCase):
+    def setUp(self):
+        """Write the same samples as JSON and JSONL."""
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.samples = [
+            {"title": f"Task {i}", "description": f"Description {{{i}}} [x]", "category": "Design"}
+            for i in range(50)
+        ]
+        self.json_path = os.path.join(self.tmp_dir.name, 'data.json')
+        with open(self.json_path, 'w') as f:
+            json.dump({"version": 1, "samples": self.samples}, f, indent=2)
+        self.jsonl_path = os.path.join(self.tmp_dir.name, 'data.jsonl')
+        with open(self.jsonl_path, 'w') as f:
+            f.write('\n'.join(json.dumps(sample) for sample in self.samples) + '\n')
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_iter_samples(self):
+        """Test incremental parsing matches json.load across buffer refills."""
+        self.assertEqual(list(iter_samples(self.json_path, buffer_size=16)), self.samples)
+        self.assertEqual(list(iter_samples(self.jsonl_path)), self.samples)
+
+    def test_truncated_json(self):
+        """Test a truncated samples array is reported."""
+        with open(self.json_path) as f:
+            content = f.read()
+        with open(self.json_path, 'w') as f:
+            f.write(content[:len(content) // 2])
+        with self.assertRaises(ValueError):
+            list(iter_samples(self.json_path, buffer_size=64))
+
+    def test_assign_split(self):
+        """Test the split is deterministic and close to test_size per label."""
+        keys = [sample_key({"title": f"Task {i}", "description": ""}) for i in range(2000)]
+        for label in ("Design", "Meeting"):
+            splits = [assign_split(key, label, 0.2) for key in keys]
+            self.assertEqual(splits, [assign_split(key, label, 0.2) for key in keys])
+            self.assertAlmostEqual(splits.count('val') / len(keys), 0.2, delta=0.03)
+        self.assertEqual(sample_key({"id": 7, "title": "x"}), '7')
+
+    def test_npy_appender(self):
+        """Test chunks appended to a .npy load back memory-mapped."""
+        path = os.path.join(self.tmp_dir.name, 'X.npy')
+        chunks = [np.random.rand(n, 8).astype(np.float32) for n in (5, 0, 17)]
+        with NpyAppender(path, (8,)) as writer:
+            for chunk in chunks:
+                writer.append(chunk)
+
+        loaded = np.load(path, mmap_mode='r')
+        self.assertEqual(loaded.shape, (22, 8))
+        np.testing.assert_array_equal(loaded, np.concatenate(chunks))
+
+        with self.assertRaises(ValueError):
+            NpyAppender(path + '2', (8,)).append(np.zeros((1, 4)))
@@ -0,0 +1,131 @@
+"""
+Unit tests for parallel head training and hyperparameter sweeps
+"""
+
+import os
+import tempfile
+import unittest
+import numpy as np
+import torch
+from smartsynch.models import head_training
+from smartsynch.models.sweep import (
+    EARLY_STOPPED, PRUNED, HyperparameterSweep, rung_epochs, sample_trials
+)
+from tests.fixtures import clustered
+
+DEFAULTS = {'learning_rate': 0.01, 'dropout_rate': 0.0, 'batch_size': 16,
+            'early_stopping_patience': 50}
+
+class TestSampling(unittest.TestCase):
+    def test_grid_covers_every_combination(self):
+        """Test a grid sweep is the cartesian product of the choices."""
+        trials = sample_trials({'a': [1, 2, 3], 'b': ['x', 'y']}, 'grid')
+        self.assertEqual(len(trials), 6)
+        self.assertEqual(len({(t['a'], t['b']) for t in trials}), 6)
+        with self.assertRaises(ValueError):
+            sample_trials({'a': {'low': 0, 'high': 1}}, 'grid')
+
+    def test_random_samples_ranges(self):
+        """Test random trials respect choices and (log / int) ranges, reproducibly."""
+        space = {'lr': {'low': 1e-4, 'high': 1e-1, 'log': True},
+                 'size': {'low': 8, 'high': 64, 'int': True}, 'c': [0.1, 0.2]}
+        trials = sample_trials(space, 'random', num_trials=30, seed=3)
+
+        self.assertEqual(trials, sample_trials(space, 'random', num_trials=30, seed=3))
+        for trial in trials:
+            self.assertTrue(1e-4 <= trial['lr'] <= 1e-1)
+            self.assertIsInstance(trial['size'], int)
+            self.assertIn(trial['c'], (0.1, 0.2))
+
+    def test_rung_epochs(self):
+        """Test halving rungs grow by eta and other sweeps check at intervals."""
+        self.assertEqual(rung_epochs('halving', 27, 1, eta=3), [1, 3, 9, 27])
+        self.assertEqual(rung_epochs('halving', 20, 3, eta=3), [3, 9, 20])
+        self.assertEqual(rung_epochs('random', 10, 4), [4, 8, 10])
+
+class TestHeadTraining(unittest.TestCase):
+    def setUp(self):
+        """Set up separable data."""
+        features, labels = clustered(120)
+        self.X, self.y = torch.from_numpy(features), torch.from_numpy(labels)
+
+    def test_training_resumes_from_state(self):
+        """Test a second call continues the epochs and history of the first."""
+        full = head_training.fit_head(self.X, self.y, DEFAULTS, 3, 6)
+        first = head_training.fit_head(self.X, self.y, DEFAULTS, 3, 3)
+        resumed = head_training.fit_head(self.X, self.y, DEFAULTS, 3, 6, state=first)
+
+        self.assertEqual(resumed['epoch'], 6)
+        self.assertEqual(first['history']['train_loss'], full['history']['train_loss'][:3])
+        self.assertEqual(resumed['history']['train_loss'][:3], first['history']['train_loss'])
+        self.assertEqual(len(resumed['history']['val_loss']), 6)
+        self.assertEqual(len(first['history']['val_loss']), 3)
+
+    def test_fit_and_evaluate_on_row_subsets(self):
+        """Test folds train and evaluate on index subsets of shared arrays."""
+        train_index, val_index = np.arange(0, 90), np.arange(90, 120)
+        state = head_training.fit_head(self.X, self.y, DEFAULTS, 3, 30,
+                                       train_index=train_index, val_index=val_index)
+        model = head_training.best_head(state, DEFAULTS, 3, 8)
+        metrics = head_training.evaluate_head(model, self.X, self.y, 3, val_index)
+
+        self.assertGreater(metrics['accuracy'], 0.9)
+        self.assertEqual(np.sum(metrics['confusion_matrix']), 30)
+        self.assertEqual(model.best_val_loss, state['best_val_loss'])
+
+    def test_shared_arrays_attach_without_copy(self):
+        """Test shared memory blocks map back to the same values."""
+        with head_training.SharedArrays({'X': self.X.numpy()}) as shared:
+            attached = head_training.attach_array(shared.specs['X'])
+            np.testing.assert_array_equal(attached, self.X.numpy())
+            del attached
+            for block in head_training._worker.pop('_blocks'):
+                block.close()
+
+class TestHyperparameterSweep(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        """Write the sweep data to .npy files and start one worker."""
+        cls.tmp_dir = tempfile.TemporaryDirectory()
+        specs = {}
+        for split, seed in (('train', 0), ('val', 1)):
+            features, labels = clustered(120, seed=seed)
+            for name, array in ((f'X_{split}', features), (f'y_{split}', labels)):
+                path = os.path.join(cls.tmp_dir.name, f'{name}.npy')
+                np.save(path, array)
+                specs[name] = head_training.file_spec(path)
+        cls.specs = specs
+        cls.pool = head_training.start_pool(specs, workers=1)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.pool.shutdown()
+        cls.tmp_dir.cleanup()
+
+    def test_halving_keeps_the_best_trials(self):
+        """Test successive halving prunes all but 1/eta of the trials per rung."""
+        space = {'learning_rate': {'low': 1e-5, 'high': 3e-2, 'log': True}}
+        sweep = HyperparameterSweep(self.specs, space, 3, strategy='halving', num_trials=9,
+                                    max_epochs=9, min_epochs=1, eta=3, defaults=DEFAULTS)
+        leaderboard = sweep.run(self.pool)
+
+        epochs = sorted(entry['epochs'] for entry in leaderboard)
+        self.assertEqual(epochs, [1] * 6 + [3, 3, 9])
+        self.assertEqual(sum(entry['status'] == PRUNED for entry in leaderboard), 8)
+        losses = [entry['best_val_loss'] for entry in leaderboard]
+        self.assertEqual(losses, sorted(losses))
+        self.assertEqual(leaderboard[0]['epochs'], 9)
+        self.assertNotIn('model', sweep.best()['state'])
+
+    def test_grid_with_median_pruning(self):
+        """Test poor grid trials are pruned and early stopping is reported."""
+        space = {'learning_rate': [1e-6, 1e-5, 1e-2, 3e-2]}
+        defaults = dict(DEFAULTS, early_stopping_patience=1)
+        sweep = HyperparameterSweep(self.specs, space, 3, strategy='grid', max_epochs=40,
+                                    min_epochs=2, defaults=defaults)
+        leaderboard = sweep.run(self.pool)
+
+        statuses = {entry['params']['learning_rate']: entry['status'] for entry in leaderboard}
+        self.assertEqual((statuses[1e-6], statuses[1e-5]), (PRUNED, PRUNED))
+        self.assertEqual(statuses[1e-2], EARLY_STOPPED)
+        self.assertGreater(leaderboard[0]['accuracy'], 0.9)
@@ -0,0 +1,243 @@
+"""
+Unit tests for the vector index and the /similar endpoint
+"""
+
+import asyncio
+import json
+import tempfile
+import unittest
+from pathlib import Path
+from types import SimpleNamespace
+from unittest import mock
+import numpy as np
+import torch
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from smartsynch.api import dependencies
+from smartsynch.api.dependencies import get_similar_tasks
+from smartsynch.api.routes import similar as similar_routes
+from smartsynch.api.similar import SOURCE_PREDICTION, SimilarTasks
+from smartsynch.data import processor
+from smartsynch.data.processor import DataProcessor
+from smartsynch.models.executor import InferenceExecutor
+from smartsynch.models.predictor import Predictor
+from smartsynch.models.vector_index import (
+    ExactIndex, VectorIndex, build_index, load_labeled_embeddings, load_texts, normalize
+)
+from smartsynch.utils.helpers import DEFAULT_PREDICTOR_CONFIG
+from tests.fixtures import clustered
+
+CATEGORIES = ["Design", "Development", "Meeting"]
+
+def labeled(n, seed=0):
+    """Catalog vectors with category names."""
+    vectors, label_ids = clustered(n, dim=16, seed=seed)
+    return vectors, [CATEGORIES[i] for i in label_ids]
+
+class TestVectorIndex(unittest.TestCase):
+    def setUp(self):
+        """Set up a labeled catalog and queries."""
+        self.vectors, self.labels = labeled(2000)
+        self.queries, _ = labeled(20, seed=1)
+        scores = normalize(self.queries) @ normalize(self.vectors).T
+        self.expected = np.argsort(-scores, axis=1)[:, :5]
+
+    def test_exact_search_matches_brute_force(self):
+        """Test exact search returns the true neighbours in order."""
+        index = build_index(self.vectors, self.labels, kind='exact')
+        scores, ids = index.search(self.queries, k=5)
+
+        np.testing.assert_array_equal(ids, self.expected)
+        self.assertTrue(np.all(np.diff(scores, axis=1) <= 0))
+
+    def test_ivf_recall(self):
+        """Test the IVF index finds most true neighbours and all when probing every list."""
+        index = build_index(self.vectors, self.labels, kind='ivf', nlist=32, nprobe=8)
+        _, ids = index.search(self.queries, k=5)
+        recall = np.mean([len(set(got) & set(want)) / 5 for got, want in zip(ids, self.expected)])
+        self.assertGreaterEqual(recall, 0.8)
+
+        index.nprobe = 32
+        _, ids = index.search(self.queries, k=5)
+        np.testing.assert_array_equal(ids, self.expected)
+        self.assertLess(index.stats()['candidates'], 2 * 20 * len(self.vectors))
+
+    def test_inserts_are_searchable_and_grow_the_buffers(self):
+        """Test vectors added after build are found by both index kinds."""
+        for kind in ('exact', 'ivf'):
+            index = build_index(self.vectors[:100], self.labels[:100], kind=kind, nlist=4)
+            if kind == 'exact':
+                self.assertIsInstance(index, ExactIndex)
+            ids = index.add(self.vectors[100:], self.labels[100:],
+                            [{'source': 'new'}] * (len(self.vectors) - 100))
+            self.assertEqual(ids[0], 100)
+            self.assertEqual(len(index), len(self.vectors))
+
+            match = index.neighbours(self.vectors[1500], k=1)[0]
+            self.assertEqual((match['id'], match['category'], match['source']),
+                             (1500, self.labels[1500], 'new'))
+            self.assertAlmostEqual(match['score'], 1.0, places=5)
+
+    def test_loads_prepared_splits(self):
+        """Test embeddings and category names are read from prepare_data output."""
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            np.save(Path(tmp_dir) / "X_train.npy", self.vectors[:3])
+            np.save(Path(tmp_dir) / "y_train.npy", np.array([2, 0, 1]))
+            np.save(Path(tmp_dir) / "category_map.npy",
+                    {category: i for i, category in enumerate(CATEGORIES)})
+            vectors, labels = load_labeled_embeddings(tmp_dir)
+            np.testing.assert_array_equal(vectors, self.vectors[:3])
+            self.assertIsNone(load_texts(tmp_dir))
+        self.assertEqual(labels, ["Meeting", "Design", "Development"])
+
+    def test_base_index_is_abstract(self):
+        """Test only the concrete index kinds can be built."""
+        with self.assertRaises(TypeError):
+            VectorIndex(16)
+
+class TestSimilarTasks(unittest.TestCase):
+    def setUp(self):
+        """Set up the service over a small index and a deterministic embedder."""
+        vectors, labels = labeled(50)
+        self.index = build_index(vectors, labels, [{'source': 'train'}] * 50)
+        self.rng = np.random.default_rng(2)
+        self.embedded = {}
+
+        def embed(tasks):
+            for task in tasks:
+                self.embedded.setdefault(task['title'], self.rng.normal(size=16))
+            return np.stack([self.embedded[task['title']] for task in tasks])
+
+        self.executor = InferenceExecutor(max_workers=1, torch_threads=1)
+        self.addCleanup(self.executor.shutdown)
+        self.similar = SimilarTasks(self.index, embed, self.executor, min_confidence=0.5)
+
+    def test_records_confident_predictions_once(self):
+        """Test predicted tasks are indexed once and unsure ones are skipped."""
+        tasks = [{"title": "Fix login", "description": "x"}, {"title": "Sync", "description": "y"}]
+        results = [{"category": "Development", "confidence": 0.9},
+                   {"category": "Meeting", "confidence": 0.2}]
+        asyncio.run(self.similar.record(tasks, results))
+        asyncio.run(self.similar.record(tasks[:1], results[:1]))
+
+        self.assertEqual(len(self.index), 51)
+        stats = self.similar.stats()
+        self.assertEqual((stats['recorded'], stats['already_indexed'], stats['below_confidence']),
+                         (1, 1, 1))
+
+        match = asyncio.run(self.similar.search("Fix login", "x", k=1))[0]
+        self.assertEqual((match['source'], match['title'], match['category']),
+                         (SOURCE_PREDICTION, "Fix login", "Development"))
+        # The insert and the search, embedding included, ran on the executor
+        self.assertEqual(self.executor.stats()['completed'], 2)
+
+    def test_inserts_stop_at_the_cap(self):
+        """Test at most max_predictions predicted tasks are indexed and remembered."""
+        self.similar.max_predictions = 2
+        tasks = [{"title": f"Task {i}", "description": "x"} for i in range(4)]
+        results = [{"category": "Design", "confidence": 0.9}] * 4
+        asyncio.run(self.similar.record(tasks[:3], results[:3]))
+        asyncio.run(self.similar.record(tasks, results))
+
+        self.assertEqual(len(self.index), 52)
+        self.assertEqual(len(self.similar._indexed), 2)
+        stats = self.similar.stats()
+        self.assertEqual((stats['recorded'], stats['already_indexed'], stats['index_full']),
+                         (2, 2, 3))
+
+    def test_route(self):
+        """Test /similar returns the requested number of ranked matches."""
+        app = FastAPI()
+        app.include_router(similar_routes.router, prefix="/api/v1")
+        app.dependency_overrides[get_similar_tasks] = lambda: self.similar
+        client = TestClient(app)
+
+        response = client.post("/api/v1/similar", json={"title": "Logo", "k": 3})
+        self.assertEqual(response.status_code, 200)
+        matches = response.json()["matches"]
+        self.assertEqual(len(matches), 3)
+        self.assertTrue(all(match["source"] == "train" for match in matches))
+        self.assertGreaterEqual(matches[0]["score"], matches[-1]["score"])
+
+        app.dependency_overrides[get_similar_tasks] = lambda: None
+        self.assertEqual(client.post("/api/v1/similar", json={"title": "Logo"}).status_code, 404)
+
+    def test_training_matches_carry_their_text(self):
+        """Test matches from the training catalog include title and description."""
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            vectors, label_ids = clustered(6, dim=16)
+            np.save(Path(tmp_dir) / "X_train.npy", vectors)
+            np.save(Path(tmp_dir) / "y_train.npy", label_ids)
+            np.save(Path(tmp_dir) / "category_map.npy", {c: i for i, c in enumerate(CATEGORIES)})
+            with open(Path(tmp_dir) / "samples_train.jsonl", "w") as f:
+                for i in range(6):
+                    f.write(json.dumps({"title": f"Task {i}", "description": None}) + "\n")
+            settings = dict(DEFAULT_PREDICTOR_CONFIG['vector_index'], enabled=True, data_dir=tmp_dir)
+
+            def embed(tasks):
+                return vectors[[int(task['title'].split()[1]) for task in tasks]]
+
+            executor = InferenceExecutor(max_workers=1, torch_threads=1)
+            self.addCleanup(executor.shutdown)
+            predictor = SimpleNamespace(config={'vector_index': settings}, embed=embed,
+                                        executor=executor)
+            get_similar_tasks.cache_clear()
+            try:
+                with mock.patch.object(dependencies, 'get_predictor', return_value=predictor), \
+                        mock.patch.object(dependencies, 'ensure_nltk_data'):
+                    similar = get_similar_tasks()
+            finally:
+                get_similar_tasks.cache_clear()
+
+        match = asyncio.run(similar.search("Task 4", k=1))[0]
+        self.assertEqual((match['id'], match['title'], match['source']), (4, "Task 4", "train"))
+        self.assertIs(dependencies.loaded_similar_tasks(), similar)
+
+    def test_missing_embeddings_disable_the_index(self):
+        """Test a serving image without prepared data starts without the index."""
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            settings = dict(DEFAULT_PREDICTOR_CONFIG['vector_index'], enabled=True, data_dir=tmp_dir)
+            predictor = SimpleNamespace(config={'vector_index': settings})
+            get_similar_tasks.cache_clear()
+            try:
+                with mock.patch.object(dependencies, 'get_predictor', return_value=predictor):
+                    self.assertIsNone(get_similar_tasks())
+                    self.assertIsNone(dependencies.loaded_similar_tasks())
+            finally:
+                get_similar_tasks.cache_clear()
+        self.assertFalse(DEFAULT_PREDICTOR_CONFIG['vector_index']['enabled'])
+
+    def test_missing_nltk_data_disables_the_index(self):
+        """Test the index stays off when queries could not be cleaned like its vectors."""
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            vectors, label_ids = clustered(6, dim=16)
+            np.save(Path(tmp_dir) / "X_train.npy", vectors)
+            np.save(Path(tmp_dir) / "y_train.npy", label_ids)
+            np.save(Path(tmp_dir) / "category_map.npy", {c: i for i, c in enumerate(CATEGORIES)})
+            settings = dict(DEFAULT_PREDICTOR_CONFIG['vector_index'], enabled=True, data_dir=tmp_dir)
+            predictor = SimpleNamespace(config={'vector_index': settings})
+            get_similar_tasks.cache_clear()
+            try:
+                with mock.patch.object(dependencies, 'get_predictor', return_value=predictor), \
+                        mock.patch.object(dependencies, 'ensure_nltk_data',
+                                          side_effect=LookupError("Missing NLTK data: punkt")):
+                    self.assertIsNone(get_similar_tasks())
+            finally:
+                get_similar_tasks.cache_clear()
+
+    def test_queries_use_the_prepared_text(self):
+        """Test Predictor.embed encodes the cleaned text DataProcessor embeds."""
+        encoded = []
+
+        def get_embeddings(texts):
+            encoded.extend(texts)
+            return torch.zeros(len(texts), 16)
+
+        with mock.patch.object(processor, '_normalize', side_effect=lambda text: text.lower()):
+            Predictor.embed(SimpleNamespace(get_embeddings=get_embeddings),
+                            [{'title': "Fix Login", 'description': "OAuth"}, {'title': "Sync"}])
+            expected = [DataProcessor.clean_text(None, DataProcessor.combine_title_description(
+                None, "Fix Login", "OAuth")), processor.prepared_text("Sync")]
+
+        self.assertEqual(encoded, expected)
+        self.assertEqual(encoded, ["fix login fix login oauth", "sync sync "])
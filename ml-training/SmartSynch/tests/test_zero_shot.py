@@ -0,0 +1,111 @@
+"""
+Unit tests for the batched zero-shot classifier
+"""
+
+import asyncio
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+import torch
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from transformers import BertConfig, BertForSequenceClassification, BertTokenizerFast, pipeline
+from smartsynch.api.batching import MicroBatcher
+from smartsynch.api import zero_shot
+from smartsynch.api.routes import models as model_routes
+from smartsynch.models.zero_shot import ZeroShotClassifier
+from tests.test_export import VOCAB
+
+LABELS = ["design", "development", "meeting"]
+
+def build_tiny_nli(path: Path, max_length: int = 24):
+    """Small random BERT NLI model that needs no downloads."""
+    (path / 'vocab.txt').write_text('\n'.join(VOCAB))
+    BertTokenizerFast(str(path / 'vocab.txt'), model_max_length=max_length).save_pretrained(str(path))
+    torch.manual_seed(0)
+    labels = ['contradiction', 'neutral', 'entailment']
+    BertForSequenceClassification(BertConfig(
+        vocab_size=len(VOCAB), hidden_size=32, num_hidden_layers=1,
+        num_attention_heads=2, intermediate_size=64, num_labels=3,
+        id2label=dict(enumerate(labels)), label2id={label: i for i, label in enumerate(labels)}
+    )).save_pretrained(str(path))
+
+class TestZeroShotClassifier(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp_dir = tempfile.TemporaryDirectory()
+        cls.model_path = cls.tmp_dir.name
+        build_tiny_nli(Path(cls.model_path))
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.tmp_dir.cleanup()
+
+    def setUp(self):
+        """Set up a classifier with small forward batches."""
+        self.classifier = ZeroShotClassifier(self.model_path, max_pairs_per_forward=4)
+        self.texts = [
+            "fix login bug",
+            "design logo for the sprint meeting plan research api fix login bug design logo",
+            "plan",
+        ]
+
+    def test_matches_the_transformers_pipeline(self):
+        """Test batched scores (with truncation) equal the pipeline's."""
+        reference = pipeline('zero-shot-classification', model=self.model_path)
+        results = self.classifier.classify_batch([(text, LABELS) for text in self.texts])
+
+        for text, result in zip(self.texts, results):
+            expected = reference(text, candidate_labels=LABELS)
+            self.assertEqual(result['labels'], expected['labels'])
+            for score, expected_score in zip(result['scores'], expected['scores']):
+                self.assertAlmostEqual(score, expected_score, places=5)
+
+    def test_pairs_of_many_requests_share_forward_passes(self):
+        """Test requests with mixed label sets are packed and scattered back."""
+        requests = [(text, LABELS) for text in self.texts] + [("plan", ["meeting", "research"])]
+        batched = self.classifier.classify_batch(requests)
+        single = [self.classifier(text, labels) for text, labels in requests]
+
+        for got, expected in zip(batched, single):
+            self.assertEqual(got['labels'], expected['labels'])
+            self.assertAlmostEqual(got['scores'][0], expected['scores'][0], places=5)
+        stats = self.classifier.stats()
+        self.assertEqual(stats['pairs'], 2 * 11)
+        self.assertEqual(stats['forwards'], 3 + len(requests))
+        self.assertEqual(stats['hypothesis_misses'], 2)
+
+    def test_concurrent_requests_are_batched(self):
+        """Test the micro-batcher hands concurrent requests over together."""
+        batcher = MicroBatcher(self.classifier.classify_batch, max_batch_size=8, max_wait_ms=50)
+
+        async def run():
+            results = await asyncio.gather(*(batcher.submit((text, LABELS)) for text in self.texts))
+            await batcher.stop()
+            return results
+
+        results = asyncio.run(run())
+        self.assertEqual(len(results), 3)
+        self.assertEqual(self.classifier.stats()['requests'], 3)
+        self.assertEqual(batcher.stats()['total_batches'], 1)
+
+    def test_route_serves_through_the_batcher(self):
+        """Test the zero-shot route answers from the batched classifier."""
+        app = FastAPI()
+        app.include_router(model_routes.router, prefix="/api/v1")
+        zero_shot.get_model_pool.cache_clear()
+        with patch.object(zero_shot, 'resolve_model', return_value=self.model_path), \
+                patch.dict(zero_shot.batchers, clear=True):
+            response = TestClient(app).post(
+                "/api/v1/predict/task-categorization",
+                json={"title": "Fix login", "description": "Users cannot log in"}
+            )
+            asyncio.run(zero_shot.stop_batchers())
+        self.assertEqual(zero_shot.get_model_pool().stats()['loads'], 1)
+        zero_shot.get_model_pool.cache_clear()
+
+        self.assertEqual(response.status_code, 200)
+        body = response.json()
+        self.assertIn(body["category"], zero_shot.MODEL_CONFIGS["task-categorization"]["labels"])
+        self.assertAlmostEqual(sum(body["all_scores"].values()), 1.0, places=4)